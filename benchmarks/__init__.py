@@ -0,0 +1,12 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Performance benchmarks for netlookup module
+
+Run all benchmarks offline from the repository root with
+
+    python -m benchmarks --output results.json
+"""
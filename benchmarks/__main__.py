@@ -0,0 +1,80 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Run netlookup benchmarks and write results as JSON
+"""
+import argparse
+import sys
+
+from typing import List, Optional
+
+from . import cli, fetch, lookup
+from .common import BenchmarkResults
+
+DEFAULT_SIZES = 'mock,10000,100000'
+
+SUITES = {
+    cli.SUITE: cli,
+    fetch.SUITE: fetch,
+    lookup.SUITE: lookup,
+}
+
+
+def parse_sizes(value: str) -> List[Optional[int]]:
+    """
+    Parse comma separated list of data set sizes. Value 'mock' uses the mock cache data.
+    """
+    sizes = []
+    for item in value.split(','):
+        item = item.strip()
+        if item == 'mock':
+            sizes.append(None)
+        elif item:
+            sizes.append(int(item))
+    return sizes
+
+
+def format_result(result: dict) -> str:
+    """
+    Format single result as a summary line
+    """
+    size = result['size'] if result['size'] is not None else '-'
+    if result['unit'] == 's':
+        value = f'median {result["median"] * 1000:.3f} ms'
+    elif result['unit'] == 'bytes':
+        value = f'peak {result["peak"] / 1024 / 1024:.2f} MiB'
+    elif result['unit'] == 'ns':
+        value = f'p50 {result["p50"] / 1000:.2f} us p99 {result["p99"] / 1000:.2f} us'
+    else:
+        value = f'{result["ops_per_second"]:.0f} ops/s'
+    return f'{result["suite"]:<8} {result["name"]:<40} {size:>10} {value}'
+
+
+def main(argv: Optional[List[str]] = None) -> BenchmarkResults:
+    """
+    Run benchmarks
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--suite', action='append', choices=sorted(SUITES), help='Benchmark suites to run')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Comma separated prefix set sizes or "mock"')
+    parser.add_argument('--queries', type=int, default=1000, help='Number of lookup queries')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of repeated measurements')
+    parser.add_argument('-o', '--output', help='Write results as JSON to file')
+    args = parser.parse_args(argv)
+
+    results = BenchmarkResults()
+    for name in args.suite or sorted(SUITES):
+        SUITES[name].run(results, parse_sizes(args.sizes), args.queries, args.repeat)
+
+    for result in results.results:
+        sys.stdout.write(f'{format_result(result)}\n')
+    if args.output:
+        results.save(args.output)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmarks for command line tool startup
+
+Import time of the CLI module is measured in a fresh interpreter for each round, so cached
+modules of the benchmark process do not affect the results.
+"""
+import json
+import subprocess
+import sys
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .common import BenchmarkResults, timing_stats
+
+SUITE = 'cli'
+
+CLI_IMPORT_SCRIPT = """
+import json
+import sys
+import time
+start = time.perf_counter()
+import netlookup.bin.netlookup
+print(json.dumps({'elapsed': time.perf_counter() - start, 'modules': len(sys.modules)}))
+"""
+
+
+def measure_cli_import() -> dict:
+    """
+    Import CLI module in a fresh interpreter and return import time and loaded module count
+    """
+    res = subprocess.run(
+        [sys.executable, '-c', CLI_IMPORT_SCRIPT],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+    )
+    return json.loads(res.stdout)
+
+
+def run(results: BenchmarkResults, sizes: Sequence[Optional[int]], queries: int, repeat: int) -> None:
+    """
+    Run CLI startup benchmark suite
+    """
+    # Data set sizes and query counts do not apply to CLI startup
+    del sizes, queries
+    rounds = [measure_cli_import() for _round in range(repeat)]
+    stats = timing_stats([data['elapsed'] for data in rounds])
+    stats['modules'] = rounds[-1]['modules']
+    results.add(SUITE, 'import netlookup.bin.netlookup', None, stats)
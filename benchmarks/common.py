@@ -0,0 +1,145 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Common utilities for netlookup benchmarks
+"""
+import json
+import math
+import platform
+import statistics
+import sys
+
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter, perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+MOCK_DATA = Path(__file__).parent.parent.joinpath('tests/mock')
+
+MOCK_PREFIXES_CACHE_DIRECTORY = MOCK_DATA.joinpath('prefixes/cache')
+MOCK_PLATFORM_DIRECTORY = MOCK_DATA.joinpath('platform')
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """
+    Return percentile from sorted list of values with nearest rank method
+    """
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def timing_stats(timings: List[float], number: int = 1) -> Dict[str, Any]:
+    """
+    Return statistics for timings in seconds
+    """
+    timings = sorted(timings)
+    return {
+        'unit': 's',
+        'repeat': len(timings),
+        'number': number,
+        'min': timings[0],
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': timings[-1],
+    }
+
+
+def measure(func: Callable, repeat: int = 5, number: int = 1) -> Dict[str, Any]:
+    """
+    Measure run time of a function, calling it number times in each of repeat rounds
+
+    Returns timing statistics in seconds per single call
+    """
+    timings = []
+    for _round in range(repeat):
+        start = perf_counter()
+        for _call in range(number):
+            func()
+        timings.append((perf_counter() - start) / number)
+    return timing_stats(timings, number)
+
+
+def measure_latency(func: Callable, values: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Measure latency of a function called once for each value
+
+    Returns latency statistics in nanoseconds and throughput in calls per second
+    """
+    latencies = []
+    for value in values:
+        start = perf_counter_ns()
+        func(value)
+        latencies.append(perf_counter_ns() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'unit': 'ns',
+        'count': len(latencies),
+        'min': latencies[0] if latencies else 0,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'mean': total / len(latencies) if latencies else 0,
+        'max': latencies[-1] if latencies else 0,
+    }
+
+
+def measure_throughput(func: Callable, values: List[Any]) -> Dict[str, Any]:
+    """
+    Measure throughput of a function called for all values in a tight loop
+    """
+    start = perf_counter()
+    for value in values:
+        func(value)
+    elapsed = perf_counter() - start
+    return {
+        'unit': 'ops/s',
+        'count': len(values),
+        'elapsed': elapsed,
+        'ops_per_second': len(values) / elapsed if elapsed else 0.0,
+    }
+
+
+class BenchmarkResults:
+    """
+    Collected benchmark results in machine readable format
+    """
+    def __init__(self) -> None:
+        self.started = datetime.now()
+        self.results: List[Dict[str, Any]] = []
+
+    def add(self, suite: str, name: str, size: Optional[int], stats: Dict[str, Any]) -> None:
+        """
+        Add result of a benchmark
+        """
+        self.results.append({
+            'suite': suite,
+            'name': name,
+            'size': size,
+            **stats,
+        })
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return benchmark results with environment metadata as dictionary
+        """
+        return {
+            'metadata': {
+                'started': self.started.isoformat(),
+                'python': sys.version.split()[0],
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+            },
+            'results': self.results,
+        }
+
+    def save(self, path: Path) -> None:
+        """
+        Save benchmark results as JSON file
+        """
+        with Path(path).open('w', encoding='utf-8') as filedescriptor:
+            filedescriptor.write(f'{json.dumps(self.as_dict(), indent=2)}\n')
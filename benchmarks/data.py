@@ -0,0 +1,73 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmark data sets from mock data and synthetic prefix caches
+"""
+import random
+
+from pathlib import Path
+from shutil import copytree
+from typing import List, Optional, Sequence, Tuple
+
+from netlookup.constants import IPV4_VERSION
+from netlookup.network import Network, format_address
+from netlookup.prefixes import Prefixes
+
+from .common import MOCK_PREFIXES_CACHE_DIRECTORY
+from .synthetic import MISS_NETWORKS, SyntheticPrefixSet
+
+# Reserved 240.0.0.0/4 range is not used in mock data and gives lookup misses
+MISS_NETWORK = MISS_NETWORKS[IPV4_VERSION]
+
+
+def hit_addresses(networks: Sequence[Network], count: int, seed: int = 0) -> List[str]:
+    """
+    Return list of addresses within random networks from the list
+    """
+    rng = random.Random(seed)
+    addresses = []
+    for _index in range(count):
+        network = networks[rng.randrange(len(networks))]
+        addresses.append(format_address(rng.randint(network.first, network.last), network.version))
+    return addresses
+
+
+def miss_addresses(count: int, seed: int = 0) -> List[str]:
+    """
+    Return list of addresses that are not found in any data set
+    """
+    rng = random.Random(seed)
+    return [
+        format_address(rng.randint(MISS_NETWORK.first, MISS_NETWORK.last), MISS_NETWORK.version)
+        for _index in range(count)
+    ]
+
+
+def prepare_data_set(directory: Path,
+                     size: Optional[int],
+                     queries: int,
+                     seed: int = 0) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Write prefix cache files to directory from mock data (size None) or synthetic data set
+    with size prefixes
+
+    Returns lists of matching, missing and mixed lookup query addresses
+    """
+    if size is None:
+        copytree(MOCK_PREFIXES_CACHE_DIRECTORY, directory, dirs_exist_ok=True)
+        hits = hit_addresses(Prefixes(cache_directory=directory), queries, seed)
+        misses = miss_addresses(queries, seed)
+        mixed = hits + misses
+        random.Random(seed).shuffle(mixed)
+        return hits, misses, mixed
+
+    prefix_set = SyntheticPrefixSet(size, seed)
+    prefix_set.write(directory)
+    return (
+        prefix_set.queries(queries, hit_ratio=1.0),
+        prefix_set.queries(queries, hit_ratio=0.0),
+        prefix_set.queries(queries * 2, hit_ratio=0.5),
+    )
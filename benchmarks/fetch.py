@@ -0,0 +1,302 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmarks for vendor prefix fetch and parse pipeline
+
+Recorded mock data or synthetic payloads are served from local HTTP and DNS TXT servers
+and Prefixes.update() is measured end to end with per vendor stage breakdown (download,
+decode, object build, sort and save) and peak memory usage.
+"""
+import functools
+import json
+import tracemalloc
+
+from collections import defaultdict
+from collections.abc import Generator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from unittest.mock import patch
+
+from dns import resolver
+
+from netlookup.network_sets import aws, cloudflare, google
+from netlookup.network_sets.base import NetworkSet
+from netlookup.prefixes import Prefixes
+
+from .common import MOCK_DATA, BenchmarkResults, timing_stats
+from .servers import LOCALHOST, MAX_TXT_STRING_LENGTH, LocalDNSServer, LocalHTTPServer
+from .synthetic import SyntheticPrefixSet
+
+SUITE = 'fetch'
+
+AWS_PATH = '/ip-ranges.json'
+CLOUDFLARE_PATHS = (
+    '/ips-v4',
+    '/ips-v6',
+)
+
+MOCK_AWS_IP_RANGES_FILE = MOCK_DATA.joinpath('network_sets/aws_ip_ranges.json')
+MOCK_CLOUDFLARE_RANGES_FILES = (
+    MOCK_DATA.joinpath('network_sets/cloudflare_ipv4.txt'),
+    MOCK_DATA.joinpath('network_sets/cloudflare_ipv6.txt'),
+)
+MOCK_GOOGLE_SPF_RECORDS_FILE = MOCK_DATA.joinpath('network_sets/google_spf_records.json')
+
+# Methods of network sets timed as fetch pipeline stages
+FETCH_STAGE_METHODS = {
+    aws.AWS.type: {
+        '__get_aws_ip_ranges__': 'download',
+        '__decode_aws_ip_ranges__': 'decode',
+    },
+    cloudflare.Cloudflare.type: {
+        '__get_ip_range_data__': 'download',
+    },
+}
+COMMON_STAGE_METHODS = {
+    '__build_networks__': 'build',
+    '__sort_networks__': 'sort',
+    'save': 'save',
+}
+# Google module functions timed as fetch pipeline stages
+GOOGLE_STAGE_FUNCTIONS = {
+    'google_rr_dns_query': 'download',
+    'google_rr_prefixes': 'decode',
+}
+
+HTTPPayloads = Dict[str, bytes]
+DNSRecords = Dict[str, str]
+
+
+class StageTimings:
+    """
+    Accumulated exclusive run time of wrapped functions by stage
+
+    Time spent in nested wrapped calls is only counted for the innermost stage.
+    """
+    timings: Dict[str, float]
+
+    def __init__(self) -> None:
+        self.timings = defaultdict(float)
+        self.__children__: List[float] = []
+
+    def __timed_call__(self, stage: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call function and accumulate its exclusive run time to stage
+        """
+        self.__children__.append(0.0)
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            self.timings[stage] += elapsed - self.__children__.pop()
+            if self.__children__:
+                self.__children__[-1] += elapsed
+
+    def __timed_iterator__(self, stage: str, iterator: Iterator) -> Iterator:
+        """
+        Accumulate time spent producing each item of a streaming stage to stage
+        """
+        while True:
+            try:
+                item = self.__timed_call__(stage, next, iterator)
+            except StopIteration:
+                return
+            yield item
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """
+        Wrap function to accumulate its run time to stage
+
+        Streaming stages returning generators are timed while their items are consumed.
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = self.__timed_call__(stage, func, *args, **kwargs)
+            if isinstance(result, Generator):
+                return self.__timed_iterator__(stage, result)
+            return result
+        return wrapper
+
+    def instrument_vendor(self, vendor: NetworkSet) -> None:
+        """
+        Wrap fetch pipeline stage methods of a vendor network set
+        """
+        methods = {**FETCH_STAGE_METHODS.get(vendor.type, {}), **COMMON_STAGE_METHODS}
+        for attr, stage in methods.items():
+            setattr(vendor, attr, self.wrap(f'{vendor.type} {stage}', getattr(vendor, attr)))
+
+        if isinstance(vendor, google.GoogleNetworkSet):
+            fetch = vendor.fetch
+
+            def fetch_google(vendor=vendor, fetch=fetch):
+                with ExitStack() as stack:
+                    for name, stage in GOOGLE_STAGE_FUNCTIONS.items():
+                        func = self.wrap(f'{vendor.type} {stage}', getattr(google, name))
+                        stack.enter_context(patch.object(google, name, func))
+                    fetch()
+            vendor.fetch = fetch_google
+
+    def instrument(self, prefixes: Prefixes) -> None:
+        """
+        Wrap fetch pipeline stage methods of prefixes and all vendors
+        """
+        for vendor in prefixes.vendors:
+            self.instrument_vendor(vendor)
+        prefixes.load = self.wrap('load', prefixes.load)
+
+
+def spf_records(name: str, fields: Iterable[str]) -> DNSRecords:
+    """
+    Return SPF style TXT records for fields, split to included records like google does
+    """
+    records = {}
+    fields = list(fields)
+    level = 0
+    while True:
+        chunks = []
+        chunk = []
+        for field in fields:
+            if chunk and len(' '.join(['v=spf1', *chunk, field, '?all'])) > MAX_TXT_STRING_LENGTH:
+                chunks.append(chunk)
+                chunk = []
+            chunk.append(field)
+        chunks.append(chunk)
+
+        if len(chunks) == 1:
+            records[name] = ' '.join(['v=spf1', *chunks[0], '?all'])
+            return records
+
+        fields = []
+        for index, chunk in enumerate(chunks):
+            include = f'_netblocks{level}-{index}.{name.lstrip("_")}'
+            records[include] = ' '.join(['v=spf1', *chunk, '?all'])
+            fields.append(f'include:{include}')
+        level += 1
+
+
+def recorded_payloads() -> Tuple[HTTPPayloads, DNSRecords]:
+    """
+    Return HTTP payloads and DNS records from recorded mock data
+    """
+    payloads = {AWS_PATH: MOCK_AWS_IP_RANGES_FILE.read_bytes()}
+    for path, filename in zip(CLOUDFLARE_PATHS, MOCK_CLOUDFLARE_RANGES_FILES):
+        payloads[path] = filename.read_bytes()
+    spf_records = json.loads(MOCK_GOOGLE_SPF_RECORDS_FILE.read_text(encoding='utf-8'))
+    records = {name: ' '.join(fields) for name, fields in spf_records.items()}
+    return payloads, records
+
+
+def synthetic_payloads(size: int, seed: int = 0) -> Tuple[HTTPPayloads, DNSRecords]:
+    """
+    Return HTTP payloads and DNS records for synthetic prefix set of specified size
+    """
+    prefix_set = SyntheticPrefixSet(size, seed=seed)
+
+    data = {
+        'syncToken': str(int(prefix_set.updated.timestamp())),
+        'createDate': prefix_set.updated.strftime('%Y-%m-%d-%H-%M-%S'),
+        'prefixes': [],
+        'ipv6_prefixes': [],
+    }
+    for record in prefix_set.records[aws.AWS.type]:
+        group, field = ('ipv6_prefixes', 'ipv6_prefix') if ':' in record['cidr'] else ('prefixes', 'ip_prefix')
+        for service in ['AMAZON', *record['services']]:
+            data[group].append({
+                field: record['cidr'],
+                'region': record['region'],
+                'service': service,
+                'network_border_group': record['network_border_group'],
+            })
+    payloads = {AWS_PATH: json.dumps(data, indent=2).encode('utf-8')}
+
+    cidrs = [record['cidr'] for record in prefix_set.records[cloudflare.Cloudflare.type]]
+    payloads[CLOUDFLARE_PATHS[0]] = ''.join(f'{cidr}\n' for cidr in cidrs if ':' not in cidr).encode('utf-8')
+    payloads[CLOUDFLARE_PATHS[1]] = ''.join(f'{cidr}\n' for cidr in cidrs if ':' in cidr).encode('utf-8')
+
+    records = {}
+    for network_set, name in (
+            (google.GoogleCloud, google.GOOGLE_CLOUD_ADDRESS_LIST_RECORD),
+            (google.GoogleServices, google.GOOGLE_SERVICES_ADDRESS_LIST_RECORD)):
+        fields = [
+            f'ip6:{record["cidr"]}' if ':' in record['cidr'] else f'ip4:{record["cidr"]}'
+            for record in prefix_set.records[network_set.type]
+        ]
+        records.update(spf_records(name, fields))
+    return payloads, records
+
+
+@contextmanager
+def local_endpoints(http_server: LocalHTTPServer, dns_server: LocalDNSServer) -> Iterator[None]:
+    """
+    Point vendor network set data sources to local servers while in context
+    """
+    dns_resolver = resolver.Resolver(configure=False)
+    dns_resolver.nameservers = [LOCALHOST]
+    dns_resolver.port = dns_server.port
+    cloudflare_urls = tuple(http_server.url(path) for path in CLOUDFLARE_PATHS)
+    with patch.object(aws, 'AWS_IP_RANGES_URL', http_server.url(AWS_PATH)), \
+            patch.object(cloudflare, 'CLOUDFLARE_IP_RANGES_IPV4_URLS', cloudflare_urls), \
+            patch.object(resolver, 'default_resolver', dns_resolver):
+        yield
+
+
+def update_prefixes(cache_directory: Path, timings: Optional[StageTimings] = None) -> Prefixes:
+    """
+    Update prefixes to an empty cache directory, optionally recording stage timings
+    """
+    prefixes = Prefixes(cache_directory=cache_directory)
+    if timings is not None:
+        timings.instrument(prefixes)
+    prefixes.update()
+    return prefixes
+
+
+def run_update(results: BenchmarkResults, size: Optional[int], repeat: int) -> None:
+    """
+    Run benchmarks for updating prefixes from local servers
+    """
+    payloads, records = recorded_payloads() if size is None else synthetic_payloads(size)
+    totals = []
+    stages = defaultdict(list)
+    vendor_sizes = {}
+
+    with LocalHTTPServer(payloads) as http_server, LocalDNSServer(records) as dns_server:
+        with local_endpoints(http_server, dns_server), TemporaryDirectory() as tmpdir:
+            for index in range(repeat):
+                timings = StageTimings()
+                start = perf_counter()
+                prefixes = update_prefixes(Path(tmpdir, f'timing-{index}'), timings)
+                totals.append(perf_counter() - start)
+                for stage, value in timings.timings.items():
+                    stages[stage].append(value)
+            vendor_sizes = {vendor.type: len(vendor.__networks__) for vendor in prefixes.vendors}
+            count = len(prefixes)
+
+            tracemalloc.start()
+            try:
+                update_prefixes(Path(tmpdir, 'memory'))
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    results.add(SUITE, 'Prefixes.update', count, timing_stats(totals))
+    for stage, values in stages.items():
+        vendor = stage.split(' ', 1)[0]
+        results.add(SUITE, f'Prefixes.update {stage}', vendor_sizes.get(vendor, count), timing_stats(values))
+    results.add(SUITE, 'Prefixes.update memory', count, {'unit': 'bytes', 'peak': peak})
+
+
+# pylint: disable=unused-argument
+def run(results: BenchmarkResults, sizes: Sequence[Optional[int]], queries: int, repeat: int) -> None:
+    """
+    Run fetch pipeline benchmark suite
+    """
+    for size in sizes:
+        run_update(results, size, repeat)
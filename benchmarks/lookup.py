@@ -0,0 +1,113 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Benchmarks for prefix loading and lookups, network set operations and file parsers
+"""
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Optional, Sequence
+
+from netlookup.base import clear_parsed_file_cache
+from netlookup.network import Network
+from netlookup.prefixes import Prefixes
+from netlookup.protocols import Protocols
+from netlookup.services import Services
+
+from .common import (
+    MOCK_PLATFORM_DIRECTORY,
+    BenchmarkResults,
+    measure,
+    measure_latency,
+    measure_throughput,
+)
+from .data import prepare_data_set
+
+SUITE = 'lookup'
+
+PLATFORMS = (
+    'darwin',
+    'freebsd',
+    'linux',
+    'openbsd',
+)
+
+
+def run_prefixes(results: BenchmarkResults, size: Optional[int], queries: int, repeat: int) -> None:
+    """
+    Run benchmarks for Prefixes loading, lookups and vendor network set operations
+    """
+    with TemporaryDirectory() as tmpdir:
+        cache_directory = Path(tmpdir, 'cache')
+        hits, misses, mixed = prepare_data_set(cache_directory, size, queries)
+        prefixes = Prefixes(cache_directory=cache_directory)
+        count = len(prefixes)
+
+        results.add(SUITE, 'Prefixes.__init__', count, measure(
+            lambda: Prefixes(cache_directory=cache_directory), repeat=repeat
+        ))
+        results.add(SUITE, 'Prefixes.load', count, measure(prefixes.load, repeat=repeat))
+
+        results.add(SUITE, 'Prefixes.find hit', count, measure_latency(prefixes.find, hits))
+        results.add(SUITE, 'Prefixes.find miss', count, measure_latency(prefixes.find, misses))
+        results.add(SUITE, 'Prefixes.find bulk', count, measure_throughput(prefixes.find, mixed))
+
+        vendor = max(prefixes.vendors, key=len)
+        removed = [prefix.cidr for prefix in vendor.__networks__[:10]]
+        results.add(SUITE, f'NetworkSet.merged {vendor.type}', len(vendor), measure(
+            lambda: vendor.merged, repeat=repeat
+        ))
+        results.add(SUITE, f'NetworkSet.substract {vendor.type}', len(vendor), measure(
+            lambda: vendor.substract(removed), repeat=repeat
+        ))
+
+
+def run_subnet(results: BenchmarkResults, repeat: int) -> None:
+    """
+    Run benchmarks for splitting networks to subnets
+    """
+    network = Network('10.0.0.0/8')
+    prefixlen = 24
+    count = network.subnet_count(prefixlen)
+    results.add(SUITE, 'Network.subnet', count, measure(
+        lambda: list(network.subnet(prefixlen)), repeat=repeat
+    ))
+    results.add(SUITE, 'Network.iter_subnet_values', count, measure(
+        lambda: list(network.iter_subnet_values(prefixlen)), repeat=repeat
+    ))
+    subnets = Network('2001:db8::/32').subnet(64, lazy=True)
+    results.add(SUITE, 'SubnetSequence index', subnets.count, measure(
+        lambda: subnets[1000000], repeat=repeat, number=1000
+    ))
+
+
+def run_parsers(results: BenchmarkResults, repeat: int) -> None:
+    """
+    Run benchmarks for parsing services and protocols files
+    """
+    for name in PLATFORMS:
+        for loader_class in (Services, Protocols):
+            path = MOCK_PLATFORM_DIRECTORY.joinpath(name, loader_class.__name__.lower())
+
+            def load_cold(loader_class=loader_class, path=path):
+                clear_parsed_file_cache()
+                return loader_class(path)
+
+            count = len(load_cold())
+            results.add(SUITE, f'{loader_class.__name__} {name} parse', count, measure(load_cold, repeat=repeat))
+            results.add(SUITE, f'{loader_class.__name__} {name} cached', count, measure(
+                lambda loader_class=loader_class, path=path: loader_class(path), repeat=repeat
+            ))
+    clear_parsed_file_cache()
+
+
+def run(results: BenchmarkResults, sizes: Sequence[Optional[int]], queries: int, repeat: int) -> None:
+    """
+    Run lookup benchmark suite
+    """
+    for size in sizes:
+        run_prefixes(results, size, queries, repeat)
+    run_subnet(results, repeat)
+    run_parsers(results, repeat)
@@ -0,0 +1,165 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Local HTTP and DNS TXT servers standing in for vendor prefix data sources
+
+Both servers listen on loopback address on a random port and serve static payloads from
+a background thread, so vendor network set fetches can be benchmarked offline.
+"""
+import socketserver
+import threading
+
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from dns import message, rcode, rdataclass, rdatatype, rrset
+from dns.rdtypes.ANY.TXT import TXT
+
+LOCALHOST = '127.0.0.1'
+# Maximum length of a single DNS TXT record string
+MAX_TXT_STRING_LENGTH = 255
+
+
+class PayloadRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler returning static payloads by request path
+    """
+    server: 'LocalHTTPServer'
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Return payload for request path or NOT FOUND error
+        """
+        payload = self.server.payloads.get(self.path)
+        if payload is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """
+        Do not log requests
+        """
+
+
+class TXTRequestHandler(socketserver.BaseRequestHandler):
+    """
+    DNS request handler returning static TXT records by query name
+    """
+    server: 'LocalDNSServer'
+
+    def handle(self) -> None:
+        """
+        Return TXT record for query name or NXDOMAIN error
+        """
+        data, sock = self.request
+        query = message.from_wire(data)
+        response = message.make_response(query)
+        question = query.question[0]
+        record = self.server.records.get(question.name.to_text().rstrip('.'))
+        if record is None or question.rdtype != rdatatype.TXT:
+            response.set_rcode(rcode.NXDOMAIN)
+        else:
+            rdata = TXT(rdataclass.IN, rdatatype.TXT, [record.encode('utf-8')])
+            response.answer.append(rrset.from_rdata(question.name, 60, rdata))
+        sock.sendto(response.to_wire(), self.client_address)
+
+
+class LocalServer:
+    """
+    Common base class for local servers running in a background thread
+    """
+    server: Optional[socketserver.BaseServer]
+    thread: Optional[threading.Thread]
+
+    def __init__(self) -> None:
+        self.server = None
+        self.thread = None
+
+    def __enter__(self) -> 'LocalServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        """
+        Port the server is listening on
+        """
+        return self.server.server_address[1]
+
+    def create_server(self) -> socketserver.BaseServer:
+        """
+        Create the server object
+        """
+        raise NotImplementedError('create_server() must be implemented in child class')
+
+    def start(self) -> None:
+        """
+        Start serving requests in a background thread
+        """
+        self.server = self.create_server()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the server and wait for the background thread to exit
+        """
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+        self.thread = None
+
+
+class LocalHTTPServer(LocalServer):
+    """
+    Local HTTP server for static payloads by request path
+    """
+    payloads: Dict[str, bytes]
+
+    def __init__(self, payloads: Dict[str, bytes]) -> None:
+        super().__init__()
+        self.payloads = payloads
+
+    def create_server(self) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer((LOCALHOST, 0), PayloadRequestHandler)
+        server.payloads = self.payloads
+        return server
+
+    def url(self, path: str) -> str:
+        """
+        Return URL for a payload path
+        """
+        return f'http://{LOCALHOST}:{self.port}{path}'
+
+
+class LocalDNSServer(LocalServer):
+    """
+    Local UDP DNS server for static TXT records by name
+    """
+    records: Dict[str, str]
+
+    def __init__(self, records: Dict[str, str]) -> None:
+        super().__init__()
+        for name, record in records.items():
+            if len(record) > MAX_TXT_STRING_LENGTH:
+                raise ValueError(f'TXT record for {name} is longer than {MAX_TXT_STRING_LENGTH} characters')
+        self.records = {name.rstrip('.'): record for name, record in records.items()}
+
+    def create_server(self) -> socketserver.ThreadingUDPServer:
+        server = socketserver.ThreadingUDPServer((LOCALHOST, 0), TXTRequestHandler)
+        server.records = self.records
+        return server
@@ -0,0 +1,292 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Synthetic prefix set generator for scale testing
+
+Generates network set cache files in the same JSON format as NetworkSet.save() with
+overlapping nested prefixes, AWS style region, service and border group attributes and
+mixed IPv4 and IPv6 networks, plus address query streams with tunable hit ratio and
+skewed prefix popularity. Output is deterministic for a given seed.
+
+Run as script to write cache files and a query file:
+
+    python -m benchmarks.synthetic --count 1000000 --directory /tmp/cache --queries 100000
+"""
+import argparse
+import itertools
+import json
+import random
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from netlookup.constants import IPV4_VERSION, IPV6_VERSION, MAX_PREFIX_LEN_IPV4, MAX_PREFIX_LEN_IPV6
+from netlookup.network import Network, format_address
+from netlookup.network_sets.aws import AWS, SKIP_SERVICE_NAMES
+from netlookup.network_sets.cloudflare import Cloudflare
+from netlookup.network_sets.google import GoogleCloud, GoogleServices
+
+# Network sets with relative share of generated prefixes, roughly matching real data
+VENDOR_WEIGHTS = (
+    (AWS, 92),
+    (GoogleCloud, 4),
+    (GoogleServices, 2),
+    (Cloudflare, 2),
+)
+
+AWS_REGIONS = (
+    'GLOBAL',
+    'af-south-1',
+    'ap-east-1',
+    'ap-northeast-1',
+    'ap-northeast-2',
+    'ap-south-1',
+    'ap-southeast-1',
+    'ap-southeast-2',
+    'ca-central-1',
+    'eu-central-1',
+    'eu-north-1',
+    'eu-south-1',
+    'eu-west-1',
+    'eu-west-2',
+    'eu-west-3',
+    'me-south-1',
+    'sa-east-1',
+    'us-east-1',
+    'us-east-2',
+    'us-west-1',
+    'us-west-2',
+)
+# AWS services with relative weights, matching the distribution in real data
+AWS_SERVICES = (
+    ('AMAZON', 470),
+    ('EC2', 100),
+    ('ROUTE53_RESOLVER', 55),
+    ('S3', 25),
+    ('API_GATEWAY', 17),
+    ('CLOUDFRONT', 13),
+    ('GLOBALACCELERATOR', 9),
+    ('DYNAMODB', 8),
+    ('WORKSPACES_GATEWAYS', 6),
+    ('CODEBUILD', 5),
+    ('EBS', 5),
+)
+# Local zone suffixes used for network border groups
+AWS_BORDER_GROUP_ZONES = (
+    'bos-1',
+    'chi-1',
+    'dfw-1',
+    'lax-1',
+    'mia-1',
+)
+
+UPDATED_BASE = datetime(2023, 1, 1)
+
+# Ranges never used for generated prefixes, used for lookup misses
+MISS_NETWORKS = {
+    IPV4_VERSION: Network('240.0.0.0/4'),
+    IPV6_VERSION: Network('2001:db8::/32'),
+}
+# Ranges used for generated top level prefixes
+PREFIX_RANGES = {
+    IPV4_VERSION: (Network('1.0.0.0/8').first, Network('223.0.0.0/8').last, 12, 24),
+    IPV6_VERSION: (Network('2000::/3').first, Network('2000::/3').last, 32, 48),
+}
+# Maximum extra prefix length for nested prefixes and largest generated prefix length
+NESTED_PREFIX_MAX_DEPTH = 8
+MAX_PREFIX_LEN = {
+    IPV4_VERSION: MAX_PREFIX_LEN_IPV4,
+    IPV6_VERSION: MAX_PREFIX_LEN_IPV6 // 2,
+}
+
+
+class SyntheticPrefixSet:
+    """
+    Deterministic synthetic set of vendor network prefixes
+    """
+    count: int
+    seed: int
+    ipv6_ratio: float
+    nested_ratio: float
+    networks: List[Tuple[int, int, int]]
+    records: Dict[str, List[dict]]
+
+    def __init__(self,
+                 count: int,
+                 seed: int = 0,
+                 ipv6_ratio: float = 0.2,
+                 nested_ratio: float = 0.3) -> None:
+        self.count = count
+        self.seed = seed
+        self.ipv6_ratio = ipv6_ratio
+        self.nested_ratio = nested_ratio
+        self.updated = UPDATED_BASE + timedelta(seconds=seed)
+        self.networks = []
+        self.records = {network_set.type: [] for network_set, _weight in VENDOR_WEIGHTS}
+        self.__generate__()
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+    def __random_network__(self, rng: random.Random, version: int) -> Tuple[int, int]:
+        """
+        Return random top level network value and prefix length, outside miss ranges
+        """
+        first, last, min_prefixlen, max_prefixlen = PREFIX_RANGES[version]
+        bits = MAX_PREFIX_LEN_IPV4 if version == IPV4_VERSION else MAX_PREFIX_LEN_IPV6
+        miss = MISS_NETWORKS[version]
+        while True:
+            prefixlen = rng.randint(min_prefixlen, max_prefixlen)
+            value = rng.randint(first, last) & ~((1 << (bits - prefixlen)) - 1)
+            if not miss.first <= value <= miss.last:
+                return value, prefixlen
+
+    def __nested_network__(self, rng: random.Random, parent: Tuple[int, int, int]) -> Tuple[int, int]:
+        """
+        Return random network value and prefix length within parent network
+        """
+        value, prefixlen, version = parent
+        bits = MAX_PREFIX_LEN_IPV4 if version == IPV4_VERSION else MAX_PREFIX_LEN_IPV6
+        max_prefixlen = MAX_PREFIX_LEN[version]
+        if prefixlen >= max_prefixlen:
+            return value, prefixlen
+        child_prefixlen = min(max_prefixlen, prefixlen + rng.randint(1, NESTED_PREFIX_MAX_DEPTH))
+        offset = rng.getrandbits(child_prefixlen - prefixlen) << (bits - child_prefixlen)
+        return value + offset, child_prefixlen
+
+    def __aws_attributes__(self, rng: random.Random, service_names: List[str], weights: List[int]) -> dict:
+        """
+        Return random AWS prefix attributes
+        """
+        region = AWS_REGIONS[rng.randrange(len(AWS_REGIONS))]
+        border_group = region
+        if region != 'GLOBAL' and rng.random() < 0.05:
+            border_group = f'{region}-{AWS_BORDER_GROUP_ZONES[rng.randrange(len(AWS_BORDER_GROUP_ZONES))]}'
+        services = []
+        for service in rng.choices(service_names, weights=weights, k=rng.randint(1, 2)):
+            if service not in SKIP_SERVICE_NAMES and service not in services:
+                services.append(service)
+        return {
+            'region': region,
+            'services': services,
+            'network_border_group': border_group,
+        }
+
+    def __generate__(self) -> None:
+        """
+        Generate the synthetic prefixes
+        """
+        rng = random.Random(self.seed)
+        vendors = [network_set.type for network_set, _weight in VENDOR_WEIGHTS]
+        vendor_weights = list(itertools.accumulate(weight for _network_set, weight in VENDOR_WEIGHTS))
+        service_names = [service for service, _weight in AWS_SERVICES]
+        service_weights = [weight for _service, weight in AWS_SERVICES]
+
+        seen = set()
+        while len(self.networks) < self.count:
+            if self.networks and rng.random() < self.nested_ratio:
+                parent = self.networks[rng.randrange(len(self.networks))]
+                version = parent[2]
+                value, prefixlen = self.__nested_network__(rng, parent)
+            else:
+                version = IPV6_VERSION if rng.random() < self.ipv6_ratio else IPV4_VERSION
+                value, prefixlen = self.__random_network__(rng, version)
+            if (version, value, prefixlen) in seen:
+                continue
+            seen.add((version, value, prefixlen))
+            self.networks.append((value, prefixlen, version))
+
+            vendor = rng.choices(vendors, cum_weights=vendor_weights)[0]
+            record = {
+                'type': vendor,
+                'cidr': f'{format_address(value, version)}/{prefixlen}',
+            }
+            if vendor == AWS.type:
+                record.update(self.__aws_attributes__(rng, service_names, service_weights))
+            self.records[vendor].append(record)
+
+    def as_dict(self, vendor: str) -> dict:
+        """
+        Return network set cache data for a vendor
+        """
+        return {
+            'updated': self.updated.isoformat(),
+            'networks': self.records[vendor],
+        }
+
+    def write(self, directory: Path) -> List[Path]:
+        """
+        Write network set cache files to directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for network_set, _weight in VENDOR_WEIGHTS:
+            path = directory.joinpath(network_set.cache_filename)
+            with path.open('w', encoding='utf-8') as filedescriptor:
+                json.dump(self.as_dict(network_set.type), filedescriptor)
+            paths.append(path)
+        return paths
+
+    def queries(self,
+                count: int,
+                hit_ratio: float = 0.9,
+                skew: float = 1.1,
+                seed: Optional[int] = None) -> List[str]:
+        """
+        Return list of addresses for lookups
+
+        Matching addresses are selected from prefixes with Zipf distribution with specified
+        skew, so a few prefixes receive most of the lookups. Missing addresses are selected
+        from ranges never used for generated prefixes.
+        """
+        rng = random.Random(self.seed if seed is None else seed)
+        cum_weights = list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, len(self.networks) + 1)))
+        popular = list(self.networks)
+        rng.shuffle(popular)
+
+        addresses = []
+        for _index in range(count):
+            if popular and rng.random() < hit_ratio:
+                value, prefixlen, version = rng.choices(popular, cum_weights=cum_weights)[0]
+                bits = MAX_PREFIX_LEN_IPV4 if version == IPV4_VERSION else MAX_PREFIX_LEN_IPV6
+                address = value + rng.getrandbits(bits - prefixlen) if prefixlen < bits else value
+            else:
+                version = IPV6_VERSION if rng.random() < self.ipv6_ratio else IPV4_VERSION
+                miss = MISS_NETWORKS[version]
+                address = rng.randint(miss.first, miss.last)
+            addresses.append(format_address(address, version))
+        return addresses
+
+
+def main(argv: Optional[List[str]] = None) -> SyntheticPrefixSet:
+    """
+    Write synthetic network set cache files and lookup queries
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.synthetic', description=__doc__)
+    parser.add_argument('--count', type=int, required=True, help='Number of prefixes')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--ipv6-ratio', type=float, default=0.2, help='Share of IPv6 prefixes')
+    parser.add_argument('--nested-ratio', type=float, default=0.3, help='Share of nested prefixes')
+    parser.add_argument('--directory', required=True, help='Directory for network set cache files')
+    parser.add_argument('--queries', type=int, default=0, help='Number of lookup queries')
+    parser.add_argument('--hit-ratio', type=float, default=0.9, help='Share of matching lookup queries')
+    parser.add_argument('--skew', type=float, default=1.1, help='Zipf skew of matching lookup queries')
+    parser.add_argument('--queries-file', help='Query output file, default queries.txt in directory')
+    args = parser.parse_args(argv)
+
+    prefix_set = SyntheticPrefixSet(args.count, args.seed, args.ipv6_ratio, args.nested_ratio)
+    prefix_set.write(Path(args.directory))
+    if args.queries:
+        path = Path(args.queries_file) if args.queries_file else Path(args.directory, 'queries.txt')
+        queries = prefix_set.queries(args.queries, args.hit_ratio, args.skew)
+        path.write_text(''.join(f'{address}\n' for address in queries), encoding='utf-8')
+    return prefix_set
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+asyncio facade for network prefix caches
+
+Loading and saving cache files run in worker threads. Google DNS records are queried with
+the dnspython asyncio resolver, and HTTP downloads of other vendors run in worker threads.
+
+Loads and updates build new objects and replace the served Prefixes object when done, so
+lookups from the event loop never see partially loaded data. With history enabled, vendor
+prefixes are recorded to the history store in worker threads after each vendor is updated.
+"""
+import asyncio
+
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Union, TYPE_CHECKING
+
+from .exceptions import NetworkError
+from .heavy_hitters import HeavyHitters
+from .network import Network
+from .network_sets.base import NetworkSet
+from .prefixes import NETWORK_SET_CLASSES, Prefixes
+from .stats import PrefixesStatistics
+
+# History module imports diff module, which imports vendor network set classes from prefixes
+if TYPE_CHECKING:
+    from .history import HistoryStore
+
+# Number of addresses looked up between yielding control to the event loop
+DEFAULT_LOOKUP_CHUNK_SIZE = 1000
+
+
+class AsyncPrefixes:
+    """
+    Asynchronous loader and lookup for known IP address prefix caches for public clouds
+
+    Create with 'await AsyncPrefixes.create()' or call load() before lookups.
+    """
+    cache_directory: Optional[Union[str, Path]]
+    lookup_cache_size: int
+    heavy_hitters: Optional[HeavyHitters]
+    chunk_size: int
+    stats: Optional[PrefixesStatistics]
+    history: Optional['HistoryStore']
+    prefixes: Optional[Prefixes]
+
+    def __init__(self,
+                 cache_directory: Optional[Union[str, Path]] = None,
+                 stats: bool = False,
+                 lookup_cache_size: int = 0,
+                 heavy_hitters: Optional[HeavyHitters] = None,
+                 chunk_size: int = DEFAULT_LOOKUP_CHUNK_SIZE,
+                 history: bool = False) -> None:
+        if chunk_size < 1:
+            raise NetworkError(f'Invalid lookup chunk size {chunk_size}')
+        self.cache_directory = cache_directory
+        self.lookup_cache_size = lookup_cache_size
+        self.heavy_hitters = heavy_hitters
+        self.chunk_size = chunk_size
+        self.stats = PrefixesStatistics() if stats else None
+        # History store is created with the first loaded prefixes and shared over reloads
+        self.history = None
+        self.__history_enabled__ = history
+        self.prefixes = None
+
+    def __len__(self) -> int:
+        return len(self.prefixes) if self.prefixes is not None else 0
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> 'AsyncPrefixes':
+        """
+        Create prefixes and load cached networks
+        """
+        prefixes = cls(*args, **kwargs)
+        await prefixes.load()
+        return prefixes
+
+    @property
+    def vendors(self) -> List[NetworkSet]:
+        """
+        Vendor network sets of loaded prefixes
+        """
+        return self.__loaded__.vendors
+
+    @property
+    def __loaded__(self) -> Prefixes:
+        """
+        Return loaded prefixes, raising NetworkError if prefixes have not been loaded
+        """
+        if self.prefixes is None:
+            raise NetworkError('Prefixes are not loaded')
+        return self.prefixes
+
+    def __create_prefixes__(self) -> Prefixes:
+        """
+        Create and load prefixes object sharing statistics, heavy hitters trackers and history
+        """
+        prefixes = Prefixes(
+            cache_directory=self.cache_directory,
+            stats=self.stats if self.stats is not None else False,
+            lookup_cache_size=self.lookup_cache_size,
+            heavy_hitters=self.heavy_hitters,
+            history=self.history if self.history is not None else self.__history_enabled__,
+        )
+        self.history = prefixes.history
+        return prefixes
+
+    def __create_vendor__(self, network_set: type) -> NetworkSet:
+        """
+        Create vendor network set for updating cache file
+        """
+        return network_set(
+            cache_directory=self.__loaded__.cache_directory,
+            stats=self.stats.vendor(network_set.type) if self.stats is not None else None,
+        )
+
+    async def load(self) -> None:
+        """
+        Load cached networks in a worker thread and start serving them
+        """
+        self.prefixes = await asyncio.to_thread(self.__create_prefixes__)
+
+    async def update(self) -> None:
+        """
+        Fetch and update cached prefix data for all vendors concurrently, then reload prefixes
+        """
+        if self.prefixes is None:
+            await self.load()
+
+        async def update_vendor(network_set: type) -> None:
+            vendor = await asyncio.to_thread(self.__create_vendor__, network_set)
+            try:
+                await vendor.update_async()
+            except Exception as error:
+                raise NetworkError(f'Error updating {vendor} data: {error}') from error
+            if self.history is not None:
+                await asyncio.to_thread(self.history.record, vendor)
+
+        results = await asyncio.gather(
+            *(update_vendor(network_set) for network_set in NETWORK_SET_CLASSES),
+            return_exceptions=True,
+        )
+        await self.load()
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def get_vendor(self, name: str) -> NetworkSet:
+        """
+        Get vendor prefix set
+        """
+        return self.__loaded__.get_vendor(name)
+
+    def find(self, value: Any, types: Optional[Union[str, Sequence[str]]] = None) -> Optional[Network]:
+        """
+        Find address in networks, optionally only in prefixes of specified vendor types
+
+        Lookups do not block on I/O and are safe to call from the event loop.
+        """
+        return self.__loaded__.find(value, types=types)
+
+    async def find_many(self,
+                        values: Iterable[Any],
+                        types: Optional[Union[str, Sequence[str]]] = None) -> List[Optional[Network]]:
+        """
+        Find addresses in networks, yielding control to the event loop between chunks
+
+        NetworkError is raised for invalid addresses.
+        """
+        prefixes = self.__loaded__
+        results = []
+        for index, value in enumerate(values):
+            if index and index % self.chunk_size == 0:
+                await asyncio.sleep(0)
+            results.append(prefixes.find(value, types=types))
+        return results
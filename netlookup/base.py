@@ -6,10 +6,32 @@
 """
 Common base classes for network info text file parsers
 """
+import hashlib
+import pickle
 import re
 from collections.abc import Sequence
 from pathlib import Path
-from typing import Any, Iterator, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Process wide cache of parsed text files, keyed by loader class and file path
+PARSED_FILE_CACHE: Dict[Tuple[str, str], 'ParsedFile'] = {}
+
+
+def clear_parsed_file_cache() -> None:
+    """
+    Clear process wide cache of parsed text files
+    """
+    PARSED_FILE_CACHE.clear()
+
+
+def split_fields(line: str, maxsplit: int = -1) -> Tuple[List[str], str]:
+    """
+    Split line to whitespace separated data fields and comment in single pass
+
+    Returns list of data fields and the comment after first # character
+    """
+    data, _separator, comment = line.partition('#')
+    return data.split(None, maxsplit), comment
 
 
 def match_patterns(patterns: List[re.Pattern], line: str) -> dict:
@@ -24,6 +46,24 @@ def match_patterns(patterns: List[re.Pattern], line: str) -> dict:
     raise ValueError(f'Error parsing line {line}')
 
 
+# pylint: disable=too-few-public-methods
+class ParsedFile:
+    """
+    Parsed items and lookup indexes for a text data file with file mtime and size
+    """
+    def __init__(self, mtime: int, size: int, items: List[Any], indexes: Dict[str, Any]) -> None:
+        self.mtime = mtime
+        self.size = size
+        self.items = items
+        self.indexes = indexes
+
+    def matches(self, mtime: int, size: int) -> bool:
+        """
+        Check if the parsed data matches file with specified mtime and size
+        """
+        return self.mtime == mtime and self.size == size
+
+
 # pylint: disable=too-few-public-methods
 class FileItem:
     """
@@ -43,11 +83,21 @@ class FileItem:
 class NetworkDataTextFile(Sequence):
     """
     Text file with lines of network data, parsed per lined
+
+    Parsed items and lookup indexes are cached in process for each file path and reused as
+    long as the file modification time and size are not changed. If cache_directory is given,
+    parsed data is also cached as pickle files in the directory for other processes.
+
+    The items are shared between objects loaded from same file and must not be modified.
     """
     __item_loader__class__ = FileItem
 
-    def __init__(self, path: str) -> None:
-        self.__items__ = self.__load__(Path(path))
+    def __init__(self, path: str, cache_directory: Optional[str] = None) -> None:
+        self.cache_directory = Path(cache_directory).expanduser() if cache_directory is not None else None
+        parsed = self.__load_cached__(Path(path))
+        self.__items__ = parsed.items
+        for attr, value in parsed.indexes.items():
+            setattr(self, attr, value)
 
     def __getitem__(self, index: int):
         return self.__items__.__getitem__(index)
@@ -58,15 +108,89 @@ class NetworkDataTextFile(Sequence):
     def __len__(self) -> int:
         return len(self.__items__)
 
+    def __get_pickle_cache_file__(self, path: Path) -> Optional[Path]:
+        """
+        Return path to pickle cache file for parsed data file
+        """
+        if self.cache_directory is None:
+            return None
+        digest = hashlib.sha1(str(path).encode('utf-8')).hexdigest()
+        return self.cache_directory.joinpath(f'{self.__class__.__name__.lower()}-{digest}.pickle')
+
+    def __read_pickle_cache__(self, path: Path, mtime: int, size: int) -> Optional[ParsedFile]:
+        """
+        Read parsed data from pickle cache file if it matches the data file
+
+        Unreadable or stale cache files are ignored
+        """
+        cache_file = self.__get_pickle_cache_file__(path)
+        if cache_file is None or not cache_file.is_file():
+            return None
+        try:
+            with cache_file.open('rb') as handle:
+                path_value, parsed = pickle.load(handle)
+            if path_value == str(path) and parsed.matches(mtime, size):
+                return parsed
+        except Exception:  # pylint: disable=broad-except
+            pass
+        return None
+
+    def __write_pickle_cache__(self, path: Path, parsed: ParsedFile) -> None:
+        """
+        Write parsed data to pickle cache file
+
+        Errors writing the cache file are ignored, the cache is only an optimization
+        """
+        cache_file = self.__get_pickle_cache_file__(path)
+        if cache_file is None:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmpfile = cache_file.with_suffix('.tmp')
+            with tmpfile.open('wb') as handle:
+                pickle.dump((str(path), parsed), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            tmpfile.replace(cache_file)
+        except OSError:
+            pass
+
+    def __load_cached__(self, path: Path) -> ParsedFile:
+        """
+        Load parsed data from the process cache, pickle cache or by parsing the text data file
+        """
+        path = path.resolve()
+        stat = path.stat()
+        key = (self.__class__.__qualname__, str(path))
+        parsed = PARSED_FILE_CACHE.get(key, None)
+        if parsed is not None and parsed.matches(stat.st_mtime_ns, stat.st_size):
+            return parsed
+
+        parsed = self.__read_pickle_cache__(path, stat.st_mtime_ns, stat.st_size)
+        if parsed is None:
+            items = self.__load__(path)
+            parsed = ParsedFile(stat.st_mtime_ns, stat.st_size, items, self.__build_indexes__(items))
+            self.__write_pickle_cache__(path, parsed)
+        PARSED_FILE_CACHE[key] = parsed
+        return parsed
+
+    def __build_indexes__(self, items: List[Any]) -> Dict[str, Any]:
+        """
+        Build lookup indexes for parsed items
+
+        Returns dictionary of attribute names and index values set to the object. By
+        default no indexes are built, extend in child class.
+        """
+        return {}
+
     def __load__(self, path: Path) -> List[Any]:
         """
         Load items from the text data file
         """
         items = []
+        loader = self.__item_loader__class__.from_line
         with path.open('r', encoding='UTF-8') as handle:
-            for line in handle.readlines():
+            for line in handle.read().splitlines():
                 line = line.strip()
                 if line == '' or line.startswith('#'):
                     continue
-                items.append(self.__item_loader__class__.from_line(line))
+                items.append(loader(line))
         return items
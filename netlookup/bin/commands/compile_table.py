@@ -0,0 +1,58 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup compile-table'
+"""
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+
+from ...exceptions import NetworkError
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from .base import BaseCommand
+
+
+class CompileTable(BaseCommand):
+    """
+    Command for function for 'netlookup compile-table' CLI command
+    """
+    name: str = 'compile-table'
+    short_description: str = 'Compile IPv4 prefix lookup table from prefix caches'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory and output file
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Lookup table file, by default ipv4-lookup-table.bin in the cache directory'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup compile-table' command
+        """
+        # pylint: disable=import-outside-toplevel
+        from ...ipv4_table import IPV4_TABLE_FILENAME, IPv4LookupTable
+        from ...prefixes import Prefixes
+
+        output = Path(args.output) if args.output else Path(args.cache_directory, IPV4_TABLE_FILENAME)
+        try:
+            table = IPv4LookupTable.from_prefixes(Prefixes(cache_directory=args.cache_directory))
+            table.save(output)
+        except NetworkError as error:
+            self.exit(1, f'Error compiling IPv4 lookup table: {error}')
+
+        details = table.as_dict()
+        self.message(
+            f'Compiled {details["prefixes"]} IPv4 prefixes with {details["second_level_tables"]} '
+            f'second level tables, {details["size"]} bytes to {output}'
+        )
@@ -0,0 +1,92 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup diff'
+"""
+import json
+import sys
+
+from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING
+
+from ...exceptions import NetworkError
+from .base import BaseCommand
+
+# Diff module loads vendor network set modules, import it only when the command runs
+if TYPE_CHECKING:
+    from ...diff import SnapshotDiff
+
+OUTPUT_FORMATS = (
+    'text',
+    'json',
+)
+
+
+def format_text(diff: 'SnapshotDiff') -> str:
+    """
+    Format snapshot differences as human readable text
+    """
+    lines = [f'+ {network}' for network in diff.added]
+    lines.extend(f'- {network}' for network in diff.removed)
+    lines.extend(f'~ {change}' for change in diff.changed)
+    for version, delta in diff.address_delta.items():
+        lines.append(
+            f'IPv{version} addresses added {diff.addresses_added[version]} '
+            f'removed {diff.addresses_removed[version]} delta {delta:+d}'
+        )
+    return ''.join(f'{line}\n' for line in lines)
+
+
+class Diff(BaseCommand):
+    """
+    Command for function for 'netlookup diff' CLI command
+    """
+    name: str = 'diff'
+    short_description: str = 'Show differences between prefix cache snapshots'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for snapshots, vendor types and output format
+        """
+        parser.add_argument(
+            '-t', '--type',
+            dest='types',
+            action='append',
+            help='Only compare prefixes of vendor type, for example aws. May be repeated.'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with error code 2 if snapshots differ'
+        )
+        parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default='text',
+            help='Output format'
+        )
+        parser.add_argument('old', help='Old cache file or cache directory')
+        parser.add_argument('new', help='New cache file or cache directory')
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup diff' command
+        """
+        from ...diff import diff_snapshots  # pylint: disable=import-outside-toplevel
+
+        try:
+            diff = diff_snapshots(args.old, args.new, types=args.types)
+        except NetworkError as error:
+            self.exit(1, f'Error comparing snapshots: {error}')
+
+        if args.format == 'json':
+            sys.stdout.write(f'{json.dumps(diff.as_dict(), indent=2)}\n')
+        else:
+            sys.stdout.write(format_text(diff))
+        sys.stdout.flush()
+        if args.check and len(diff):
+            self.exit(2)
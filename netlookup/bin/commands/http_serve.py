@@ -0,0 +1,75 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup http-serve'
+"""
+import signal
+
+from argparse import ArgumentParser, Namespace
+
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from .base import BaseCommand
+
+
+class HTTPServe(BaseCommand):
+    """
+    Command for function for 'netlookup http-serve' CLI command
+    """
+    name: str = 'http-serve'
+    short_description: str = 'Serve prefix lookups over HTTP as JSON'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory, listen address and cache reload interval
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument('--address', default='127.0.0.1', help='Address to listen on')
+        parser.add_argument('--port', type=int, default=8053, help='Port to listen on')
+        parser.add_argument(
+            '--reload-interval',
+            type=float,
+            default=5.0,
+            help='Seconds between checks for prefix cache file changes, 0 to disable reloading'
+        )
+        parser.add_argument(
+            '--lookup-cache-size',
+            type=int,
+            default=0,
+            help='Number of lookup results to keep in LRU cache'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup http-serve' command
+        """
+        # pylint: disable=import-outside-toplevel
+        from ...http_service import LookupHTTPService
+
+        try:
+            service = LookupHTTPService(
+                cache_directory=args.cache_directory,
+                address=args.address,
+                port=args.port,
+                reload_interval=args.reload_interval,
+                lookup_cache_size=args.lookup_cache_size,
+            )
+            service.start()
+        except Exception as error:
+            self.exit(1, f'Error starting lookup service: {error}')
+
+        signal.signal(signal.SIGTERM, lambda *args: service.stop())
+        self.message(f'Serving {len(service.prefixes)} prefixes on {service.url}')
+        try:
+            service.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.stop()
@@ -6,11 +6,40 @@
 """
 CLI command 'netlookup info'
 """
+import csv
+import sys
+
 from argparse import ArgumentParser, Namespace
+from typing import Any, Dict, Iterator, TextIO
 
-from ...network import Network
+from ...encoders import NetworkDataEncoder
+from ...network import NETWORK_DETAILS_FIELDS, Network
 from .base import BaseCommand
 
+OUTPUT_FORMATS = (
+    'text',
+    'json',
+    'ndjson',
+    'csv',
+)
+# Number of networks processed between writes to output
+OUTPUT_BUFFER_NETWORKS = 1024
+
+# Labels for fields in text output format
+TEXT_OUTPUT_LABELS = {
+    'cidr': 'CIDR',
+    'netmask': 'Netmask',
+    'network': 'Network',
+    'broadcast': 'Broadcast',
+    'first_host': 'First host',
+    'last_host': 'Last host',
+    'total_hosts': 'Total hosts',
+    'next': 'Next',
+    'previous': 'Previous',
+    'bits': 'Bits',
+    'reverse_dns': 'Reverse DNS',
+}
+
 
 class Info(BaseCommand):
     """
@@ -19,33 +48,120 @@ class Info(BaseCommand):
     name = 'info'
     help = 'Show subnet info'
 
+    @staticmethod
+    def format_text(details: Dict[str, Any]) -> str:
+        """
+        Format network details as human readable text lines
+        """
+        lines = []
+        for field, label in TEXT_OUTPUT_LABELS.items():
+            value = details[field]
+            if value is None:
+                continue
+            if field == 'netmask':
+                value = f'{value} {details["netmask_hex"]}'
+            lines.append(f'{label:>13} {value}\n')
+        return ''.join(lines)
+
     def print_network_details(self, network: Network):
         """
         Show details for specified network
         """
-        first = network.first_host
-        last = network.last_host
-        self.message(f'         CIDR {network.cidr}')
-        self.message(f'      Netmask {network.netmask} {network.netmask_hex_string}')
-        self.message(f'      Network {network.network}')
-        if network.broadcast is not None:
-            self.message(f'    Broadcast {network.broadcast}')
-        if first is not None:
-            self.message(f'   First host {network.first_host}')
-        if last is not None:
-            self.message(f'    Last host {network.last_host}')
-        self.message(f'  Total hosts {network.total_hosts}')
-        self.message(f'         Next {network.next()}')  # noqa
-        self.message(f'     Previous {network.previous()}')
-        self.message(f'         Bits {network.network.bits()}')
-        self.message(f'  Reverse DNS {network.network.reverse_dns}')
+        sys.stdout.write(self.format_text(network.details()))
+        sys.stdout.flush()
 
     def register_parser_arguments(self, parser: ArgumentParser):
+        parser.add_argument('-f', '--file', help='Read subnets from file, one subnet per line')
+        parser.add_argument('--stdin', action='store_true', help='Read subnets from stdin, one subnet per line')
+        parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default='text',
+            help='Output format'
+        )
         parser.add_argument('subnets', nargs='*', help='Subnets to process')
 
+    def read_subnets(self, handle: TextIO) -> Iterator[Network]:
+        """
+        Read subnets from a file handle, skipping empty lines and comments
+
+        Errors parsing subnets are reported and the line is skipped.
+        """
+        for line in handle:
+            value = line.strip()
+            if not value or value.startswith('#'):
+                continue
+            try:
+                yield Network(value)
+            except Exception as error:
+                self.error(f'Error parsing subnet "{value}": {error}')
+
+    def iterate_networks(self, args: Namespace) -> Iterator[Network]:
+        """
+        Iterate networks from arguments, input file and stdin
+        """
+        yield from self.networks
+        if args.file:
+            try:
+                with open(args.file, 'r', encoding='utf-8') as handle:
+                    yield from self.read_subnets(handle)
+            except OSError as error:
+                self.exit(1, f'Error reading {args.file}: {error}')
+        if args.stdin:
+            yield from self.read_subnets(sys.stdin)
+
+    @staticmethod
+    def write_networks(handle: TextIO, networks: Iterator[Network], output_format: str) -> None:
+        """
+        Write details of networks to output in specified format, buffering output
+        """
+        encoder = NetworkDataEncoder()
+        writer = None
+        chunk = []
+
+        if output_format == 'json':
+            handle.write('[')
+        elif output_format == 'csv':
+            writer = csv.DictWriter(handle, fieldnames=NETWORK_DETAILS_FIELDS, lineterminator='\n')
+            writer.writeheader()
+
+        count = 0
+        for network in networks:
+            details = network.details()
+            if output_format == 'json':
+                prefix = ',\n  ' if count else '\n  '
+                chunk.append(f'{prefix}{encoder.encode(details)}')
+            elif output_format == 'ndjson':
+                chunk.append(f'{encoder.encode(details)}\n')
+            elif output_format == 'csv':
+                chunk.append(details)
+            else:
+                chunk.append(Info.format_text(details))
+            count += 1
+
+            if len(chunk) >= OUTPUT_BUFFER_NETWORKS:
+                Info.__write_chunk__(handle, writer, chunk)
+        Info.__write_chunk__(handle, writer, chunk)
+
+        if output_format == 'json':
+            handle.write('\n]\n' if count else ']\n')
+        handle.flush()
+
+    @staticmethod
+    def __write_chunk__(handle: TextIO, writer: csv.DictWriter, chunk: list) -> None:
+        """
+        Write a chunk of formatted network details to output and clear the chunk
+        """
+        if writer is not None:
+            writer.writerows(chunk)
+        else:
+            handle.write(''.join(chunk))
+        chunk.clear()
+
     def run(self, args: Namespace) -> None:
-        if not args.subnets:
+        if not args.subnets and not args.file and not args.stdin:
             self.exit(1, 'No subnets specified')
 
-        for network in self.networks:
-            self.print_network_details(network)
+        self.write_networks(sys.stdout, self.iterate_networks(args), args.format)
+        if self.errors:
+            self.exit(1)
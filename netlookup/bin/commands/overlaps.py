@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup overlaps'
+"""
+import json
+import sys
+
+from argparse import ArgumentParser, Namespace
+
+from ...exceptions import NetworkError
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from ...overlaps import OverlapReport
+from .base import BaseCommand
+
+OUTPUT_FORMATS = (
+    'text',
+    'json',
+)
+
+
+def format_text(report: OverlapReport, clusters: bool = False) -> str:
+    """
+    Format overlapping prefixes or clusters as human readable text
+    """
+    lines = []
+    if clusters:
+        for cluster in report.clusters:
+            lines.append(str(cluster))
+            lines.extend(f'    {network}' for network in cluster.networks)
+    else:
+        lines.extend(str(overlap) for overlap in report.overlaps)
+    return ''.join(f'{line}\n' for line in lines)
+
+
+class Overlaps(BaseCommand):
+    """
+    Command for function for 'netlookup overlaps' CLI command
+    """
+    name: str = 'overlaps'
+    short_description: str = 'Detect overlapping prefixes in prefix caches'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory, filters and output format
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument(
+            '-x', '--cross-vendor',
+            action='store_true',
+            help='Only report overlaps between prefixes of different vendors'
+        )
+        parser.add_argument(
+            '-c', '--clusters',
+            action='store_true',
+            help='Show clusters of overlapping prefixes instead of overlapping pairs'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with error code 2 if overlaps are found'
+        )
+        parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default='text',
+            help='Output format'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup overlaps' command
+        """
+        from ...prefixes import Prefixes  # pylint: disable=import-outside-toplevel
+
+        try:
+            report = Prefixes(cache_directory=args.cache_directory).overlaps(cross_vendor=args.cross_vendor)
+        except NetworkError as error:
+            self.exit(1, f'Error loading prefixes: {error}')
+
+        if args.format == 'json':
+            data = report.as_dict()
+            sys.stdout.write(f'{json.dumps(data["clusters"] if args.clusters else data["overlaps"], indent=2)}\n')
+        else:
+            sys.stdout.write(format_text(report, clusters=args.clusters))
+        sys.stdout.flush()
+        if args.check and report.overlaps:
+            self.exit(2)
@@ -7,11 +7,16 @@
 CLI command 'netlookup prefixes'
 """
 from argparse import ArgumentParser, Namespace
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, TYPE_CHECKING
 
-from ...prefixes import Prefixes
+from ...constants import NETLOOKUP_SOCKET_PATH
 from .base import BaseCommand
 
+# Prefixes loads vendor network set modules, import it only when the command runs
+if TYPE_CHECKING:
+    from ...prefixes import Prefixes
+
 
 class PrefixLookup(BaseCommand):
     """
@@ -19,23 +24,44 @@ class PrefixLookup(BaseCommand):
     """
     name: str = 'prefixes'
     short_description: str = 'Lookup prefixes'
-    __prefixes__: Optional[Prefixes] = None
+    history: bool = False
+    __prefixes__: Optional['Prefixes'] = None
 
     def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
         """
         Register address list arguments and update flags
         """
         parser.add_argument('-u', '--update', action='store_true', help='Update prefix cache')
+        parser.add_argument(
+            '--socket',
+            help=f'Look up addresses from lookup daemon socket, for example {NETLOOKUP_SOCKET_PATH}'
+        )
+        parser.add_argument(
+            '-t', '--type',
+            dest='types',
+            action='append',
+            help='Only look up prefixes of vendor type, for example cloudflare. May be repeated.'
+        )
+        parser.add_argument(
+            '--history',
+            action='store_true',
+            help='Record updated prefixes to prefix history'
+        )
+        parser.add_argument(
+            '--at',
+            help='Look up prefixes valid at ISO timestamp from prefix history, for example 2023-01-31T12:00'
+        )
         parser.add_argument('addresses', nargs='*', help='Prefixes to lookup')
         return parser
 
     @property
-    def prefixes(self) -> Prefixes:
+    def prefixes(self) -> 'Prefixes':
         """
         Return  a cached Prefixes object
         """
         if self.__prefixes__ is None:
-            self.__prefixes__ = Prefixes()
+            from ...prefixes import Prefixes  # pylint: disable=import-outside-toplevel
+            self.__prefixes__ = Prefixes(history=self.history)
         return self.__prefixes__
 
     def update_prefix_cache(self) -> None:
@@ -48,27 +74,57 @@ class PrefixLookup(BaseCommand):
         except Exception as error:
             self.exit(1, f'Error updating prefix caches: {error}')
 
-    def lookup_addresses(self, addresses: List[str]) -> None:
+    def lookup_addresses(self,
+                         addresses: List[str],
+                         types: Optional[List[str]] = None,
+                         at: Optional[datetime] = None) -> None:
         """
         Look up and print prefix addresses
         """
         for address in addresses:
             try:
-                address = self.prefixes.find(address)
+                address = self.prefixes.find(address, types=types, at=at)
                 if address:
                     self.message(address)
             except Exception as error:
                 self.error(f'Error looking up address "{address}": {error}')
 
+    def lookup_daemon_addresses(self, socket_path: str, addresses: List[str]) -> None:
+        """
+        Look up and print prefix addresses with the lookup daemon
+        """
+        from ...daemon import LookupClient  # pylint: disable=import-outside-toplevel
+        with LookupClient(socket_path) as client:
+            for address in addresses:
+                try:
+                    network = client.lookup(address)
+                    if network:
+                        self.message(network)
+                except Exception as error:
+                    self.error(f'Error looking up address "{address}": {error}')
+
     def run(self, args: Namespace) -> None:
         """
         Run 'netlookup prefixes' command
         """
         if not args.update and not args.addresses:
             self.exit(1, 'No prefixes specified')
+        if args.socket and args.types:
+            self.exit(1, 'Vendor types can not be used with lookup daemon socket')
+        if args.socket and args.at:
+            self.exit(1, 'History lookups can not be used with lookup daemon socket')
+        at = None
+        if args.at:
+            try:
+                at = datetime.fromisoformat(args.at)
+            except ValueError as error:
+                self.exit(1, f'Invalid timestamp {args.at}: {error}')
+        self.history = args.history or at is not None
         if args.update:
             self.update_prefix_cache()
-        if args.addresses:
-            self.lookup_addresses(args.addresses)
+        if args.addresses and args.socket:
+            self.lookup_daemon_addresses(args.socket, args.addresses)
+        elif args.addresses:
+            self.lookup_addresses(args.addresses, args.types, at)
         if self.errors:
             self.exit(1)
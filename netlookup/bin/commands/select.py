@@ -0,0 +1,81 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup select'
+"""
+import json
+import sys
+
+from argparse import ArgumentParser, Namespace
+
+from ...exceptions import NetworkError
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from ...query import parse_query
+from .base import BaseCommand
+
+OUTPUT_FORMATS = (
+    'text',
+    'json',
+)
+
+
+class Select(BaseCommand):
+    """
+    Command for function for 'netlookup select' CLI command
+    """
+    name: str = 'select'
+    short_description: str = 'Select prefixes by vendor type and attributes'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory, output format and query terms
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument(
+            '-m', '--merged',
+            action='store_true',
+            help='Show minimal merged CIDR cover of matching prefixes'
+        )
+        parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default='text',
+            help='Output format'
+        )
+        parser.add_argument(
+            'terms',
+            nargs='*',
+            help='Query terms as attribute=value, for example type=aws region=eu-* services=S3,EC2'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup select' command
+        """
+        from ...prefixes import Prefixes  # pylint: disable=import-outside-toplevel
+
+        try:
+            query = parse_query(args.terms)
+            prefixes = Prefixes(cache_directory=args.cache_directory)
+            networks = prefixes.select(query, merged=args.merged)
+        except NetworkError as error:
+            self.exit(1, f'Error selecting prefixes: {error}')
+
+        if args.format == 'json':
+            if args.merged:
+                data = [str(network.cidr) for network in networks]
+            else:
+                data = [network.as_dict() for network in networks]
+            sys.stdout.write(f'{json.dumps(data, indent=2)}\n')
+        else:
+            for network in networks:
+                sys.stdout.write(f'{network.cidr if args.merged else network}\n')
+        sys.stdout.flush()
@@ -0,0 +1,74 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup serve'
+"""
+import signal
+
+from argparse import ArgumentParser, Namespace
+
+from ...constants import NETLOOKUP_SOCKET_PATH
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from .base import BaseCommand
+
+
+class Serve(BaseCommand):
+    """
+    Command for function for 'netlookup serve' CLI command
+    """
+    name: str = 'serve'
+    short_description: str = 'Serve prefix lookups over a Unix domain socket'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory, socket path and cache reload interval
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument('--socket', default=str(NETLOOKUP_SOCKET_PATH), help='Unix domain socket path')
+        parser.add_argument(
+            '--reload-interval',
+            type=float,
+            default=5.0,
+            help='Seconds between checks for prefix cache file changes, 0 to disable reloading'
+        )
+        parser.add_argument(
+            '--lookup-cache-size',
+            type=int,
+            default=0,
+            help='Number of lookup results to keep in LRU cache'
+        )
+        return parser
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup serve' command
+        """
+        # pylint: disable=import-outside-toplevel
+        from ...daemon import LookupDaemon
+
+        try:
+            daemon = LookupDaemon(
+                cache_directory=args.cache_directory,
+                socket_path=args.socket,
+                reload_interval=args.reload_interval,
+                lookup_cache_size=args.lookup_cache_size,
+            )
+            daemon.start()
+        except Exception as error:
+            self.exit(1, f'Error starting lookup daemon: {error}')
+
+        signal.signal(signal.SIGTERM, lambda *args: daemon.stop())
+        self.message(f'Serving {len(daemon.prefixes)} prefixes on {daemon.socket_path}')
+        try:
+            daemon.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.stop()
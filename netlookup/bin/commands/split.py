@@ -6,10 +6,17 @@
 """
 CLI tool to split network prefixes
 """
+import sys
+
 from argparse import ArgumentParser, Namespace
+from typing import TextIO
 
+from ...network import Network, format_address
 from .base import BaseCommand
 
+# Number of split subnet lines written to output in one write call
+OUTPUT_BUFFER_LINES = 8192
+
 
 class Split(BaseCommand):
     """
@@ -32,6 +39,21 @@ class Split(BaseCommand):
             type=int,
             help='Mask for split networks'
         )
+        parser.add_argument(
+            '-c', '--count',
+            type=int,
+            help='Number of split networks to output for each subnet'
+        )
+        parser.add_argument(
+            '--offset',
+            type=int,
+            default=0,
+            help='Index of first split network to output for each subnet'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Write split networks to specified file instead of stdout'
+        )
         parser.add_argument(
             'subnets',
             nargs='*',
@@ -39,22 +61,57 @@ class Split(BaseCommand):
         )
         return parser
 
-    def run(self, args: Namespace) -> None:
+    @staticmethod
+    def write_subnets(handle: TextIO, network: Network, prefixlen: int, args: Namespace) -> None:
         """
-        Run command, splitting networks and printing results on stdout
+        Write split subnets of a network to output in buffered chunks
         """
-        if not args.subnets:
-            self.exit(1, 'No subnets specified')
+        version = network.version
+        suffix = '\n' if args.address_only else f'/{prefixlen}\n'
+        lines = []
+        for value in network.iter_subnet_values(prefixlen, args.offset, args.count):
+            lines.append(f'{format_address(value, version)}{suffix}')
+            if len(lines) >= OUTPUT_BUFFER_LINES:
+                handle.write(''.join(lines))
+                lines.clear()
+        if lines:
+            handle.write(''.join(lines))
 
+    def split_networks(self, handle: TextIO, args: Namespace) -> None:
+        """
+        Split networks and write results to output
+        """
         for network in self.networks:
             prefixlen = args.mask if args.mask is not None else network.next_subnet_prefix
             if prefixlen is not None:
-                for subnet in network.subnet(prefixlen):
-                    if args.address_only:
-                        self.message(subnet.ip)
-                    else:
-                        self.message(subnet)
+                try:
+                    self.write_subnets(handle, network, prefixlen, args)
+                except Exception as error:
+                    self.error(f'Error splitting network {network}: {error}')
             else:
                 self.error(f'Network is not splittable {network}')
             if self.errors:
+                handle.flush()
                 self.exit(1)
+        handle.flush()
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run command, splitting networks and printing results on stdout
+        """
+        if not args.subnets:
+            self.exit(1, 'No subnets specified')
+        if args.offset < 0:
+            self.exit(1, f'Invalid offset {args.offset}')
+        if args.count is not None and args.count < 0:
+            self.exit(1, f'Invalid count {args.count}')
+
+        if args.output is None:
+            self.split_networks(sys.stdout, args)
+            return
+
+        try:
+            with open(args.output, 'w', encoding='utf-8') as handle:
+                self.split_networks(handle, args)
+        except OSError as error:
+            self.exit(1, f'Error writing {args.output}: {error}')
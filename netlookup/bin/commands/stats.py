@@ -0,0 +1,173 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+CLI command 'netlookup stats'
+"""
+import json
+import sys
+
+from argparse import ArgumentParser, Namespace
+from typing import Any, Dict, Iterator, List, TextIO
+
+from ...heavy_hitters import HEAVY_HITTER_TRACKERS, HeavyHitters
+from ...network_sets.constants import DEFAULT_CACHE_DIRECTORY
+from ...stats import LATENCY_PERCENTILES
+from .base import BaseCommand
+
+OUTPUT_FORMATS = (
+    'text',
+    'json',
+    'prometheus',
+)
+
+
+def format_lookups(data: Dict[str, Any]) -> List[str]:
+    """
+    Format lookup counters and latency percentiles as text lines
+    """
+    latency = data['latency_ns']
+    percentiles = ' '.join(
+        f'p{percent} {latency[f"p{percent}"] / 1000:.2f}'
+        for percent in LATENCY_PERCENTILES
+    )
+    return [
+        f'{"Lookups":>16} {data["lookups"]} hits {data["hits"]} misses {data["misses"]} '
+        f'hit ratio {data["hit_ratio"] * 100:.1f}%',
+        f'{"Latency (us)":>16} {percentiles}',
+    ]
+
+
+def format_text(data: Dict[str, Any]) -> str:
+    """
+    Format prefixes statistics as human readable text
+    """
+    lines = [
+        f'{"Prefixes":>16} {data["prefixes"]}',
+        f'{"Loads":>16} {data["loads"]} in {data["load_seconds"]:.3f} s',
+        *format_lookups(data),
+    ]
+    for vendor in data['vendors'].values():
+        lines.extend([
+            vendor['type'],
+            f'{"Prefixes":>16} {vendor["prefixes"]}',
+            f'{"Loads":>16} {vendor["loads"]} in {vendor["load_seconds"]:.3f} s',
+            f'{"Cache":>16} hits {vendor["cache_hits"]} misses {vendor["cache_misses"]} '
+            f'hit ratio {vendor["cache_hit_ratio"] * 100:.1f}%',
+            f'{"Fetches":>16} {vendor["fetches"]} errors {vendor["fetch_errors"]} '
+            f'in {vendor["fetch_seconds"]:.3f} s',
+        ])
+        if vendor['lookups']:
+            lines.extend(format_lookups(vendor))
+    return ''.join(f'{line}\n' for line in lines)
+
+
+def format_top(top: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    Format heavy hitters top lists as human readable text
+    """
+    lines = []
+    for name in HEAVY_HITTER_TRACKERS:
+        lines.append(f'Top {name}')
+        for item in top[name]:
+            lines.append(f'{item["count"]:>16} {item["key"]}')
+    return ''.join(f'{line}\n' for line in lines)
+
+
+class Stats(BaseCommand):
+    """
+    Command for function for 'netlookup stats' CLI command
+    """
+    name: str = 'stats'
+    short_description: str = 'Show prefix load, fetch and lookup statistics'
+
+    def register_parser_arguments(self, parser: ArgumentParser) -> ArgumentParser:
+        """
+        Register arguments for cache directory, addresses to look up and output format
+        """
+        parser.add_argument(
+            '--cache-directory',
+            default=str(DEFAULT_CACHE_DIRECTORY),
+            help='Prefix cache directory'
+        )
+        parser.add_argument('-u', '--update', action='store_true', help='Update prefix cache')
+        parser.add_argument('-f', '--file', help='Read addresses to look up from file, one address per line')
+        parser.add_argument('--stdin', action='store_true', help='Read addresses to look up from stdin')
+        parser.add_argument(
+            '--top',
+            type=int,
+            help='Show specified number of most looked up addresses, prefixes, vendors, regions and misses'
+        )
+        parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default='text',
+            help='Output format'
+        )
+        parser.add_argument('addresses', nargs='*', help='Addresses to look up')
+        return parser
+
+    @staticmethod
+    def read_addresses(handle: TextIO) -> Iterator[str]:
+        """
+        Read addresses from a file handle, skipping empty lines and comments
+        """
+        for line in handle:
+            value = line.strip()
+            if value and not value.startswith('#'):
+                yield value
+
+    def iterate_addresses(self, args: Namespace) -> Iterator[str]:
+        """
+        Iterate addresses from arguments, input file and stdin
+        """
+        yield from args.addresses
+        if args.file:
+            try:
+                with open(args.file, 'r', encoding='utf-8') as handle:
+                    yield from self.read_addresses(handle)
+            except OSError as error:
+                self.exit(1, f'Error reading {args.file}: {error}')
+        if args.stdin:
+            yield from self.read_addresses(sys.stdin)
+
+    def run(self, args: Namespace) -> None:
+        """
+        Run 'netlookup stats' command
+        """
+        # pylint: disable=import-outside-toplevel
+        from ...metrics import render_metrics
+        from ...prefixes import Prefixes
+
+        if args.top is not None and args.top < 1:
+            self.exit(1, f'Invalid top count {args.top}')
+        heavy_hitters = HeavyHitters() if args.top else None
+        try:
+            prefixes = Prefixes(cache_directory=args.cache_directory, stats=True, heavy_hitters=heavy_hitters)
+            if args.update:
+                prefixes.update()
+        except Exception as error:
+            self.exit(1, f'Error loading prefixes: {error}')
+
+        for address in self.iterate_addresses(args):
+            try:
+                prefixes.find(address)
+            except Exception as error:
+                self.error(f'Error looking up address "{address}": {error}')
+
+        if args.format == 'json':
+            data = prefixes.stats.as_dict()
+            if heavy_hitters is not None:
+                data['top'] = heavy_hitters.top(args.top)
+            sys.stdout.write(f'{json.dumps(data, indent=2)}\n')
+        elif args.format == 'prometheus':
+            sys.stdout.write(render_metrics(prefixes))
+        else:
+            sys.stdout.write(format_text(prefixes.stats.as_dict()))
+            if heavy_hitters is not None:
+                sys.stdout.write(format_top(heavy_hitters.top(args.top)))
+        sys.stdout.flush()
+        if self.errors:
+            self.exit(1)
@@ -8,9 +8,16 @@ CLI 'netlookup' main entry point
 """
 from cli_toolkit.script import Script
 
+from .commands.compile_table import CompileTable
+from .commands.diff import Diff
+from .commands.http_serve import HTTPServe
 from .commands.info import Info
+from .commands.overlaps import Overlaps
 from .commands.prefixes import PrefixLookup
+from .commands.select import Select
+from .commands.serve import Serve
 from .commands.split import Split
+from .commands.stats import Stats
 from .commands.substract import Subtract
 
 
@@ -19,9 +26,16 @@ class NetLookupScript(Script):
     Netlookup CLI command
     """
     subcommands = (
+        CompileTable,
+        Diff,
+        HTTPServe,
         Info,
+        Overlaps,
         PrefixLookup,
+        Select,
+        Serve,
         Split,
+        Stats,
         Subtract,
     )
 
@@ -9,6 +9,7 @@ Constant values for netlookup module
 from pathlib import Path
 
 NETLOOKUP_USER_DATA_PATH = Path('~/.config/netlookup').expanduser()
+NETLOOKUP_SOCKET_PATH = NETLOOKUP_USER_DATA_PATH.joinpath('netlookup.sock')
 
 IPV4_VERSION = 4
 IPV6_VERSION = 6
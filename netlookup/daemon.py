@@ -0,0 +1,334 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Long running prefix lookup daemon over a Unix domain socket, with a pipelining client
+
+The daemon keeps loaded prefixes in memory and reloads them when vendor cache files change.
+
+Lookups use a line protocol. Clients send one address per line and may send any number of
+lines before reading responses. Each request gets one response line, in request order:
+
+    +{"type": "aws", "cidr": "3.80.0.0/12", ...}    matching prefix as JSON
+    -                                               no matching prefix
+    !Error parsing address or network from x        invalid request
+"""
+import json
+import os
+import socket
+import stat
+import threading
+
+from pathlib import Path
+from socketserver import BaseRequestHandler, ThreadingUnixStreamServer
+from typing import Any, Iterable, List, Optional, Union
+
+from .constants import NETLOOKUP_SOCKET_PATH
+from .exceptions import NetworkError
+from .network_sets.base import NetworkSetItem
+from .prefixes import NETWORK_SET_CLASSES, Prefixes
+from .watcher import DEFAULT_RELOAD_INTERVAL, PrefixesWatcher
+
+DEFAULT_CLIENT_TIMEOUT = 10.0
+
+RECEIVE_BUFFER_SIZE = 65536
+MAX_REQUEST_LINE_LENGTH = 1024
+# Number of requests the client sends before reading their responses
+PIPELINE_BATCH_SIZE = 1024
+
+RESPONSE_MATCH = b'+'
+RESPONSE_NO_MATCH = b'-'
+RESPONSE_ERROR = b'!'
+
+
+def format_response(prefixes: Prefixes, line: bytes) -> bytes:
+    """
+    Look up address from a request line and format the response line
+    """
+    try:
+        network = prefixes.find(line.decode('utf-8').strip())
+    except (NetworkError, UnicodeDecodeError) as error:
+        message = ' '.join(str(error).splitlines())
+        return RESPONSE_ERROR + message.encode('utf-8') + b'\n'
+    if network is None:
+        return RESPONSE_NO_MATCH + b'\n'
+    return RESPONSE_MATCH + json.dumps(network.as_dict(), separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class LookupRequestHandler(BaseRequestHandler):
+    """
+    Handler for a lookup client connection
+
+    All complete request lines received in one read are answered with a single write, so
+    pipelined requests are processed in batches.
+    """
+    server: 'LookupUnixServer'
+
+    def setup(self) -> None:
+        self.server.add_connection(self.request)
+
+    def finish(self) -> None:
+        self.server.remove_connection(self.request)
+
+    def handle(self) -> None:
+        buffer = b''
+        while True:
+            try:
+                data = self.request.recv(RECEIVE_BUFFER_SIZE)
+            except OSError:
+                return
+            if not data:
+                return
+            *lines, buffer = (buffer + data).split(b'\n')
+            response = b''
+            if lines:
+                prefixes = self.server.daemon.prefixes
+                response = b''.join(format_response(prefixes, line) for line in lines)
+            if len(buffer) > MAX_REQUEST_LINE_LENGTH:
+                response += RESPONSE_ERROR + b'Request line too long\n'
+            try:
+                if response:
+                    self.request.sendall(response)
+            except OSError:
+                return
+            if len(buffer) > MAX_REQUEST_LINE_LENGTH:
+                return
+
+
+class LookupUnixServer(ThreadingUnixStreamServer):
+    """
+    Unix domain socket server for prefix lookups
+    """
+    daemon_threads = True
+
+    def __init__(self, daemon: 'LookupDaemon') -> None:
+        super().__init__(str(daemon.socket_path), LookupRequestHandler)
+        self.daemon = daemon
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+
+    def add_connection(self, connection: socket.socket) -> None:
+        """
+        Register an open client connection
+        """
+        with self.connections_lock:
+            self.connections.add(connection)
+
+    def remove_connection(self, connection: socket.socket) -> None:
+        """
+        Unregister a closed client connection
+        """
+        with self.connections_lock:
+            self.connections.discard(connection)
+
+    def close_connections(self) -> None:
+        """
+        Shut down open client connections, ending their request handler threads
+        """
+        with self.connections_lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class LookupDaemon(PrefixesWatcher):
+    """
+    Serve prefix lookups over a Unix domain socket, reloading prefixes when cache files change
+    """
+    socket_path: Path
+    server: Optional[LookupUnixServer]
+
+    def __init__(self,
+                 cache_directory: Optional[Union[str, Path]] = None,
+                 socket_path: Union[str, Path] = NETLOOKUP_SOCKET_PATH,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 lookup_cache_size: int = 0) -> None:
+        super().__init__(cache_directory, reload_interval, lookup_cache_size)
+        self.socket_path = Path(socket_path).expanduser()
+        self.server = None
+
+    def __remove_stale_socket__(self) -> None:
+        """
+        Remove socket file left behind by a daemon that is no longer running
+        """
+        try:
+            if not stat.S_ISSOCK(self.socket_path.stat().st_mode):
+                raise NetworkError(f'File exists and is not a socket: {self.socket_path}')
+        except FileNotFoundError:
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.connect(str(self.socket_path))
+            except OSError:
+                self.socket_path.unlink()
+                return
+        raise NetworkError(f'Lookup daemon is already running on {self.socket_path}')
+
+    def __start_server__(self) -> List[threading.Thread]:
+        """
+        Start listening on the Unix domain socket
+        """
+        self.__remove_stale_socket__()
+        if not self.socket_path.parent.exists():
+            self.socket_path.parent.mkdir(parents=True)
+        try:
+            self.server = LookupUnixServer(self)
+        except OSError as error:
+            raise NetworkError(f'Error listening on socket {self.socket_path}: {error}') from error
+        return [threading.Thread(target=self.server.serve_forever, name='netlookup-daemon', daemon=True)]
+
+    def __stop_server__(self) -> None:
+        """
+        Stop serving lookups, close client connections and remove the socket file
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.close_connections()
+        self.server = None
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+class LookupClient:
+    """
+    Client for the lookup daemon
+
+    The connection is reused for all lookups and reopened once if the daemon has closed it.
+    Batch lookups are pipelined, sending many requests before reading responses.
+    """
+    socket_path: Path
+    timeout: Optional[float]
+
+    def __init__(self,
+                 socket_path: Union[str, Path] = NETLOOKUP_SOCKET_PATH,
+                 timeout: Optional[float] = DEFAULT_CLIENT_TIMEOUT) -> None:
+        self.socket_path = Path(socket_path).expanduser()
+        self.timeout = timeout
+        self.__socket__ = None
+        self.__reader__ = None
+
+    def __enter__(self) -> 'LookupClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        """
+        Return True if client has an open connection to the daemon
+        """
+        return self.__socket__ is not None
+
+    def connect(self) -> None:
+        """
+        Open connection to the daemon
+        """
+        self.close()
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(self.timeout)
+        try:
+            client.connect(str(self.socket_path))
+        except OSError as error:
+            client.close()
+            raise NetworkError(f'Error connecting to lookup daemon {self.socket_path}: {error}') from error
+        self.__socket__ = client
+        self.__reader__ = client.makefile('rb')
+
+    def close(self) -> None:
+        """
+        Close connection to the daemon
+        """
+        if self.__reader__ is not None:
+            self.__reader__.close()
+            self.__reader__ = None
+        if self.__socket__ is not None:
+            self.__socket__.close()
+            self.__socket__ = None
+
+    @staticmethod
+    def __parse_response__(line: bytes) -> Optional[NetworkSetItem]:
+        """
+        Parse response line to a prefix object like the ones returned by Prefixes.find()
+        """
+        if line.startswith(RESPONSE_NO_MATCH):
+            return None
+        if line.startswith(RESPONSE_MATCH):
+            data = json.loads(line[1:])
+            for network_set in NETWORK_SET_CLASSES:
+                if network_set.type == data['type']:
+                    return network_set.loader_class(data['cidr'], data)
+            raise NetworkError(f'Unknown prefix type in lookup daemon response: {data["type"]}')
+        if line.startswith(RESPONSE_ERROR):
+            raise NetworkError(str(line[1:], 'utf-8').rstrip('\n'))
+        raise NetworkError(f'Invalid lookup daemon response: {line!r}')
+
+    def __send_requests__(self, payload: bytes, count: int) -> List[bytes]:
+        """
+        Send request lines and read the response lines
+        """
+        self.__socket__.sendall(payload)
+        responses = []
+        for _index in range(count):
+            line = self.__reader__.readline()
+            if not line.endswith(b'\n'):
+                raise ConnectionError('Connection closed by lookup daemon')
+            responses.append(line)
+        return responses
+
+    def __request__(self, addresses: List[str]) -> List[bytes]:
+        """
+        Send a batch of requests, reconnecting once if a reused connection was closed
+        """
+        payload = b''.join(f'{address}\n'.encode('utf-8') for address in addresses)
+        reused = self.connected
+        if not reused:
+            self.connect()
+        try:
+            return self.__send_requests__(payload, len(addresses))
+        except OSError as error:
+            self.close()
+            if not reused:
+                raise NetworkError(f'Error sending requests to lookup daemon: {error}') from error
+        self.connect()
+        try:
+            return self.__send_requests__(payload, len(addresses))
+        except OSError as error:
+            self.close()
+            raise NetworkError(f'Error sending requests to lookup daemon: {error}') from error
+
+    def lookup_many(self, addresses: Iterable[Any]) -> List[Optional[NetworkSetItem]]:
+        """
+        Look up addresses, returning matching prefix or None for each address in order
+
+        NetworkError for the first invalid address is raised after all responses are read.
+        """
+        addresses = [str(address) for address in addresses]
+        for address in addresses:
+            if '\n' in address or len(address) > MAX_REQUEST_LINE_LENGTH:
+                raise NetworkError(f'Invalid address {address!r}')
+        results = []
+        error = None
+        for offset in range(0, len(addresses), PIPELINE_BATCH_SIZE):
+            for line in self.__request__(addresses[offset:offset + PIPELINE_BATCH_SIZE]):
+                try:
+                    results.append(self.__parse_response__(line))
+                except NetworkError as response_error:
+                    error = error or response_error
+                    results.append(None)
+        if error is not None:
+            raise error
+        return results
+
+    def lookup(self, address: Any) -> Optional[NetworkSetItem]:
+        """
+        Look up an address, returning matching prefix or None
+        """
+        return self.lookup_many([address])[0]
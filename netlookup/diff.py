@@ -0,0 +1,247 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Differences between network prefix snapshots
+
+Both snapshots are sorted by address family, network address, prefix length and vendor
+type and compared in one linear merge. Address space changes are calculated with another
+linear merge over the merged CIDR covers of the snapshots.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from netaddr import cidr_merge
+
+from .exceptions import NetworkError
+from .json_stream import iter_file_chunks
+from .network import Network
+from .network_sets.base import NetworkSet, NetworkSetItem, load_cache_data
+from .overlaps import network_details
+from .prefixes import LOADER_CLASSES, NETWORK_SET_CLASSES
+
+DiffKey = Tuple[int, int, int, str]
+
+
+def diff_key(network: Network) -> DiffKey:
+    """
+    Return sort and comparison key of a network in snapshots
+    """
+    return (network.version, network.first, network.prefixlen, str(getattr(network, 'type', '')))
+
+
+def attribute_value(network: Network, attribute: str) -> Any:
+    """
+    Return attribute value for comparison. Order of list values is ignored.
+    """
+    value = getattr(network, attribute, None)
+    if isinstance(value, (list, tuple, set)):
+        return sorted(value)
+    return value
+
+
+def load_snapshot_file(path: Union[str, Path]) -> List[NetworkSetItem]:
+    """
+    Load prefixes from a network set cache file
+
+    Prefix classes are selected by the type of each record, so renamed cache file snapshots
+    can be loaded.
+    """
+    path = Path(path)
+    try:
+        with path.open('r', encoding='utf-8') as filedescriptor:
+            _updated, networks = load_cache_data(iter_file_chunks(filedescriptor), LOADER_CLASSES)
+    except Exception as error:
+        raise NetworkError(f'Error loading snapshot {path}: {error}') from error
+    return networks
+
+
+def load_snapshot(path: Union[str, Path]) -> List[NetworkSetItem]:
+    """
+    Load prefixes from a cache file or from all vendor cache files in a cache directory
+    """
+    path = Path(path).expanduser()
+    if path.is_dir():
+        networks = []
+        for network_set in NETWORK_SET_CLASSES:
+            cache_file = path.joinpath(network_set.cache_filename)
+            if cache_file.is_file():
+                networks.extend(load_snapshot_file(cache_file))
+        return networks
+    if not path.exists():
+        raise NetworkError(f'No such snapshot file or directory: {path}')
+    return load_snapshot_file(path)
+
+
+def merged_intervals(networks: Iterable[Network], version: int) -> List[Tuple[int, int]]:
+    """
+    Return first and last addresses of merged CIDR cover of networks of an address family
+    """
+    return [
+        (network.first, network.last)
+        for network in cidr_merge(network.cidr for network in networks if network.version == version)
+    ]
+
+
+def interval_difference_size(intervals: Sequence[Tuple[int, int]], other: Sequence[Tuple[int, int]]) -> int:
+    """
+    Return number of addresses in sorted disjoint intervals not covered by other intervals
+    """
+    size = 0
+    index = 0
+    for first, last in intervals:
+        size += last - first + 1
+        while index < len(other) and other[index][1] < first:
+            index += 1
+        position = index
+        while position < len(other) and other[position][0] <= last:
+            size -= min(last, other[position][1]) - max(first, other[position][0]) + 1
+            position += 1
+    return size
+
+
+class PrefixChange:
+    """
+    Prefix with same CIDR and vendor in both snapshots with changed attributes
+    """
+    old: Network
+    new: Network
+    changes: Dict[str, Tuple[Any, Any]]
+
+    def __init__(self, old: Network, new: Network, changes: Dict[str, Tuple[Any, Any]]) -> None:
+        self.old = old
+        self.new = new
+        self.changes = changes
+
+    def __repr__(self) -> str:
+        changes = ' '.join(f'{attribute} {old} -> {new}' for attribute, (old, new) in self.changes.items())
+        return f'{self.new} {changes}'
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return prefix change as dictionary
+        """
+        return {
+            'old': self.old.as_dict(),
+            'new': self.new.as_dict(),
+            'changes': {attribute: {'old': old, 'new': new} for attribute, (old, new) in self.changes.items()},
+        }
+
+
+class SnapshotDiff:
+    """
+    Added, removed and changed prefixes and address space changes between two snapshots
+    """
+    added: List[Network]
+    removed: List[Network]
+    changed: List[PrefixChange]
+    addresses_added: Dict[int, int]
+    addresses_removed: Dict[int, int]
+
+    def __init__(self) -> None:
+        self.added = []
+        self.removed = []
+        self.changed = []
+        self.addresses_added = {4: 0, 6: 0}
+        self.addresses_removed = {4: 0, 6: 0}
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    @property
+    def address_delta(self) -> Dict[int, int]:
+        """
+        Net change of covered address space by address family
+        """
+        return {
+            version: self.addresses_added[version] - self.addresses_removed[version]
+            for version in self.addresses_added
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return differences as dictionary
+        """
+        return {
+            'added': [network_details(network) for network in self.added],
+            'removed': [network_details(network) for network in self.removed],
+            'changed': [change.as_dict() for change in self.changed],
+            'addresses': {
+                f'ipv{version}': {
+                    'added': self.addresses_added[version],
+                    'removed': self.addresses_removed[version],
+                    'delta': delta,
+                }
+                for version, delta in self.address_delta.items()
+            },
+        }
+
+
+def diff_networks(old: Iterable[Network], new: Iterable[Network]) -> SnapshotDiff:
+    """
+    Compare prefixes of two snapshots
+
+    Prefixes are matched by CIDR and vendor type. Changes in extra attributes of matched
+    prefixes, for example AWS region or services, are reported as changed prefixes.
+    """
+    old = sorted(old, key=diff_key)
+    new = sorted(new, key=diff_key)
+    diff = SnapshotDiff()
+
+    old_index = new_index = 0
+    while old_index < len(old) and new_index < len(new):
+        old_key = diff_key(old[old_index])
+        new_key = diff_key(new[new_index])
+        if old_key < new_key:
+            diff.removed.append(old[old_index])
+            old_index += 1
+        elif new_key < old_key:
+            diff.added.append(new[new_index])
+            new_index += 1
+        else:
+            old_network = old[old_index]
+            new_network = new[new_index]
+            changes = {}
+            for attribute in getattr(new_network, 'extra_attributes', ()):
+                old_value = attribute_value(old_network, attribute)
+                new_value = attribute_value(new_network, attribute)
+                if old_value != new_value:
+                    changes[attribute] = (old_value, new_value)
+            if changes:
+                diff.changed.append(PrefixChange(old_network, new_network, changes))
+            old_index += 1
+            new_index += 1
+    diff.removed.extend(old[old_index:])
+    diff.added.extend(new[new_index:])
+
+    for version in diff.addresses_added:
+        old_intervals = merged_intervals(old, version)
+        new_intervals = merged_intervals(new, version)
+        diff.addresses_added[version] = interval_difference_size(new_intervals, old_intervals)
+        diff.addresses_removed[version] = interval_difference_size(old_intervals, new_intervals)
+    return diff
+
+
+def diff_network_sets(old: NetworkSet, new: NetworkSet) -> SnapshotDiff:
+    """
+    Compare prefixes of two network sets
+    """
+    # Go directly to attribute, iterating network set may trigger fetch
+    return diff_networks(old.__networks__, new.__networks__)
+
+
+def diff_snapshots(old: Union[str, Path],
+                   new: Union[str, Path],
+                   types: Optional[Sequence[str]] = None) -> SnapshotDiff:
+    """
+    Compare prefixes of two cache files or cache directories, optionally only prefixes of
+    specified vendor types
+    """
+    old_networks = load_snapshot(old)
+    new_networks = load_snapshot(new)
+    if types is not None:
+        old_networks = [network for network in old_networks if network.type in types]
+        new_networks = [network for network in new_networks if network.type in types]
+    return diff_networks(old_networks, new_networks)
@@ -0,0 +1,239 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Constant memory top-K tracking of lookup traffic with the space-saving algorithm
+
+Tracks most looked up addresses, matched prefixes, vendors and regions, and the /24 (IPv4)
+or /48 (IPv6) networks of missed lookups. SpaceSaving counters are not thread safe, the
+HeavyHitters trackers are locked and can be shared by lookup server threads.
+"""
+import json
+import threading
+
+from heapq import heapify, heappop, heappush
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+from .constants import IPV4_VERSION, IPV6_VERSION, MAX_PREFIX_LEN_IPV4, MAX_PREFIX_LEN_IPV6
+from .exceptions import NetworkError
+from .network import Network, format_address, parse_address_or_network
+
+DEFAULT_HEAVY_HITTERS_CAPACITY = 1000
+# Heap of counter entries is rebuilt when it grows past this many times the capacity
+HEAP_REBUILD_FACTOR = 4
+
+# Prefix lengths used to group missed lookup addresses
+MISS_PREFIX_LEN = {
+    IPV4_VERSION: 24,
+    IPV6_VERSION: 48,
+}
+
+HEAVY_HITTER_TRACKERS = (
+    'addresses',
+    'prefixes',
+    'vendors',
+    'regions',
+    'misses',
+)
+
+
+class SpaceSaving:
+    """
+    Space-saving top-K counter with fixed number of counters
+
+    When all counters are in use, a new key replaces the key with smallest count and
+    inherits its count as overestimation error. Any key with true count above total / capacity
+    is guaranteed to be tracked.
+    """
+    capacity: int
+    counts: Dict[Hashable, int]
+    errors: Dict[Hashable, int]
+    total: int
+
+    def __init__(self, capacity: int = DEFAULT_HEAVY_HITTERS_CAPACITY) -> None:
+        if capacity < 1:
+            raise NetworkError(f'Invalid heavy hitters capacity {capacity}')
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        self.__heap__: List[Tuple[int, int, Hashable]] = []
+        self.__sequence__ = 0
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.counts
+
+    def __push__(self, key: Hashable) -> None:
+        """
+        Push current count of key to the heap of counter entries
+        """
+        self.__sequence__ += 1
+        heappush(self.__heap__, (self.counts[key], self.__sequence__, key))
+
+    def __pop_minimum__(self) -> Tuple[Hashable, int]:
+        """
+        Pop key with smallest count, skipping heap entries for outdated counts
+        """
+        while True:
+            count, _sequence, key = heappop(self.__heap__)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def __rebuild_heap__(self) -> None:
+        """
+        Rebuild heap of counter entries with only current counts
+        """
+        self.__heap__ = []
+        for key, count in self.counts.items():
+            self.__sequence__ += 1
+            self.__heap__.append((count, self.__sequence__, key))
+        heapify(self.__heap__)
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        """
+        Add count for key
+        """
+        self.total += count
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            minimum_key, minimum_count = self.__pop_minimum__()
+            del self.counts[minimum_key]
+            del self.errors[minimum_key]
+            self.counts[key] = minimum_count + count
+            self.errors[key] = minimum_count
+        self.__push__(key)
+        if len(self.__heap__) > HEAP_REBUILD_FACTOR * self.capacity:
+            self.__rebuild_heap__()
+
+    def top(self, count: Optional[int] = None) -> List[Tuple[Hashable, int, int]]:
+        """
+        Return tracked keys with counts and errors, in decreasing order of count
+        """
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        if count is not None:
+            items = items[:count]
+        return [(key, value, self.errors[key]) for key, value in items]
+
+    def clear(self) -> None:
+        """
+        Remove all counters
+        """
+        self.counts.clear()
+        self.errors.clear()
+        self.total = 0
+        self.__heap__ = []
+
+
+def miss_network(value: Any) -> str:
+    """
+    Return /24 or /48 network of a missed lookup address as string
+    """
+    address = parse_address_or_network(value)
+    bits = MAX_PREFIX_LEN_IPV4 if address.version == IPV4_VERSION else MAX_PREFIX_LEN_IPV6
+    prefixlen = MISS_PREFIX_LEN[address.version]
+    network = address.value & ~((1 << (bits - prefixlen)) - 1)
+    return f'{format_address(network, address.version)}/{prefixlen}'
+
+
+class HeavyHitters:
+    """
+    Top-K trackers for lookup addresses, matched prefixes, vendors, regions and missed networks
+
+    Recording lookups and reading top keys are locked, so trackers can be shared between
+    threads, for example the connection threads of the lookup daemon.
+    """
+    capacity: int
+    addresses: SpaceSaving
+    prefixes: SpaceSaving
+    vendors: SpaceSaving
+    regions: SpaceSaving
+    misses: SpaceSaving
+
+    def __init__(self, capacity: int = DEFAULT_HEAVY_HITTERS_CAPACITY) -> None:
+        self.capacity = capacity
+        self.__lock__ = threading.Lock()
+        for name in HEAVY_HITTER_TRACKERS:
+            setattr(self, name, SpaceSaving(capacity))
+
+    def record(self, value: Any, network: Optional[Network]) -> None:
+        """
+        Record lookup of a value with matched network, or None if there was no match
+        """
+        if network is None:
+            missed = miss_network(value)
+            with self.__lock__:
+                self.addresses.add(str(value))
+                self.misses.add(missed)
+            return
+        region = getattr(network, 'region', None)
+        with self.__lock__:
+            self.addresses.add(str(value))
+            self.prefixes.add(str(network.cidr))
+            self.vendors.add(network.type)
+            if region is not None:
+                self.regions.add(region)
+
+    def top(self, count: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return top keys for each tracker with counts and errors
+        """
+        with self.__lock__:
+            return {
+                name: [
+                    {'key': key, 'count': value, 'error': error}
+                    for key, value, error in getattr(self, name).top(count)
+                ]
+                for name in HEAVY_HITTER_TRACKERS
+            }
+
+    def clear(self) -> None:
+        """
+        Remove all counters from trackers
+        """
+        with self.__lock__:
+            for name in HEAVY_HITTER_TRACKERS:
+                getattr(self, name).clear()
+
+    def save(self, path: Union[str, Path], count: Optional[int] = None) -> None:
+        """
+        Save snapshot of top keys as JSON file
+        """
+        try:
+            with Path(path).open('w', encoding='utf-8') as filedescriptor:
+                filedescriptor.write(f'{json.dumps(self.top(count), indent=2)}\n')
+        except Exception as error:
+            raise NetworkError(f'Error writing heavy hitters snapshot {path}: {error}') from error
+
+
+def load_snapshot(path: Union[str, Path]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load heavy hitters snapshot saved with HeavyHitters.save()
+    """
+    try:
+        with Path(path).open('r', encoding='utf-8') as filedescriptor:
+            data = json.loads(filedescriptor.read())
+    except Exception as error:
+        raise NetworkError(f'Error reading heavy hitters snapshot {path}: {error}') from error
+    if not isinstance(data, dict):
+        raise NetworkError(f'Invalid heavy hitters snapshot {path}')
+    return data
+
+
+def load_snapshot_addresses(path: Union[str, Path]) -> List[str]:
+    """
+    Load top lookup addresses from heavy hitters snapshot, in decreasing order of count
+    """
+    try:
+        return [item['key'] for item in load_snapshot(path).get('addresses', [])]
+    except (KeyError, TypeError) as error:
+        raise NetworkError(f'Invalid heavy hitters snapshot {path}: {error}') from error
@@ -0,0 +1,292 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Versioned history of vendor prefix snapshots with time travel lookups
+
+History of each vendor is stored as a JSON lines file. The first line contains the base
+snapshot and each following line the prefixes added, removed and changed in a version,
+keyed by the updated timestamp of the version. Storage grows with prefix churn, not with
+the number of recorded versions.
+
+Lookups at a point in time use an index of prefix lifetimes built by replaying the history
+once and updated with each recorded version. Prefixes containing an address are found with
+one dictionary lookup per prefix length, so versions are never materialized for lookups.
+"""
+import json
+
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .diff import diff_networks
+from .exceptions import NetworkError
+from .network import Network, parse_address_or_network
+from .network_sets.base import NetworkSet, NetworkSetItem
+from .prefixes import LOADER_CLASSES
+
+HISTORY_DIRECTORY_NAME = 'history'
+HISTORY_FILE_SUFFIX = '.jsonl'
+
+ADDRESS_BITS = {
+    4: 32,
+    6: 128,
+}
+
+IndexKey = Tuple[int, int, int]
+
+
+def normalize_timestamp(value: datetime) -> datetime:
+    """
+    Convert timezone aware timestamps to naive local time used in vendor updated timestamps
+    """
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class HistoryVersion:
+    """
+    Changes of a recorded vendor prefix snapshot version
+    """
+    updated: datetime
+    added: List[Dict[str, Any]]
+    removed: List[str]
+    changed: List[Dict[str, Any]]
+
+    def __init__(self,
+                 updated: datetime,
+                 added: Optional[List[Dict[str, Any]]] = None,
+                 removed: Optional[List[str]] = None,
+                 changed: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.updated = updated
+        self.added = added if added is not None else []
+        self.removed = removed if removed is not None else []
+        self.changed = changed if changed is not None else []
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HistoryVersion':
+        """
+        Load version from dictionary
+        """
+        return cls(
+            datetime.fromisoformat(data['updated']),
+            data.get('added'),
+            data.get('removed'),
+            data.get('changed'),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return version as dictionary
+        """
+        return {
+            'updated': self.updated.isoformat(),
+            'added': self.added,
+            'removed': self.removed,
+            'changed': self.changed,
+        }
+
+
+class HistoricalPrefix:
+    """
+    Prefix with attributes valid from start timestamp until end timestamp
+    """
+    network: NetworkSetItem
+    start: datetime
+    end: Optional[datetime]
+
+    def __init__(self, network: NetworkSetItem, start: datetime, end: Optional[datetime] = None) -> None:
+        self.network = network
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f'{self.network} {self.start.isoformat()} - {self.end.isoformat() if self.end else ""}'
+
+    def valid_at(self, timestamp: datetime) -> bool:
+        """
+        Check if prefix was valid at timestamp
+        """
+        return self.start <= timestamp and (self.end is None or timestamp < self.end)
+
+
+class HistoryIndex:
+    """
+    Index of prefix lifetimes of a vendor by address family, prefix length and network address
+    """
+    prefixes: Dict[IndexKey, List[HistoricalPrefix]]
+    prefixlens: Dict[int, List[int]]
+    versions: List[datetime]
+    current: Dict[str, HistoricalPrefix]
+
+    def __init__(self, versions: Iterable[HistoryVersion] = ()) -> None:
+        self.prefixes = defaultdict(list)
+        self.prefixlens = {}
+        self.versions = []
+        self.current = {}
+        for version in versions:
+            self.apply(version)
+
+    def apply(self, version: HistoryVersion) -> None:
+        """
+        Apply changes of the next version to the index
+        """
+        self.versions.append(version.updated)
+        for cidr in version.removed + [record['cidr'] for record in version.changed]:
+            prefix = self.current.pop(cidr, None)
+            if prefix is not None:
+                prefix.end = version.updated
+        for record in version.added + version.changed:
+            loader_class = LOADER_CLASSES.get(record.get('type'), NetworkSetItem)
+            prefix = HistoricalPrefix(loader_class(record['cidr'], record), version.updated)
+            self.current[record['cidr']] = prefix
+            network = prefix.network
+            self.prefixes[(network.version, network.prefixlen, network.first)].append(prefix)
+            prefixlens = self.prefixlens.setdefault(network.version, [])
+            if network.prefixlen not in prefixlens:
+                prefixlens.append(network.prefixlen)
+                prefixlens.sort(reverse=True)
+
+    def state(self, timestamp: Optional[datetime] = None) -> List[NetworkSetItem]:
+        """
+        Return prefixes valid at timestamp, or prefixes of the latest version
+        """
+        if timestamp is None:
+            return [prefix.network for prefix in self.current.values()]
+        return [
+            prefix.network
+            for prefixes in self.prefixes.values()
+            for prefix in prefixes
+            if prefix.valid_at(timestamp)
+        ]
+
+    def find(self, value: Any, timestamp: datetime) -> Optional[NetworkSetItem]:
+        """
+        Find most specific prefix containing address at timestamp
+        """
+        address = parse_address_or_network(value)
+        bits = ADDRESS_BITS[address.version]
+        max_prefixlen = address.prefixlen if isinstance(address, Network) else bits
+        for prefixlen in self.prefixlens.get(address.version, ()):
+            if prefixlen > max_prefixlen:
+                continue
+            shift = bits - prefixlen
+            first = address.value >> shift << shift
+            for prefix in self.prefixes.get((address.version, prefixlen, first), ()):
+                if prefix.valid_at(timestamp):
+                    return prefix.network
+        return None
+
+
+class HistoryStore:
+    """
+    Versioned history of vendor prefix snapshots stored in a directory
+    """
+    directory: Path
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory).expanduser()
+        self.__indexes__: Dict[str, HistoryIndex] = {}
+
+    def history_file(self, vendor_type: str) -> Path:
+        """
+        Return history file path for vendor type
+        """
+        return self.directory.joinpath(f'{vendor_type}{HISTORY_FILE_SUFFIX}')
+
+    def iter_versions(self, vendor_type: str) -> Iterator[HistoryVersion]:
+        """
+        Iterate recorded versions of vendor prefixes, oldest first
+        """
+        path = self.history_file(vendor_type)
+        if not path.is_file():
+            return
+        try:
+            with path.open('r', encoding='utf-8') as filedescriptor:
+                for line in filedescriptor:
+                    if line.strip():
+                        yield HistoryVersion.from_dict(json.loads(line))
+        except Exception as error:
+            raise NetworkError(f'Error reading history file {path}: {error}') from error
+
+    def versions(self, vendor_type: str) -> List[datetime]:
+        """
+        Return updated timestamps of recorded versions of vendor prefixes
+        """
+        return list(self.get_index(vendor_type).versions)
+
+    def get_index(self, vendor_type: str) -> HistoryIndex:
+        """
+        Return prefix lifetime index for vendor type, replaying history on first use
+        """
+        try:
+            return self.__indexes__[vendor_type]
+        except KeyError:
+            index = HistoryIndex(self.iter_versions(vendor_type))
+            self.__indexes__[vendor_type] = index
+            return index
+
+    def state(self, vendor_type: str, timestamp: Optional[datetime] = None) -> List[NetworkSetItem]:
+        """
+        Return prefixes of vendor at timestamp, or latest recorded prefixes
+        """
+        if timestamp is not None:
+            timestamp = normalize_timestamp(timestamp)
+        return self.get_index(vendor_type).state(timestamp)
+
+    def record(self, network_set: NetworkSet) -> bool:
+        """
+        Record prefixes of vendor network set as a new version
+
+        The version is keyed by updated timestamp of the network set and is only recorded if
+        it is newer than the latest recorded version and prefixes have changed. The first
+        version is always recorded as the base snapshot. Returns True if version was recorded.
+        """
+        if network_set.updated is None:
+            return False
+        updated = normalize_timestamp(network_set.updated)
+        index = self.get_index(network_set.type)
+        if index.versions and updated <= index.versions[-1]:
+            return False
+
+        # Go directly to attribute, iterating network set may trigger fetch
+        diff = diff_networks(index.state(), network_set.__networks__)
+        version = HistoryVersion(
+            updated,
+            added=[network.as_dict() for network in diff.added],
+            removed=[str(network.cidr) for network in diff.removed],
+            changed=[change.new.as_dict() for change in diff.changed],
+        )
+        if index.versions and not version:
+            return False
+        path = self.history_file(network_set.type)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with path.open('a', encoding='utf-8') as filedescriptor:
+                filedescriptor.write(f'{json.dumps(version.as_dict())}\n')
+        except Exception as error:
+            raise NetworkError(f'Error writing history file {path}: {error}') from error
+        index.apply(version)
+        return True
+
+    def find(self,
+             value: Any,
+             timestamp: datetime,
+             types: Sequence[str]) -> Optional[NetworkSetItem]:
+        """
+        Find most specific prefix of given vendor types containing address at timestamp
+        """
+        timestamp = normalize_timestamp(timestamp)
+        match = None
+        for vendor_type in types:
+            network = self.get_index(vendor_type).find(value, timestamp)
+            if network is not None and (match is None or network.prefixlen > match.prefixlen):
+                match = network
+        return match
@@ -0,0 +1,299 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+HTTP JSON prefix lookup service
+
+Endpoints:
+
+    GET /lookup/<address>   matching prefix as JSON object, 404 if no prefix matches
+    POST /lookup            JSON array of addresses, returns JSON array with matching prefix
+                            object, null or {"error": "..."} for each address in order
+
+Connections are kept alive with HTTP/1.1. Lookups from concurrent requests are coalesced
+and done in one pass over unique addresses by a single lookup thread.
+"""
+import json
+import queue
+import threading
+
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote
+
+from .exceptions import NetworkError
+from .lookup_cache import lookup_cache_key
+from .prefixes import Prefixes
+from .watcher import DEFAULT_RELOAD_INTERVAL, PrefixesWatcher
+
+DEFAULT_HTTP_ADDRESS = '127.0.0.1'
+DEFAULT_HTTP_PORT = 8053
+
+JSON_CONTENT_TYPE = 'application/json'
+LOOKUP_PATH = '/lookup'
+MAX_BATCH_ADDRESSES = 10000
+MAX_REQUEST_BODY_SIZE = 1024 * 1024
+# Maximum number of queued requests coalesced to one lookup pass
+MAX_COALESCED_REQUESTS = 1000
+
+LookupResult = Optional[Dict[str, Any]]
+
+
+def lookup_result(prefixes: Prefixes, value: Any) -> LookupResult:
+    """
+    Look up address and return matching prefix as dictionary, None if no prefix matches or
+    error details for invalid addresses
+    """
+    try:
+        network = prefixes.find(value)
+    except NetworkError as error:
+        return {'error': str(error)}
+    return network.as_dict() if network is not None else None
+
+
+class LookupBatcher:
+    """
+    Coalesce lookups from concurrent requests to bulk lookup passes in a single thread
+
+    Requests queued while a pass is running are handled together in the next pass, so each
+    unique address is looked up once per pass.
+    """
+    watcher: PrefixesWatcher
+    passes: int
+    requests: int
+
+    def __init__(self, watcher: PrefixesWatcher) -> None:
+        self.watcher = watcher
+        self.passes = 0
+        self.requests = 0
+        self.__queue__: 'queue.Queue[Optional[Tuple[List[Any], Future]]]' = queue.Queue()
+        self.__thread__ = None
+
+    def start(self) -> None:
+        """
+        Start the lookup thread
+        """
+        self.__thread__ = threading.Thread(target=self.__run__, name='netlookup-http-lookup', daemon=True)
+        self.__thread__.start()
+
+    def stop(self) -> None:
+        """
+        Stop the lookup thread after queued lookups are done
+        """
+        if self.__thread__ is None:
+            return
+        self.__queue__.put(None)
+        self.__thread__.join()
+        self.__thread__ = None
+
+    def lookup(self, values: List[Any]) -> List[LookupResult]:
+        """
+        Queue addresses for lookup and wait for results
+        """
+        future = Future()
+        self.__queue__.put((values, future))
+        return future.result()
+
+    def __lookup_pass__(self, items: List[Tuple[List[Any], Future]]) -> None:
+        """
+        Look up unique addresses from queued requests and set request results
+        """
+        prefixes = self.watcher.prefixes
+        results = {}
+        for values, future in items:
+            request_results = []
+            for value in values:
+                try:
+                    key = lookup_cache_key(value)
+                except NetworkError as error:
+                    request_results.append({'error': str(error)})
+                    continue
+                if key not in results:
+                    results[key] = lookup_result(prefixes, value)
+                request_results.append(results[key])
+            future.set_result(request_results)
+        self.passes += 1
+        self.requests += len(items)
+
+    def __run__(self) -> None:
+        """
+        Run lookup passes for queued requests until stopped
+        """
+        running = True
+        while running:
+            items = [self.__queue__.get()]
+            while len(items) < MAX_COALESCED_REQUESTS:
+                try:
+                    items.append(self.__queue__.get_nowait())
+                except queue.Empty:
+                    break
+            if None in items:
+                running = False
+                items = [item for item in items if item is not None]
+                if not items:
+                    break
+            try:
+                self.__lookup_pass__(items)
+            except Exception as error:  # pylint: disable=broad-except
+                for _values, future in items:
+                    if not future.done():
+                        future.set_exception(error)
+
+
+class LookupHTTPRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler for lookup endpoints
+    """
+    protocol_version = 'HTTP/1.1'
+    server: 'LookupHTTPServer'
+
+    def send_json(self, status: HTTPStatus, data: Any) -> None:
+        """
+        Send JSON response
+        """
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', JSON_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_json_error(self, status: HTTPStatus, message: str) -> None:
+        """
+        Send JSON error response
+        """
+        self.send_json(status, {'error': message})
+
+    def read_addresses(self) -> Optional[List[str]]:
+        """
+        Read JSON array of addresses from request body, sending error response if invalid
+        """
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+            if length < 0:
+                raise ValueError(f'Invalid Content-Length {length}')
+        except ValueError:
+            self.close_connection = True
+            self.send_json_error(HTTPStatus.LENGTH_REQUIRED, 'Content-Length is required')
+            return None
+        if length > MAX_REQUEST_BODY_SIZE:
+            self.close_connection = True
+            self.send_json_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Request body is too large')
+            return None
+        try:
+            addresses = json.loads(self.rfile.read(length))
+        except ValueError as error:
+            self.send_json_error(HTTPStatus.BAD_REQUEST, f'Invalid JSON: {error}')
+            return None
+        if not isinstance(addresses, list) or not all(isinstance(address, str) for address in addresses):
+            self.send_json_error(HTTPStatus.BAD_REQUEST, 'Request body must be a JSON array of addresses')
+            return None
+        if len(addresses) > MAX_BATCH_ADDRESSES:
+            self.send_json_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f'Too many addresses, maximum is {MAX_BATCH_ADDRESSES}'
+            )
+            return None
+        return addresses
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Look up an address from request path
+        """
+        path = self.path.split('?', 1)[0]
+        if not path.startswith(f'{LOOKUP_PATH}/'):
+            self.send_json_error(HTTPStatus.NOT_FOUND, 'Not found')
+            return
+        address = unquote(path[len(LOOKUP_PATH) + 1:])
+        result = self.server.batcher.lookup([address])[0]
+        if result is None:
+            self.send_json_error(HTTPStatus.NOT_FOUND, f'No prefix found for {address}')
+        elif 'error' in result:
+            self.send_json(HTTPStatus.BAD_REQUEST, result)
+        else:
+            self.send_json(HTTPStatus.OK, result)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        Look up a batch of addresses from JSON request body
+        """
+        if self.path.split('?', 1)[0] != LOOKUP_PATH:
+            self.close_connection = True
+            self.send_json_error(HTTPStatus.NOT_FOUND, 'Not found')
+            return
+        addresses = self.read_addresses()
+        if addresses is not None:
+            self.send_json(HTTPStatus.OK, self.server.batcher.lookup(addresses))
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """
+        Do not log requests
+        """
+
+
+class LookupHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server for prefix lookups
+    """
+    daemon_threads = True
+
+    def __init__(self, batcher: LookupBatcher, address: str, port: int) -> None:
+        super().__init__((address, port), LookupHTTPRequestHandler)
+        self.batcher = batcher
+
+
+class LookupHTTPService(PrefixesWatcher):
+    """
+    Serve prefix lookups over HTTP, reloading prefixes when cache files change
+    """
+    address: str
+    port: int
+    batcher: LookupBatcher
+    server: Optional[LookupHTTPServer]
+
+    def __init__(self,
+                 cache_directory: Optional[Union[str, Path]] = None,
+                 address: str = DEFAULT_HTTP_ADDRESS,
+                 port: int = DEFAULT_HTTP_PORT,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 lookup_cache_size: int = 0) -> None:
+        super().__init__(cache_directory, reload_interval, lookup_cache_size)
+        self.address = address
+        self.port = port
+        self.batcher = LookupBatcher(self)
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        """
+        URL of the lookup endpoint
+        """
+        return f'http://{self.address}:{self.port}{LOOKUP_PATH}'
+
+    def __start_server__(self) -> List[threading.Thread]:
+        """
+        Start listening for HTTP requests. Port 0 selects a free port.
+        """
+        try:
+            self.server = LookupHTTPServer(self.batcher, self.address, self.port)
+        except OSError as error:
+            raise NetworkError(f'Error listening on {self.address} port {self.port}: {error}') from error
+        self.port = self.server.server_address[1]
+        self.batcher.start()
+        return [threading.Thread(target=self.server.serve_forever, name='netlookup-http', daemon=True)]
+
+    def __stop_server__(self) -> None:
+        """
+        Stop serving HTTP requests
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.batcher.stop()
+        self.server = None
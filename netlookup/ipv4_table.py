@@ -0,0 +1,315 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Direct indexed IPv4 longest prefix match lookup table in DIR-24-8 style
+
+The first level table has one entry for each /24 network indexed by the top 24 bits of the
+address. Entries contain the id of the longest prefix covering the whole /24 network, or a
+reference to a second level table of 256 entries indexed by the last 8 bits of the address
+for /24 networks containing longer prefixes. A lookup is one or two array reads returning
+a compact prefix id, where id 0 means no match.
+
+Entries are 16 bit integers when prefix ids and second level table numbers fit in 15 bits,
+which keeps the first level table at 32 MiB. Larger tables use 32 bit entries.
+
+Tables can be saved to a file and loaded with mmap, so loading a table does not copy or
+parse the lookup arrays.
+"""
+import json
+import mmap
+import sys
+
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .constants import IPV4_VERSION, MAX_PREFIX_LEN_IPV4
+from .exceptions import NetworkError
+from .network import Network, parse_address_or_network
+from .network_sets.base import NetworkSetItem
+from .prefixes import LOADER_CLASSES
+
+IPV4_TABLE_FILENAME = 'ipv4-lookup-table.bin'
+
+TABLE_FILE_MAGIC = b'NLDIR248'
+TABLE_FILE_FORMAT_VERSION = 1
+TABLE_FILE_ALIGNMENT = 8
+TABLE_HEADER_LENGTH_BYTES = 4
+
+FIRST_LEVEL_BITS = 24
+SECOND_LEVEL_BITS = MAX_PREFIX_LEN_IPV4 - FIRST_LEVEL_BITS
+FIRST_LEVEL_SIZE = 1 << FIRST_LEVEL_BITS
+SECOND_LEVEL_SIZE = 1 << SECOND_LEVEL_BITS
+SECOND_LEVEL_MASK = SECOND_LEVEL_SIZE - 1
+
+# Table entry typecodes by size. The highest bit of an entry marks second level table numbers.
+ENTRY_TYPECODES = ('H', 'I')
+ENTRY_FLAGS = {
+    'H': 1 << 15,
+    'I': 1 << 31,
+}
+
+
+class IPv4LookupTable:
+    """
+    DIR-24-8 style IPv4 longest prefix match table of prefixes
+
+    Prefix ids are 1 based indexes to the networks list. When prefixes of different vendors
+    have the same CIDR, the prefix listed last wins.
+    """
+    networks: List[Network]
+    typecode: str
+    first_level: Union[array, memoryview]
+    second_level: Union[array, memoryview]
+
+    def __init__(self, networks: Optional[Iterable[Network]] = None) -> None:
+        self.networks = [network for network in networks or () if network.version == IPV4_VERSION]
+        self.__mmap__: Optional[mmap.mmap] = None
+        self.__build__()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {len(self.networks)} prefixes {self.size} bytes>'
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+    def __enter__(self) -> 'IPv4LookupTable':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @classmethod
+    def from_prefixes(cls, prefixes: Iterable[Network]) -> 'IPv4LookupTable':
+        """
+        Build lookup table from IPv4 prefixes of a Prefixes object or other network list
+        """
+        return cls(prefixes)
+
+    @property
+    def second_level_count(self) -> int:
+        """
+        Number of second level tables
+        """
+        return len(self.second_level) // SECOND_LEVEL_SIZE
+
+    @property
+    def size(self) -> int:
+        """
+        Size of lookup arrays in bytes
+        """
+        itemsize = array(self.typecode).itemsize
+        return (len(self.first_level) + len(self.second_level)) * itemsize
+
+    def __build__(self) -> None:
+        """
+        Build lookup arrays for networks
+
+        Networks are written from shortest to longest prefix, so longer prefixes overwrite
+        the entries of the prefixes containing them.
+        """
+        order = sorted(range(len(self.networks)), key=lambda index: self.networks[index].prefixlen)
+        long_prefix_buckets = set(
+            network.first >> SECOND_LEVEL_BITS
+            for network in self.networks
+            if network.prefixlen > FIRST_LEVEL_BITS
+        )
+        for typecode in ENTRY_TYPECODES:
+            if max(len(self.networks), len(long_prefix_buckets)) < ENTRY_FLAGS[typecode]:
+                break
+        else:
+            raise NetworkError(f'Too many prefixes for IPv4 lookup table: {len(self.networks)}')
+        self.typecode = typecode
+        flag = ENTRY_FLAGS[typecode]
+
+        first_level = array(typecode, bytes(FIRST_LEVEL_SIZE * array(typecode).itemsize))
+        second_level = array(typecode)
+        for index in order:
+            network = self.networks[index]
+            if network.prefixlen > FIRST_LEVEL_BITS:
+                continue
+            start = network.first >> SECOND_LEVEL_BITS
+            count = 1 << (FIRST_LEVEL_BITS - network.prefixlen)
+            first_level[start:start + count] = array(typecode, [index + 1]) * count
+
+        for index in order:
+            network = self.networks[index]
+            if network.prefixlen <= FIRST_LEVEL_BITS:
+                continue
+            bucket = network.first >> SECOND_LEVEL_BITS
+            entry = first_level[bucket]
+            if not entry & flag:
+                # Second level table starts with the id of the prefix covering the /24 network
+                first_level[bucket] = flag | (len(second_level) // SECOND_LEVEL_SIZE)
+                second_level.extend(array(typecode, [entry]) * SECOND_LEVEL_SIZE)
+            start = (first_level[bucket] & ~flag) * SECOND_LEVEL_SIZE + (network.first & SECOND_LEVEL_MASK)
+            count = 1 << (MAX_PREFIX_LEN_IPV4 - network.prefixlen)
+            second_level[start:start + count] = array(typecode, [index + 1]) * count
+
+        self.first_level = first_level
+        self.second_level = second_level
+
+    def lookup_id(self, address: int) -> int:
+        """
+        Return id of longest prefix matching integer IPv4 address, or 0 for no match
+        """
+        entry = self.first_level[address >> SECOND_LEVEL_BITS]
+        flag = ENTRY_FLAGS[self.typecode]
+        if entry & flag:
+            return self.second_level[((entry & ~flag) << SECOND_LEVEL_BITS) | (address & SECOND_LEVEL_MASK)]
+        return entry
+
+    def lookup_ids(self, addresses: Iterable[int]) -> List[int]:
+        """
+        Return ids of longest prefixes matching integer IPv4 addresses
+        """
+        first_level = self.first_level
+        second_level = self.second_level
+        flag = ENTRY_FLAGS[self.typecode]
+        ids = []
+        for address in addresses:
+            entry = first_level[address >> SECOND_LEVEL_BITS]
+            if entry & flag:
+                entry = second_level[((entry & ~flag) << SECOND_LEVEL_BITS) | (address & SECOND_LEVEL_MASK)]
+            ids.append(entry)
+        return ids
+
+    def get_network(self, prefix_id: int) -> Optional[Network]:
+        """
+        Return prefix for prefix id
+        """
+        return self.networks[prefix_id - 1] if prefix_id else None
+
+    def find(self, value: Any) -> Optional[Network]:
+        """
+        Find longest prefix matching IPv4 address
+        """
+        address = parse_address_or_network(value)
+        if address.version != IPV4_VERSION:
+            return None
+        if isinstance(address, Network):
+            if address.prefixlen == MAX_PREFIX_LEN_IPV4:
+                return self.get_network(self.lookup_id(address.first))
+            raise NetworkError(f'IPv4 lookup table can only look up addresses: {value}')
+        return self.get_network(self.lookup_id(address.value))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save lookup table to a file
+        """
+        header = json.dumps({
+            'version': TABLE_FILE_FORMAT_VERSION,
+            'typecode': self.typecode,
+            'itemsize': array(self.typecode).itemsize,
+            'byteorder': sys.byteorder,
+            'first_level': len(self.first_level),
+            'second_level': len(self.second_level),
+            'networks': [
+                network.as_dict() if hasattr(network, 'as_dict') else {'type': None, 'cidr': str(network.cidr)}
+                for network in self.networks
+            ],
+        }).encode('utf-8')
+        header_size = len(TABLE_FILE_MAGIC) + TABLE_HEADER_LENGTH_BYTES + len(header)
+        padding = b'\0' * (-header_size % TABLE_FILE_ALIGNMENT)
+        path = Path(path).expanduser()
+        try:
+            with path.open('wb') as filedescriptor:
+                filedescriptor.write(TABLE_FILE_MAGIC)
+                filedescriptor.write(len(header).to_bytes(TABLE_HEADER_LENGTH_BYTES, 'little'))
+                filedescriptor.write(header)
+                filedescriptor.write(padding)
+                filedescriptor.write(self.first_level)
+                filedescriptor.write(self.second_level)
+        except Exception as error:
+            raise NetworkError(f'Error writing IPv4 lookup table {path}: {error}') from error
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'IPv4LookupTable':
+        """
+        Load lookup table from a file
+
+        Lookup arrays are memory mapped from the file without copying them. Tables saved
+        with different byte order are copied and converted.
+        """
+        path = Path(path).expanduser()
+        try:
+            with path.open('rb') as filedescriptor:
+                data = mmap.mmap(filedescriptor.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception as error:
+            raise NetworkError(f'Error reading IPv4 lookup table {path}: {error}') from error
+
+        tables = []
+        try:
+            if data[:len(TABLE_FILE_MAGIC)] != TABLE_FILE_MAGIC:
+                raise NetworkError('Invalid file format')
+            offset = len(TABLE_FILE_MAGIC) + TABLE_HEADER_LENGTH_BYTES
+            header_length = int.from_bytes(data[len(TABLE_FILE_MAGIC):offset], 'little')
+            header = json.loads(data[offset:offset + header_length])
+            if header['version'] != TABLE_FILE_FORMAT_VERSION:
+                raise NetworkError(f'Unsupported file format version {header["version"]}')
+            offset += header_length
+            offset += -offset % TABLE_FILE_ALIGNMENT
+
+            typecode = header['typecode']
+            if typecode not in ENTRY_TYPECODES or array(typecode).itemsize != header['itemsize']:
+                raise NetworkError(f'Unsupported table entry type {typecode} size {header["itemsize"]}')
+            networks = [
+                LOADER_CLASSES.get(record['type'], NetworkSetItem)(record['cidr'], record)
+                if record['type'] is not None else Network(record['cidr'])
+                for record in header['networks']
+            ]
+            for length in (header['first_level'], header['second_level']):
+                size = length * header['itemsize']
+                if offset + size > len(data):
+                    raise NetworkError('Truncated file')
+                view = memoryview(data)[offset:offset + size]
+                if header['byteorder'] == sys.byteorder:
+                    tables.append(view.cast(typecode))
+                else:
+                    values = array(typecode)
+                    values.frombytes(view)
+                    values.byteswap()
+                    tables.append(values)
+                view.release()
+                offset += size
+        except Exception as error:
+            for table in tables:
+                if isinstance(table, memoryview):
+                    table.release()
+            data.close()
+            raise NetworkError(f'Error loading IPv4 lookup table {path}: {error}') from error
+
+        table = cls.__new__(cls)
+        table.networks = networks
+        table.typecode = typecode
+        table.first_level, table.second_level = tables
+        table.__mmap__ = data
+        return table
+
+    def close(self) -> None:
+        """
+        Release memory mapped lookup arrays of a loaded table
+        """
+        if self.__mmap__ is None:
+            return
+        for table in (self.first_level, self.second_level):
+            if isinstance(table, memoryview):
+                table.release()
+        self.first_level = array(self.typecode)
+        self.second_level = array(self.typecode)
+        self.__mmap__.close()
+        self.__mmap__ = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return lookup table details as dictionary
+        """
+        return {
+            'prefixes': len(self.networks),
+            'second_level_tables': self.second_level_count,
+            'entry_size': array(self.typecode).itemsize,
+            'size': self.size,
+        }
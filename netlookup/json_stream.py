@@ -0,0 +1,182 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Incremental parser for JSON documents with large arrays of records
+
+Members of a top level JSON object are decoded from chunks of data as they arrive. Items
+of selected array members are returned one by one, so the full document is never kept in
+memory as text or as decoded objects.
+"""
+import codecs
+import json
+import re
+
+from typing import Any, Collection, Iterable, Iterator, Set, Tuple, Union
+
+from .exceptions import NetworkError
+
+DEFAULT_CHUNK_SIZE = 65536
+
+RE_WHITESPACE = re.compile(r'[ \t\n\r]*')
+RE_ARRAY_SEPARATOR = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+DECODER = json.JSONDecoder()
+
+
+class JSONObjectStream:
+    """
+    Incremental parser for members of a top level JSON object
+
+    Keys of parsed members are collected to keys, so empty array members can be told apart
+    from missing members.
+    """
+    array_keys: Collection[str]
+    keys: Set[str]
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], array_keys: Collection[str] = ()) -> None:
+        self.array_keys = array_keys
+        self.keys = set()
+        self.__chunks__ = iter(chunks)
+        self.__decoder__ = codecs.getincrementaldecoder('utf-8')()
+        self.__buffer__ = ''
+        self.__position__ = 0
+        self.__eof__ = False
+
+    def __read__(self) -> bool:
+        """
+        Read next chunk of data to buffer. Returns False at end of data.
+        """
+        if self.__eof__:
+            return False
+        try:
+            chunk = next(self.__chunks__)
+        except StopIteration:
+            chunk = b''
+            self.__eof__ = True
+        try:
+            text = self.__decoder__.decode(chunk, final=self.__eof__) if isinstance(chunk, bytes) else chunk
+        except UnicodeDecodeError as error:
+            raise NetworkError(f'Invalid JSON data: {error}') from error
+        if self.__position__ > len(self.__buffer__) // 2:
+            self.__buffer__ = self.__buffer__[self.__position__:]
+            self.__position__ = 0
+        self.__buffer__ += text
+        return not self.__eof__ or bool(text)
+
+    def __skip_whitespace__(self) -> str:
+        """
+        Skip whitespace and return next character, or empty string at end of data
+        """
+        while True:
+            self.__position__ = RE_WHITESPACE.match(self.__buffer__, self.__position__).end()
+            if self.__position__ < len(self.__buffer__):
+                return self.__buffer__[self.__position__]
+            if not self.__read__():
+                return ''
+
+    def __expect__(self, characters: str) -> str:
+        """
+        Consume next non-whitespace character, which must be one of given characters
+        """
+        character = self.__skip_whitespace__()
+        if not character or character not in characters:
+            raise NetworkError(
+                f'Invalid JSON data: expected one of "{characters}" at offset {self.__position__}, '
+                f'found "{character}"'
+            )
+        self.__position__ += 1
+        return character
+
+    def __decode_value__(self) -> Any:
+        """
+        Decode next JSON value, reading more data until the value is complete
+
+        A decoded value is only accepted when it is followed by more data, so numbers split
+        between chunks are not decoded partially. Buffer size is doubled between attempts, so
+        large values are not decoded again for every chunk.
+        """
+        self.__skip_whitespace__()
+        attempt_size = 0
+        while True:
+            available = len(self.__buffer__) - self.__position__
+            if available >= attempt_size or self.__eof__:
+                try:
+                    value, end = DECODER.raw_decode(self.__buffer__, self.__position__)
+                    if end < len(self.__buffer__) or self.__eof__:
+                        self.__position__ = end
+                        return value
+                except json.JSONDecodeError as error:
+                    if self.__eof__:
+                        raise NetworkError(f'Invalid JSON data: {error}') from error
+                attempt_size = available * 2
+            if not self.__read__() and not self.__eof__:
+                raise NetworkError('Invalid JSON data: unexpected end of data')
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate (key, value) pairs of top level object members, with one pair for each item
+        of array members selected with array_keys
+        """
+        self.__expect__('{')
+        if self.__skip_whitespace__() == '}':
+            self.__position__ += 1
+        else:
+            while True:
+                key = self.__decode_value__()
+                if not isinstance(key, str):
+                    raise NetworkError(f'Invalid JSON data: object key {key!r} is not a string')
+                self.__expect__(':')
+                self.keys.add(key)
+                if key in self.array_keys:
+                    yield from self.__iter_array__(key)
+                else:
+                    yield key, self.__decode_value__()
+                if self.__expect__(',}') == '}':
+                    break
+        if self.__skip_whitespace__():
+            raise NetworkError(f'Invalid JSON data: extra data at offset {self.__position__}')
+
+    def __iter_array__(self, key: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate items of an array member
+        """
+        self.__expect__('[')
+        if self.__skip_whitespace__() == ']':
+            self.__position__ += 1
+            return
+        while True:
+            yield key, self.__decode_value__()
+            # Fast path for separators and whitespace already in buffer
+            match = RE_ARRAY_SEPARATOR.match(self.__buffer__, self.__position__)
+            if match is not None and match.end() < len(self.__buffer__):
+                self.__position__ = match.end()
+                separator = match.group(1)
+            else:
+                separator = self.__expect__(',]')
+            if separator == ']':
+                return
+
+
+def iter_json_object_members(
+        chunks: Iterable[Union[bytes, str]],
+        array_keys: Collection[str] = ()) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate members of a top level JSON object decoded incrementally from chunks of data
+
+    Items of array members with keys in array_keys are returned one by one as (key, item).
+    """
+    return iter(JSONObjectStream(chunks, array_keys))
+
+
+def iter_file_chunks(filedescriptor, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Union[bytes, str]]:
+    """
+    Iterate chunks of data read from an open file
+    """
+    while True:
+        chunk = filedescriptor.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Least recently used cache for address lookup results
+"""
+import threading
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence, Tuple, Union
+
+from .exceptions import NetworkError
+from .network import parse_address_or_network
+
+# Returned from LookupCache.get() for values not in cache, lookup results may be None
+MISSING = object()
+
+
+def lookup_cache_key(value: Any, types: Optional[Union[str, Sequence[str]]] = None) -> Tuple:
+    """
+    Return lookup cache key for address or network value and lookup types
+
+    Values are normalized to (version, value, prefixlen), so equivalent addresses share a
+    cache entry and unhashable Network objects can be cached. Prefix length is None for
+    addresses. Raises NetworkError for invalid values.
+    """
+    address = parse_address_or_network(value)
+    if types is not None:
+        types = (types,) if isinstance(types, str) else tuple(types)
+    return address.version, address.value, getattr(address, 'prefixlen', None), types
+
+
+class LookupCache:
+    """
+    LRU cache of address lookup results, including lookups with no match
+
+    The cache is safe to share between threads, for example the connection threads of the
+    lookup daemon.
+    """
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise NetworkError(f'Invalid lookup cache size {maxsize}')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__entries__ = OrderedDict()
+        self.__lock__ = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries__
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Ratio of cache lookups found in cache
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return cached lookup result for key, or MISSING if key is not cached
+        """
+        with self.__lock__:
+            value = self.__entries__.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            self.__entries__.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Optional[Any]) -> None:
+        """
+        Store lookup result for key, evicting least recently used entries
+        """
+        with self.__lock__:
+            self.__entries__[key] = value
+            self.__entries__.move_to_end(key)
+            while len(self.__entries__) > self.maxsize:
+                self.__entries__.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all cached lookup results
+        """
+        with self.__lock__:
+            self.__entries__.clear()
@@ -0,0 +1,316 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Prometheus text format metrics for prefixes, with optional HTTP endpoint
+
+Metrics are rendered on demand from prefix data and statistics counters, so lookups do not
+update any metric state themselves. Refresh and lookup metrics require statistics to be
+enabled for the prefixes.
+"""
+import threading
+
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .stats import LatencyHistogram, LookupStatistics
+
+if TYPE_CHECKING:
+    from .prefixes import Prefixes
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+DEFAULT_METRICS_ADDRESS = '127.0.0.1'
+DEFAULT_METRICS_PORT = 9108
+
+# Lookup latency histogram bucket upper bounds in seconds
+LOOKUP_LATENCY_BUCKETS = (
+    0.000001,
+    0.0000025,
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+
+Labels = Dict[str, str]
+
+
+def escape_label_value(value: str) -> str:
+    """
+    Escape label value for Prometheus text format
+    """
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_sample_value(value: Union[int, float]) -> str:
+    """
+    Format sample value for Prometheus text format
+    """
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+class MetricFamily:
+    """
+    Prometheus metric family with samples
+    """
+    name: str
+    type: str
+    help: str
+    samples: List[Tuple[str, Labels, Union[int, float]]]
+
+    def __init__(self, name: str, type: str, help: str) -> None:  # pylint: disable=redefined-builtin
+        self.name = name
+        self.type = type
+        self.help = help
+        self.samples = []
+
+    def add(self, value: Union[int, float], labels: Optional[Labels] = None, suffix: str = '') -> None:
+        """
+        Add a sample to metric family
+        """
+        self.samples.append((suffix, labels or {}, value))
+
+    def add_histogram(self, histogram: LatencyHistogram, labels: Optional[Labels] = None) -> None:
+        """
+        Add Prometheus histogram samples from a nanosecond latency histogram
+
+        Latency histogram buckets are counted for the first bound not smaller than the
+        bucket upper bound, so bucket counts are exact to the latency histogram precision.
+        """
+        labels = labels or {}
+        counts = [0] * len(LOOKUP_LATENCY_BUCKETS)
+        total = 0
+        for upper, count in histogram:
+            total += count
+            for index, bound in enumerate(LOOKUP_LATENCY_BUCKETS):
+                if upper <= bound * 1e9:
+                    counts[index] += count
+                    break
+        cumulative = 0
+        for bound, count in zip(LOOKUP_LATENCY_BUCKETS, counts):
+            cumulative += count
+            self.add(cumulative, {**labels, 'le': format_sample_value(bound)}, '_bucket')
+        self.add(total, {**labels, 'le': '+Inf'}, '_bucket')
+        self.add(histogram.total / 1e9, labels, '_sum')
+        self.add(total, labels, '_count')
+
+    def render(self) -> str:
+        """
+        Render metric family in Prometheus text format
+        """
+        lines = [
+            f'# HELP {self.name} {self.help}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for suffix, labels, value in self.samples:
+            label_text = ','.join(f'{key}="{escape_label_value(label)}"' for key, label in labels.items())
+            label_text = f'{{{label_text}}}' if label_text else ''
+            lines.append(f'{self.name}{suffix}{label_text} {format_sample_value(value)}')
+        return ''.join(f'{line}\n' for line in lines)
+
+
+def lookup_metric_families(prefix: str, description: str) -> Tuple[MetricFamily, MetricFamily]:
+    """
+    Return metric families for lookup counters and latency histogram
+    """
+    return (
+        MetricFamily(f'{prefix}_lookups_total', 'counter', f'Number of {description} lookups'),
+        MetricFamily(f'{prefix}_lookup_duration_seconds', 'histogram', f'Latency of {description} lookups'),
+    )
+
+
+def add_lookup_metrics(
+        families: Tuple[MetricFamily, MetricFamily],
+        stats: LookupStatistics,
+        labels: Labels) -> None:
+    """
+    Add lookup counter and latency samples from lookup statistics
+    """
+    lookups, latency = families
+    lookups.add(stats.hits, {**labels, 'result': 'hit'})
+    lookups.add(stats.lookups - stats.hits, {**labels, 'result': 'miss'})
+    latency.add_histogram(stats.latency, labels)
+
+
+def collect_metrics(prefixes: 'Prefixes', now: Optional[datetime] = None) -> List[MetricFamily]:
+    """
+    Collect metric families for prefixes
+    """
+    prefix_count = MetricFamily('netlookup_vendor_prefixes', 'gauge', 'Number of loaded vendor prefixes')
+    updated = MetricFamily(
+        'netlookup_vendor_updated_timestamp_seconds', 'gauge', 'Time vendor prefix data was updated'
+    )
+    age = MetricFamily('netlookup_vendor_cache_age_seconds', 'gauge', 'Age of vendor prefix data')
+    for vendor in prefixes.vendors:
+        labels = {'vendor': vendor.type}
+        prefix_count.add(len(vendor.__networks__), labels)
+        if vendor.updated is not None:
+            current = now if now is not None else datetime.now(vendor.updated.tzinfo)
+            updated.add(vendor.updated.timestamp(), labels)
+            age.add((current - vendor.updated).total_seconds(), labels)
+    families = [prefix_count, updated, age]
+
+    if prefixes.lookup_cache is not None:
+        cache_size = MetricFamily('netlookup_lookup_cache_entries', 'gauge', 'Number of cached lookup results')
+        cache_size.add(len(prefixes.lookup_cache))
+        cache_requests = MetricFamily(
+            'netlookup_lookup_cache_requests_total', 'counter', 'Number of lookup cache reads'
+        )
+        cache_requests.add(prefixes.lookup_cache.hits, {'result': 'hit'})
+        cache_requests.add(prefixes.lookup_cache.misses, {'result': 'miss'})
+        families.extend([cache_size, cache_requests])
+
+    stats = prefixes.stats
+    if stats is None:
+        return families
+
+    loads = MetricFamily('netlookup_loads_total', 'counter', 'Number of prefix cache loads')
+    loads.add(stats.loads)
+    load_seconds = MetricFamily('netlookup_load_duration_seconds_total', 'counter', 'Time spent loading prefixes')
+    load_seconds.add(stats.load_seconds)
+    lookups = lookup_metric_families('netlookup', 'prefix')
+    add_lookup_metrics(lookups, stats, {})
+    families.extend([loads, load_seconds, *lookups])
+
+    vendor_loads = MetricFamily('netlookup_vendor_loads_total', 'counter', 'Number of vendor cache file loads')
+    vendor_load_seconds = MetricFamily(
+        'netlookup_vendor_load_duration_seconds_total', 'counter', 'Time spent loading vendor cache files'
+    )
+    cache_misses = MetricFamily(
+        'netlookup_vendor_cache_misses_total', 'counter', 'Number of vendor loads with no cache file'
+    )
+    refreshes = MetricFamily('netlookup_vendor_refreshes_total', 'counter', 'Number of vendor prefix data refreshes')
+    refresh_seconds = MetricFamily(
+        'netlookup_vendor_refresh_duration_seconds_total', 'counter', 'Time spent refreshing vendor prefix data'
+    )
+    vendor_lookups = lookup_metric_families('netlookup_vendor', 'vendor network set')
+    for vendor in list(stats.vendors.values()):
+        labels = {'vendor': vendor.type}
+        vendor_loads.add(vendor.loads, labels)
+        vendor_load_seconds.add(vendor.load_seconds, labels)
+        cache_misses.add(vendor.cache_misses, labels)
+        refreshes.add(vendor.fetches - vendor.fetch_errors, {**labels, 'result': 'success'})
+        refreshes.add(vendor.fetch_errors, {**labels, 'result': 'failure'})
+        refresh_seconds.add(vendor.fetch_seconds, labels)
+        add_lookup_metrics(vendor_lookups, vendor, labels)
+    families.extend([vendor_loads, vendor_load_seconds, cache_misses, refreshes, refresh_seconds, *vendor_lookups])
+    return families
+
+
+def render_metrics(prefixes: 'Prefixes', now: Optional[datetime] = None) -> str:
+    """
+    Render prefixes metrics in Prometheus text format
+    """
+    return ''.join(family.render() for family in collect_metrics(prefixes, now))
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP request handler for metrics endpoint
+    """
+    server: 'MetricsHTTPServer'
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Return rendered metrics
+        """
+        if self.path.split('?', 1)[0] != METRICS_PATH:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        payload = render_metrics(self.server.prefixes).encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=redefined-builtin
+        """
+        Do not log requests
+        """
+
+
+class MetricsHTTPServer(ThreadingHTTPServer):
+    """
+    HTTP server for prefixes metrics
+    """
+    daemon_threads = True
+
+    def __init__(self, prefixes: 'Prefixes', address: str, port: int) -> None:
+        super().__init__((address, port), MetricsRequestHandler)
+        self.prefixes = prefixes
+
+
+class MetricsServer:
+    """
+    Serve prefixes metrics over HTTP from a background thread
+    """
+    prefixes: 'Prefixes'
+    address: str
+    port: int
+    server: Optional[MetricsHTTPServer]
+    thread: Optional[threading.Thread]
+
+    def __init__(self,
+                 prefixes: 'Prefixes',
+                 address: str = DEFAULT_METRICS_ADDRESS,
+                 port: int = DEFAULT_METRICS_PORT) -> None:
+        self.prefixes = prefixes
+        self.address = address
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def __enter__(self) -> 'MetricsServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        URL of the metrics endpoint
+        """
+        return f'http://{self.address}:{self.port}{METRICS_PATH}'
+
+    def start(self) -> None:
+        """
+        Start serving metrics in a background thread. Port 0 selects a free port.
+        """
+        self.server = MetricsHTTPServer(self.prefixes, self.address, self.port)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='netlookup-metrics', daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop serving metrics
+        """
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+        self.thread = None
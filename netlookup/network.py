@@ -7,7 +7,9 @@
 Extensions to netaddr objects as networks
 """
 from bisect import bisect_left
-from typing import Any, List, Optional, Union
+from collections.abc import Sequence
+from socket import AF_INET6, inet_ntoa, inet_ntop
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from netaddr.ip import IPNetwork, IPAddress
 from netaddr.core import AddrFormatError
@@ -15,6 +17,22 @@ from netaddr.core import AddrFormatError
 from .constants import IPV4_VERSION, IPV6_VERSION, MAX_PREFIX_LEN_IPV4, MAX_PREFIX_LEN_IPV6
 from .exceptions import NetworkError
 
+# Field names in Network.details() output, in display order
+NETWORK_DETAILS_FIELDS = (
+    'cidr',
+    'netmask',
+    'netmask_hex',
+    'network',
+    'broadcast',
+    'first_host',
+    'last_host',
+    'total_hosts',
+    'next',
+    'previous',
+    'bits',
+    'reverse_dns',
+)
+
 
 def find_address_in_networks(networks: List['Network'], value: Any) -> Optional['Network']:
     """
@@ -41,6 +59,15 @@ def find_address_in_networks(networks: List['Network'], value: Any) -> Optional[
     return None
 
 
+def format_address(value: int, version: int) -> str:
+    """
+    Format integer address value as string without creating IPAddress objects
+    """
+    if version == IPV4_VERSION:
+        return inet_ntoa(value.to_bytes(4, 'big'))
+    return inet_ntop(AF_INET6, value.to_bytes(16, 'big'))
+
+
 def parse_address_or_network(value: Any) -> Union[IPAddress, 'Network']:
     """
     Parse value as IPAddress or Network
@@ -65,6 +92,75 @@ class NetworkList(list):
         del self[:len(self)]
 
 
+class SubnetSequence(Sequence):
+    """
+    Lazy sequence of subnets of a network split by a prefix length
+
+    Subnets are calculated from integer network address values on access, allowing
+    O(1) length, indexing, slicing and index lookups without iterating the subnets.
+
+    Note that len() fails with OverflowError for sequences longer than sys.maxsize,
+    use the count property for very large IPv6 splits.
+    """
+    def __init__(self, values: range, prefixlen: int, version: int) -> None:
+        self.__values__ = values
+        self.prefixlen = prefixlen
+        self.version = version
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} /{self.prefixlen} count {self.count}>'
+
+    def __len__(self) -> int:
+        return len(self.__values__)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union['Network', 'SubnetSequence']:
+        if isinstance(index, slice):
+            return self.__class__(self.__values__[index], self.prefixlen, self.version)
+        return Network((self.__values__[index], self.prefixlen), version=self.version)
+
+    def __iter__(self) -> Iterator['Network']:
+        for value in self.__values__:
+            yield Network((value, self.prefixlen), version=self.version)
+
+    def __reversed__(self) -> Iterator['Network']:
+        for value in reversed(self.__values__):
+            yield Network((value, self.prefixlen), version=self.version)
+
+    def __contains__(self, value: Any) -> bool:
+        try:
+            self.index(value)
+            return True
+        except ValueError:
+            return False
+
+    @property
+    def count(self) -> int:
+        """
+        Return number of subnets in the sequence
+        """
+        values = self.__values__
+        if values.step > 0:
+            return max(0, (values.stop - values.start + values.step - 1) // values.step)
+        return max(0, (values.start - values.stop - values.step - 1) // -values.step)
+
+    def index(self, value: Any, start: int = 0, stop: Optional[int] = None) -> int:
+        """
+        Return index of specified subnet in the sequence
+
+        Raises ValueError if the value is not a subnet in the sequence
+        """
+        try:
+            network = parse_address_or_network(value)
+        except NetworkError as error:
+            raise ValueError(f'{value} is not in subnets') from error
+        if network.version != self.version or getattr(network, 'prefixlen', None) != self.prefixlen:
+            raise ValueError(f'{value} is not in subnets')
+        index = self.__values__.index(network.value)
+        if index < start or (stop is not None and index >= stop):
+            raise ValueError(f'{value} is not in subnets')
+        return index
+
+
 class Network(IPNetwork):
     """
     Extend IPNetwork with some custom attributes
@@ -198,12 +294,78 @@ class Network(IPNetwork):
         """
         return MAX_PREFIX_LEN_IPV4 if self.version == 4 else MAX_PREFIX_LEN_IPV6
 
-    def subnet(self, prefixlen: int, count: Optional[int] = None, fmt: Optional[str] = None):
+    def details(self) -> Dict[str, Any]:
         """
-        Return subnets split by specified prefix
+        Return details for the network as dictionary
 
-        Adds extra validation for prefixlen, checking the value is not out off scope
-        based on address type
+        Values are calculated from the integer address values of the network and
+        formatted as strings without creating intermediate netaddr objects. Fields
+        not applicable to the network (for example broadcast for /31 network) are
+        returned as None.
+        """
+        version = self.version
+        bits = self.max_prefix_len
+        prefixlen = self.prefixlen
+        first = self.first
+        size = 1 << (bits - prefixlen)
+        last = first + size - 1
+        all_bits = (1 << bits) - 1
+        netmask = all_bits ^ (size - 1)
+
+        if version == IPV4_VERSION:
+            word_size = 8
+            separator = '.'
+            reverse_dns = '.'.join(str((first >> shift) & 0xff) for shift in range(0, 32, 8))
+            reverse_dns = f'{reverse_dns}.in-addr.arpa.'
+        else:
+            word_size = 16
+            separator = ':'
+            reverse_dns = '.'.join(f'{(first >> shift) & 0xf:x}' for shift in range(0, 128, 4))
+            reverse_dns = f'{reverse_dns}.ip6.arpa.'
+        word_mask = (1 << word_size) - 1
+        shifts = range(bits - word_size, -1, -word_size)
+
+        if prefixlen == bits:
+            first_host = last_host = None
+            total_hosts = 1
+        elif prefixlen == bits - 1:
+            first_host = format_address(first, version)
+            last_host = format_address(last, version)
+            total_hosts = 2
+        else:
+            first_host = format_address(first + 1, version)
+            last_host = format_address(last - 1, version)
+            total_hosts = size - 2
+
+        next_value = first + size
+        previous_value = first - size
+        return {
+            'cidr': f'{format_address(first, version)}/{prefixlen}',
+            'netmask': format_address(netmask, version),
+            'netmask_hex': '0x' + ''.join(f'{(netmask >> shift) & word_mask:x}' for shift in shifts),
+            'network': format_address(first, version),
+            'broadcast': format_address(last, version) if bits - prefixlen > 1 else None,
+            'first_host': first_host,
+            'last_host': last_host,
+            'total_hosts': total_hosts,
+            'next': (
+                f'{format_address(next_value, version)}/{prefixlen}'
+                if next_value + size - 1 <= all_bits else None
+            ),
+            'previous': (
+                f'{format_address(previous_value, version)}/{prefixlen}'
+                if previous_value >= 0 else None
+            ),
+            'bits': separator.join(
+                f'{(first >> shift) & word_mask:0{word_size}b}' for shift in shifts
+            ),
+            'reverse_dns': reverse_dns,
+        }
+
+    def __validate_subnet_prefixlen__(self, prefixlen: int) -> int:
+        """
+        Validate prefixlen for splitting the network, checking the value is not out
+        off scope based on address type
         """
         prefixlen = int(prefixlen)
         if prefixlen < 0 or prefixlen > self.max_prefix_len:
@@ -212,4 +374,56 @@ class Network(IPNetwork):
             raise AddrFormatError(
                 f'Split mask {prefixlen} is not valid for prefixlen {self.prefixlen}'
             )
+        return prefixlen
+
+    def subnet(self,
+               prefixlen: int,
+               count: Optional[int] = None,
+               fmt: Optional[str] = None,
+               lazy: bool = False):
+        """
+        Return subnets split by specified prefix
+
+        Adds extra validation for prefixlen, checking the value is not out off scope
+        based on address type
+
+        With lazy set returns a SubnetSequence with random access to the subnets
+        instead of a generator. The fmt argument is ignored for lazy sequences.
+        """
+        prefixlen = self.__validate_subnet_prefixlen__(prefixlen)
+        if lazy:
+            subnets = SubnetSequence(self.__subnet_values__(prefixlen), prefixlen, self.version)
+            return subnets[:count] if count is not None else subnets
         return super().subnet(prefixlen, count, fmt)
+
+    def __subnet_values__(self, prefixlen: int) -> range:
+        """
+        Return range of integer network address values for subnets split by prefix
+        """
+        step = 1 << (self.max_prefix_len - prefixlen)
+        return range(self.first, self.last + 1, step)
+
+    def subnet_count(self, prefixlen: int) -> int:
+        """
+        Return number of subnets when network is split by specified prefix
+        """
+        prefixlen = self.__validate_subnet_prefixlen__(prefixlen)
+        return 1 << (prefixlen - self.prefixlen)
+
+    def iter_subnet_values(self,
+                           prefixlen: int,
+                           offset: int = 0,
+                           count: Optional[int] = None) -> Iterator[int]:
+        """
+        Iterate integer network address values of subnets split by specified prefix
+
+        The values are calculated directly from the network address, starting from
+        subnet with index offset. Subnets before the offset are not generated.
+        """
+        total = self.subnet_count(prefixlen)
+        if offset < 0:
+            raise NetworkError(f'Invalid subnet offset {offset}')
+        if count is not None and count < 0:
+            raise NetworkError(f'Invalid subnet count {count}')
+        end = total if count is None else min(total, offset + count)
+        return iter(self.__subnet_values__(int(prefixlen))[offset:end])
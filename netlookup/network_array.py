@@ -0,0 +1,382 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+NumPy backed arrays of networks for vectorized network operations
+
+Networks are stored as structured NumPy records with address family, prefix length and the
+first and last addresses of the network split to high and low 64 bit words, so IPv6 networks
+fit in unsigned 64 bit integers. Sorting, deduplication, merging, overlap detection and
+containment tests run as array operations instead of interpreted loops over Network objects.
+
+128 bit address comparisons are done with dense ranks of the high and low word pairs, which
+preserve the address order as single 64 bit integers.
+
+NumPy is an optional dependency. Creating a NetworkArray without NumPy installed raises
+NetworkError.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .constants import IPV4_VERSION, IPV6_VERSION, MAX_PREFIX_LEN_IPV4, MAX_PREFIX_LEN_IPV6
+from .exceptions import NetworkError
+from .network import Network, NetworkList, parse_address_or_network
+from .network_sets.base import NetworkSet
+
+# Fields of network array records. IPv4 addresses are stored in the low words.
+NETWORK_ARRAY_FIELDS = (
+    ('version', 'u1'),
+    ('prefixlen', 'u1'),
+    ('first_hi', 'u8'),
+    ('first_lo', 'u8'),
+    ('last_hi', 'u8'),
+    ('last_lo', 'u8'),
+)
+
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+ADDRESS_BITS = {
+    IPV4_VERSION: MAX_PREFIX_LEN_IPV4,
+    IPV6_VERSION: MAX_PREFIX_LEN_IPV6,
+}
+
+Intervals = Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']
+
+
+def require_numpy() -> None:
+    """
+    Check NumPy is available for network arrays
+    """
+    if np is None:
+        raise NetworkError('NetworkArray requires numpy, install it with pip install "netlookup[array]"')
+
+
+def dense_ranks(hi: 'np.ndarray', lo: 'np.ndarray') -> 'np.ndarray':
+    """
+    Return dense ranks of 128 bit values given as high and low 64 bit words
+
+    Equal values get the same rank and ranks preserve the order of the values.
+    """
+    order = np.lexsort((lo, hi))
+    sorted_hi = hi[order]
+    sorted_lo = lo[order]
+    changed = np.zeros(len(order), dtype=bool)
+    changed[1:] = (sorted_hi[1:] != sorted_hi[:-1]) | (sorted_lo[1:] != sorted_lo[:-1])
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.cumsum(changed)
+    return ranks
+
+
+def range_to_cidrs(first: int, end: int, bits: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split address range from first address until end address (exclusive) to a minimal list
+    of CIDR network addresses and prefix lengths
+    """
+    while first < end:
+        size = first & -first if first else 1 << bits
+        while size > end - first:
+            size >>= 1
+        yield first, bits - size.bit_length() + 1
+        first += size
+
+
+class NetworkArray:
+    """
+    Array of networks stored as structured NumPy records
+
+    Original network objects, for example vendor prefixes with extra attributes, are kept in
+    a parallel object array and returned by to_network_list() and indexing. Networks created
+    by merge() are plain Network objects.
+
+    Records should be treated as read only: operations return new arrays.
+    """
+    records: 'np.ndarray'
+    items: Optional['np.ndarray']
+
+    def __init__(self, networks: Optional[Iterable[Any]] = None) -> None:
+        require_numpy()
+        items = []
+        for value in networks if networks is not None else ():
+            if not isinstance(value, Network):
+                try:
+                    value = Network(value)
+                except Exception as error:
+                    raise NetworkError(f'Error parsing network {value}: {error}') from error
+            items.append(value)
+        self.records = np.array(
+            [
+                (
+                    network.version,
+                    network.prefixlen,
+                    network.first >> WORD_BITS,
+                    network.first & WORD_MASK,
+                    network.last >> WORD_BITS,
+                    network.last & WORD_MASK,
+                )
+                for network in items
+            ],
+            dtype=np.dtype(list(NETWORK_ARRAY_FIELDS))
+        )
+        self.items = np.empty(len(items), dtype=object)
+        for index, network in enumerate(items):
+            self.items[index] = network
+        self.__intervals__: Dict[int, Intervals] = {}
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {len(self)} networks>'
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Network]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: Union[int, slice, 'np.ndarray']) -> Union[Network, 'NetworkArray']:
+        if isinstance(index, (int, np.integer)):
+            if self.items is not None:
+                return self.items[index]
+            record = self.records[index]
+            value = (int(record['first_hi']) << WORD_BITS) | int(record['first_lo'])
+            return Network((value, int(record['prefixlen'])), version=int(record['version']))
+        return self.__take__(index)
+
+    @classmethod
+    def from_records(cls, records: 'np.ndarray', items: Optional['np.ndarray'] = None) -> 'NetworkArray':
+        """
+        Create network array from structured records and optional network objects
+        """
+        network_array = cls()
+        network_array.records = records
+        network_array.items = items
+        return network_array
+
+    @classmethod
+    def from_network_set(cls, network_set: NetworkSet) -> 'NetworkArray':
+        """
+        Create network array from networks of a network set
+        """
+        # Go directly to attribute, iterating network set may trigger fetch
+        return cls(network_set.__networks__)
+
+    def __take__(self, index: Union[slice, 'np.ndarray']) -> 'NetworkArray':
+        """
+        Return network array with records and items at index
+        """
+        return self.from_records(
+            self.records[index],
+            self.items[index] if self.items is not None else None
+        )
+
+    def __sort_order__(self) -> 'np.ndarray':
+        """
+        Return indexes of records sorted by address family, first address and prefix length
+        """
+        records = self.records
+        return np.lexsort((records['prefixlen'], records['first_lo'], records['first_hi'], records['version']))
+
+    def __merged_intervals__(self, version: int) -> Intervals:
+        """
+        Return first and last address words of sorted, disjoint and non-adjacent address
+        ranges covered by networks of an address family
+        """
+        try:
+            return self.__intervals__[version]
+        except KeyError:
+            pass
+
+        records = self.records[self.records['version'] == version]
+        if not len(records):
+            empty = np.zeros(0, dtype=np.uint64)
+            self.__intervals__[version] = (empty, empty, empty, empty)
+            return self.__intervals__[version]
+
+        first_hi = records['first_hi']
+        first_lo = records['first_lo']
+        # Ranges end at the address after last address. The end of the last address of the
+        # address space wraps to zero words and is ranked after all other addresses.
+        end_lo = records['last_lo'] + np.uint64(1)
+        end_hi = records['last_hi'] + (end_lo == 0).astype(np.uint64)
+        wrapped = (end_hi == 0) & (end_lo == 0)
+
+        count = len(records)
+        ranks = dense_ranks(np.concatenate((first_hi, end_hi)), np.concatenate((first_lo, end_lo)))
+        first_ranks = ranks[:count]
+        end_ranks = ranks[count:]
+        end_ranks[wrapped] = count * 2
+
+        order = np.argsort(first_ranks, kind='stable')
+        first_ranks = first_ranks[order]
+        max_end_ranks = np.maximum.accumulate(end_ranks[order])
+        starts = np.ones(count, dtype=bool)
+        starts[1:] = first_ranks[1:] > max_end_ranks[:-1]
+        start_indexes = np.flatnonzero(starts)
+        last_indexes = np.append(start_indexes[1:] - 1, count - 1).astype(np.int64)
+
+        # Find the range with the maximum end rank in each group to get its address words
+        end_index_by_rank = np.empty(count * 2 + 1, dtype=np.int64)
+        end_index_by_rank[end_ranks[order]] = order
+        end_indexes = end_index_by_rank[max_end_ranks[last_indexes]]
+        group_end_lo = end_lo[end_indexes]
+        group_end_hi = end_hi[end_indexes]
+
+        intervals = (
+            first_hi[order][start_indexes],
+            first_lo[order][start_indexes],
+            group_end_hi - (group_end_lo == 0).astype(np.uint64),
+            group_end_lo - np.uint64(1),
+        )
+        self.__intervals__[version] = intervals
+        return intervals
+
+    def sort(self) -> 'NetworkArray':
+        """
+        Return networks sorted by address family, first address and prefix length
+        """
+        return self.__take__(self.__sort_order__())
+
+    def unique(self) -> 'NetworkArray':
+        """
+        Return sorted networks with duplicate networks removed
+        """
+        order = self.__sort_order__()
+        records = self.records[order]
+        keep = np.ones(len(records), dtype=bool)
+        if len(records) > 1:
+            keep[1:] = False
+            for field in ('version', 'prefixlen', 'first_hi', 'first_lo'):
+                keep[1:] |= records[field][1:] != records[field][:-1]
+        return self.__take__(order[keep])
+
+    def merge(self) -> 'NetworkArray':
+        """
+        Return minimal merged CIDR cover of the networks
+        """
+        networks = []
+        for version, bits in ADDRESS_BITS.items():
+            first_hi, first_lo, last_hi, last_lo = self.__merged_intervals__(version)
+            for index in range(len(first_hi)):
+                first = (int(first_hi[index]) << WORD_BITS) | int(first_lo[index])
+                last = (int(last_hi[index]) << WORD_BITS) | int(last_lo[index])
+                for value, prefixlen in range_to_cidrs(first, last + 1, bits):
+                    networks.append(Network((value, prefixlen), version=version))
+        return self.__class__(networks)
+
+    def overlaps(self) -> 'np.ndarray':
+        """
+        Return boolean mask of networks overlapping another network in the array
+
+        CIDR networks either nest or are disjoint. In sorted order a network overlaps an earlier
+        network containing it, or the next network if it contains the next network.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        for version in ADDRESS_BITS:
+            indexes = np.flatnonzero(self.records['version'] == version)
+            if len(indexes) < 2:
+                continue
+            records = self.records[indexes]
+            order = np.lexsort((records['prefixlen'], records['first_lo'], records['first_hi']))
+            records = records[order]
+            count = len(records)
+            ranks = dense_ranks(
+                np.concatenate((records['first_hi'], records['last_hi'])),
+                np.concatenate((records['first_lo'], records['last_lo'])),
+            )
+            first_ranks = ranks[:count]
+            last_ranks = ranks[count:]
+            overlapping = np.zeros(count, dtype=bool)
+            overlapping[1:] = first_ranks[1:] <= np.maximum.accumulate(last_ranks)[:-1]
+            overlapping[:-1] |= first_ranks[1:] <= last_ranks[:-1]
+            mask[indexes[order]] = overlapping
+        return mask
+
+    def contains(self, addresses: Union[Iterable[Any], 'np.ndarray']) -> 'np.ndarray':
+        """
+        Return boolean mask of addresses or networks contained in the networks of the array
+
+        Addresses can be given as address or network values, or as NumPy integer array of
+        IPv4 address values. Networks are contained if all of their addresses are covered
+        by the networks of the array.
+        """
+        require_numpy()
+        if isinstance(addresses, np.ndarray) and np.issubdtype(addresses.dtype, np.integer):
+            versions = np.full(len(addresses), IPV4_VERSION, dtype=np.uint8)
+            first_hi = np.zeros(len(addresses), dtype=np.uint64)
+            first_lo = addresses.astype(np.uint64)
+            last_hi = first_hi
+            last_lo = first_lo
+        else:
+            values = []
+            for value in addresses:
+                try:
+                    address = parse_address_or_network(value)
+                except NetworkError as error:
+                    raise NetworkError(f'Error parsing address {value}: {error}') from error
+                if isinstance(address, Network):
+                    values.append((address.version, address.first, address.last))
+                else:
+                    values.append((address.version, address.value, address.value))
+            versions = np.array([value[0] for value in values], dtype=np.uint8)
+            first_hi = np.array([value[1] >> WORD_BITS for value in values], dtype=np.uint64)
+            first_lo = np.array([value[1] & WORD_MASK for value in values], dtype=np.uint64)
+            last_hi = np.array([value[2] >> WORD_BITS for value in values], dtype=np.uint64)
+            last_lo = np.array([value[2] & WORD_MASK for value in values], dtype=np.uint64)
+
+        mask = np.zeros(len(versions), dtype=bool)
+        for version in ADDRESS_BITS:
+            selected = versions == version
+            if not selected.any():
+                continue
+            intervals = self.__merged_intervals__(version)
+            count = len(intervals[0])
+            if not count:
+                continue
+            if version == IPV4_VERSION:
+                # IPv4 addresses fit in the low words and can be compared directly
+                start_keys = intervals[1]
+                end_keys = intervals[3]
+                first_keys = first_lo[selected]
+                last_keys = last_lo[selected]
+            else:
+                queries = int(selected.sum())
+                ranks = dense_ranks(
+                    np.concatenate((intervals[0], intervals[2], first_hi[selected], last_hi[selected])),
+                    np.concatenate((intervals[1], intervals[3], first_lo[selected], last_lo[selected])),
+                )
+                start_keys = ranks[:count]
+                end_keys = ranks[count:count * 2]
+                first_keys = ranks[count * 2:count * 2 + queries]
+                last_keys = ranks[count * 2 + queries:]
+            index = np.searchsorted(start_keys, first_keys, side='right') - 1
+            mask[selected] = (index >= 0) & (end_keys[np.maximum(index, 0)] >= last_keys)
+        return mask
+
+    def to_network_list(self) -> NetworkList:
+        """
+        Return networks as network list
+        """
+        return NetworkList(self)
+
+    def to_network_set(self, network_set_class: Type[NetworkSet] = NetworkSet) -> NetworkSet:
+        """
+        Return networks as network set of specified class
+
+        Networks which are not prefixes of the network set are converted to the loader class
+        of the network set.
+        """
+        network_set = network_set_class()
+        loader_class = network_set.loader_class
+        networks: List[Network] = [
+            network if isinstance(network, loader_class) else loader_class(network)
+            for network in self
+        ]
+        network_set.__networks__ = NetworkList(networks)
+        network_set.__sort_networks__()
+        return network_set
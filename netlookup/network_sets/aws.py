@@ -6,46 +6,148 @@
 """
 AWS address prefix set
 """
-import json
-
 from datetime import datetime
 from http import HTTPStatus
-from operator import attrgetter
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-import requests
+from netaddr import cidr_merge
 
 from ..exceptions import NetworkError
+from ..json_stream import iter_json_object_members
+from ..network import Network, NetworkList
+from ..query import AttributeIndex
 from .base import NetworkSet, NetworkSetItem
 from .constants import REQUEST_TIMEOUT
 
-if TYPE_CHECKING:
-    from ..network import Network
-
 AWS_IP_RANGES_URL = 'https://ip-ranges.amazonaws.com/ip-ranges.json'
+AWS_IP_RANGES_PREFIX_KEYS = (
+    'prefixes',
+    'ipv6_prefixes',
+)
+AWS_IP_RANGES_CHUNK_SIZE = 65536
 SKIP_SERVICE_NAMES = (
     'AMAZON',
 )
 
+AWSIndexKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
 
 class AWSPrefix(NetworkSetItem):
     """
-    AWS network prefix with region and service details
+    AWS network prefix with region, service and network border group details
     """
     type: str = 'aws'
     network: 'Network'
     region: Optional[str]
-    extra_attributes: Tuple[str] = ('region', 'services')
+    services: List[str]
+    network_border_group: Optional[str]
+    extra_attributes: Tuple[str] = ('region', 'services', 'network_border_group')
 
     def __init__(self, network: 'Network', data: dict = None):
         self.region = None
         self.services = []
+        self.network_border_group = None
         super().__init__(network, data)
 
     def __repr__(self) -> str:
         return f'{self.type} {self.region} {self.cidr}'
 
 
+class AWSPrefixIndex(AttributeIndex):
+    """
+    Index of AWS prefixes by region, service and network border group
+
+    Attribute index of AWS prefixes, which is also used for attribute queries of the network
+    set. Prefixes matching a combination of attributes and their merged CIDR covers are
+    cached per combination.
+    """
+    networks: Sequence[AWSPrefix]
+
+    def __init__(self,
+                 networks: Sequence[AWSPrefix],
+                 attributes: Sequence[str] = AWSPrefix.extra_attributes) -> None:
+        super().__init__(networks, attributes)
+        self.region_names = self.keys('region')
+        self.service_names = self.keys('services')
+        self.network_border_group_names = self.keys('network_border_group')
+        self.__prefixes__: Dict[AWSIndexKey, Tuple[AWSPrefix, ...]] = {}
+        self.__covers__: Dict[AWSIndexKey, Tuple[Network, ...]] = {}
+
+    @property
+    def regions(self) -> Dict[str, List[int]]:
+        """
+        Prefix ids by region
+        """
+        return self.values['region']
+
+    @property
+    def services(self) -> Dict[str, List[int]]:
+        """
+        Prefix ids by service
+        """
+        return self.values['services']
+
+    @property
+    def network_border_groups(self) -> Dict[str, List[int]]:
+        """
+        Prefix ids by network border group
+        """
+        return self.values['network_border_group']
+
+    def prefix_ids(self,
+                   region: Optional[str] = None,
+                   service: Optional[str] = None,
+                   network_border_group: Optional[str] = None) -> List[int]:
+        """
+        Return sorted ids of prefixes matching all given attributes
+        """
+        lookups = (
+            (self.regions, region),
+            (self.services, service),
+            (self.network_border_groups, network_border_group),
+        )
+        matches = sorted(
+            (index.get(value, ()) for index, value in lookups if value is not None),
+            key=len
+        )
+        if not matches:
+            return list(range(len(self.networks)))
+        prefix_ids = set(matches[0])
+        for values in matches[1:]:
+            prefix_ids.intersection_update(values)
+        return sorted(prefix_ids)
+
+    def prefixes(self,
+                 region: Optional[str] = None,
+                 service: Optional[str] = None,
+                 network_border_group: Optional[str] = None) -> Tuple[AWSPrefix, ...]:
+        """
+        Return prefixes matching all given attributes
+        """
+        key = (region, service, network_border_group)
+        try:
+            return self.__prefixes__[key]
+        except KeyError:
+            prefixes = tuple(self.networks[prefix_id] for prefix_id in self.prefix_ids(*key))
+            self.__prefixes__[key] = prefixes
+            return prefixes
+
+    def merged(self,
+               region: Optional[str] = None,
+               service: Optional[str] = None,
+               network_border_group: Optional[str] = None) -> Tuple[Network, ...]:
+        """
+        Return minimal merged CIDR cover of prefixes matching all given attributes
+        """
+        key = (region, service, network_border_group)
+        try:
+            return self.__covers__[key]
+        except KeyError:
+            cover = tuple(Network(network) for network in cidr_merge(prefix.cidr for prefix in self.prefixes(*key)))
+            self.__covers__[key] = cover
+            return cover
+
+
 class AWS(NetworkSet):
     """
     AWS address networks
@@ -53,53 +155,118 @@ class AWS(NetworkSet):
     type: str = 'aws'
     cache_filename: str = 'aws-networks.json'
     loader_class = AWSPrefix
+    sort_attributes: Tuple[str] = ('version', 'region', 'services', 'cidr')
+    attribute_index_class = AWSPrefixIndex
+
+    @property
+    def prefix_index(self) -> AWSPrefixIndex:
+        """
+        Index of prefixes by region, service and network border group
+
+        This is the attribute index of the network set, built on first access after networks
+        are loaded or fetched.
+        """
+        return self.attribute_index
 
     @property
     def regions(self) -> List[str]:
         """
         Return all detected regions
         """
-        return sorted(set(prefix.region for prefix in self))
+        return list(self.prefix_index.region_names)
+
+    @property
+    def services(self) -> List[str]:
+        """
+        Return all detected services
+        """
+        return list(self.prefix_index.service_names)
+
+    @property
+    def network_border_groups(self) -> List[str]:
+        """
+        Return all detected network border groups
+        """
+        return list(self.prefix_index.network_border_group_names)
+
+    def filter(self,
+               region: Optional[str] = None,
+               service: Optional[str] = None,
+               network_border_group: Optional[str] = None) -> List[AWSPrefix]:
+        """
+        Return prefixes matching all given region, service and network border group values
+        """
+        return list(self.prefix_index.prefixes(region, service, network_border_group))
+
+    def merged_cover(self,
+                     region: Optional[str] = None,
+                     service: Optional[str] = None,
+                     network_border_group: Optional[str] = None) -> List[Network]:
+        """
+        Return minimal merged CIDR cover of prefixes matching all given region, service and
+        network border group values
+        """
+        return list(self.prefix_index.merged(region, service, network_border_group))
 
     @staticmethod
-    def __get_aws_ip_ranges__() -> str:
+    def __get_aws_ip_ranges__() -> Iterator[bytes]:
         """
-        Fetch AWS IP ranges
+        Fetch AWS IP ranges, returning chunks of response data as they are received
         """
+        import requests  # pylint: disable=import-outside-toplevel
         try:
-            res = requests.get(AWS_IP_RANGES_URL, timeout=REQUEST_TIMEOUT)
-            if res.status_code != HTTPStatus.OK:
-                raise NetworkError(f'HTTP status code {res.status_code}')
-            return res.content
+            with requests.get(AWS_IP_RANGES_URL, timeout=REQUEST_TIMEOUT, stream=True) as res:
+                if res.status_code != HTTPStatus.OK:
+                    raise NetworkError(f'HTTP status code {res.status_code}')
+                yield from res.iter_content(AWS_IP_RANGES_CHUNK_SIZE)
         except Exception as error:
             raise NetworkError(f'Error fetching AWS IP ranges: {error}') from error
 
+    @staticmethod
+    def __decode_aws_ip_ranges__(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+        """
+        Decode AWS IP range JSON data incrementally
+
+        Returns (key, value) pairs of document attributes and one pair for each prefix record.
+        """
+        return iter_json_object_members(chunks, AWS_IP_RANGES_PREFIX_KEYS)
+
+    def __build_networks__(self, values: Iterable[dict]) -> NetworkList:
+        """
+        Build AWS prefixes from IP range records, merging services of duplicate prefixes
+        """
+        networks = {}
+        for item in values:
+            prefix = self.loader_class(item.get('ip_prefix', item.get('ipv6_prefix')), item)
+            if prefix.cidr not in networks:
+                networks[prefix.cidr] = prefix
+            if item['service'] not in SKIP_SERVICE_NAMES and item['service'] not in networks[prefix.cidr].services:
+                networks[prefix.cidr].services.append(item['service'])
+        return NetworkList(networks.values())
+
     def fetch(self) -> None:
         """
         Fetch AWS IP range data
+
+        Prefix records are built and deduplicated as they are decoded from the response
+        stream, so the whole document is never loaded in memory.
         """
+        attributes: Dict[str, Any] = {}
+
+        def records() -> Iterator[dict]:
+            for key, value in self.__decode_aws_ip_ranges__(self.__get_aws_ip_ranges__()):
+                if key in AWS_IP_RANGES_PREFIX_KEYS:
+                    yield value
+                else:
+                    attributes[key] = value
+
         try:
-            data = json.loads(self.__get_aws_ip_ranges__())
+            networks = self.__build_networks__(records())
+            updated = datetime.fromtimestamp(int(attributes['syncToken']))
+        except NetworkError:
+            raise
         except Exception as error:
             raise NetworkError(f'Error loading AWS IP range data: {error}') from error
-
-        self.updated = datetime.fromtimestamp(int(data['syncToken']))
-
-        networks = {}
-        record_field_map = {
-            'prefixes': 'ip_prefix',
-            'ipv6_prefixes': 'ipv6_prefix',
-        }
-        for group, field in record_field_map.items():
-            for item in data[group]:
-                prefix = self.loader_class(item[field], item)
-                if prefix.cidr not in networks:
-                    networks[prefix.cidr] = prefix
-                if item['service'] not in SKIP_SERVICE_NAMES and item['service'] not in networks[prefix.cidr].services:
-                    networks[prefix.cidr].services.append(item['service'])
-
-        self.__networks__ = []
-        for network in networks.values():
-            self.__networks__.append(network)
-
-        self.__networks__.sort(key=attrgetter('version', 'region', 'services', 'cidr'))
+        self.updated = updated
+        self.__networks__ = networks
+        self.__sort_networks__()
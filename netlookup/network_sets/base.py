@@ -6,16 +6,22 @@
 """
 Base class for network set class
 """
+import asyncio
 import json
 
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from time import perf_counter, perf_counter_ns
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from netaddr.core import AddrFormatError
 from netaddr.ip.sets import IPSet
 
+from ..json_stream import JSONObjectStream, iter_file_chunks
 from ..network import Network, NetworkList, NetworkError, find_address_in_networks
+from ..query import AttributeIndex, Query
+from ..stats import NetworkSetStatistics
 
 
 class NetworkSetItem(Network):
@@ -54,6 +60,31 @@ class NetworkSetItem(Network):
         return data
 
 
+def load_cache_data(chunks: Iterable[Union[bytes, str]],
+                    loader_classes: Optional[Dict[str, type]] = None,
+                    loader_class: type = NetworkSetItem) -> Tuple[datetime, NetworkList]:
+    """
+    Load updated timestamp and networks from chunks of network set cache file data
+
+    Prefix classes are selected by the type of each record from loader_classes, defaulting
+    to loader_class. Raises NetworkError if updated timestamp or networks are missing.
+    """
+    stream = JSONObjectStream(chunks, ('networks',))
+    updated = None
+    networks = NetworkList()
+    for key, value in stream:
+        if key == 'networks':
+            record_class = loader_classes.get(value.get('type'), loader_class) if loader_classes else loader_class
+            networks.append(record_class(value['cidr'], value))
+        elif key == 'updated':
+            updated = datetime.fromisoformat(value)
+    if 'networks' not in stream.keys:
+        raise NetworkError('networks are missing')
+    if updated is None:
+        raise NetworkError('updated timestamp is missing')
+    return updated, networks
+
+
 class NetworkSet:
     """
     Common base class for network address prefix sets with caching
@@ -62,15 +93,21 @@ class NetworkSet:
     cache_directory: Optional[str]
     cache_filename: Optional[str] = None
     updated: Optional[str]
+    stats: Optional[NetworkSetStatistics]
     __networks__: NetworkList
     __iter_index__: Optional[int]
     loader_class = NetworkSetItem
+    sort_attributes: Tuple[str] = ('version', 'cidr')
+    attribute_index_class = AttributeIndex
+    __attribute_index__: Optional[AttributeIndex] = None
 
     def __init__(self,
                  networks: Optional[List[Network]] = None,
-                 cache_directory: Optional[str] = None) -> None:
+                 cache_directory: Optional[str] = None,
+                 stats: Optional[NetworkSetStatistics] = None) -> None:
         self.cache_directory = cache_directory
         self.updated = None
+        self.stats = stats
         self.__networks__ = NetworkList()
         self.__iter_index__ = None
 
@@ -103,7 +140,7 @@ class NetworkSet:
         """
         Filename for prefix data cache file
         """
-        if self.cache_filename is not None:
+        if self.cache_directory is not None and self.cache_filename is not None:
             return Path(self.cache_directory, self.cache_filename)
         return None
 
@@ -114,6 +151,20 @@ class NetworkSet:
         """
         return IPSet([item.cidr for item in self.__networks__])
 
+    @property
+    def attribute_index(self) -> AttributeIndex:
+        """
+        Inverted index of networks by extra attribute values of the loader class
+
+        The index is built on first access after networks are loaded or fetched.
+        """
+        if self.__attribute_index__ is None:
+            self.__attribute_index__ = self.attribute_index_class(
+                self.__networks__,
+                self.loader_class.extra_attributes
+            )
+        return self.__attribute_index__
+
     @property
     def merged(self) -> 'NetworkSet':
         """
@@ -123,12 +174,97 @@ class NetworkSet:
             networks=[self.loader_class(network) for network in self.ipset.iter_cidrs()]
         )
 
+    def enable_stats(self) -> NetworkSetStatistics:
+        """
+        Enable load, fetch and lookup statistics for network set
+        """
+        if self.stats is None:
+            self.stats = NetworkSetStatistics(self.type)
+        return self.stats
+
+    def disable_stats(self) -> None:
+        """
+        Disable statistics for network set
+        """
+        self.stats = None
+
     def fetch(self) -> None:
         """
         Fetch information for network
         """
         raise NotImplementedError('fetch() must be implemented in child class')
 
+    def update(self) -> None:
+        """
+        Fetch network set data and save it to cache file
+        """
+        if self.stats is None:
+            self.fetch()
+        else:
+            start = perf_counter()
+            try:
+                self.fetch()
+            except Exception:
+                self.stats.record_fetch(perf_counter() - start, len(self.__networks__), error=True)
+                raise
+            self.stats.record_fetch(perf_counter() - start, len(self.__networks__))
+        self.save()
+
+    async def fetch_async(self) -> None:
+        """
+        Fetch information for network without blocking the event loop
+
+        Fetches with blocking I/O run in a worker thread. Override in child class to use
+        asyncio native I/O.
+        """
+        await asyncio.to_thread(self.fetch)
+
+    async def update_async(self) -> None:
+        """
+        Fetch network set data and save it to cache file without blocking the event loop
+        """
+        if self.stats is None:
+            await self.fetch_async()
+        else:
+            start = perf_counter()
+            try:
+                await self.fetch_async()
+            except Exception:
+                self.stats.record_fetch(perf_counter() - start, len(self.__networks__), error=True)
+                raise
+            self.stats.record_fetch(perf_counter() - start, len(self.__networks__))
+        await asyncio.to_thread(self.save)
+
+    def __build_networks__(self, values: Iterable[Any]) -> NetworkList:
+        """
+        Build network prefix objects from fetched prefix values
+        """
+        return NetworkList(self.loader_class(value) for value in values)
+
+    def __sort_networks__(self) -> None:
+        """
+        Sort fetched networks by sort attributes of the network set
+        """
+        self.__networks__.sort(key=attrgetter(*self.sort_attributes))
+        self.__reset_indexes__()
+
+    def __reset_indexes__(self) -> None:
+        """
+        Reset indexes built from networks after networks have been changed
+
+        Extend in child class to drop other cached indexes of the network set.
+        """
+        self.__attribute_index__ = None
+
+    def select(self, query: Optional[Query] = None, **criteria) -> List[NetworkSetItem]:
+        """
+        Select networks with extra attributes matching query criteria
+
+        Criteria are given as query dictionary or keyword arguments, for example
+        select(region='eu-*', services='S3').
+        """
+        return self.attribute_index.select({**(query or {}), **criteria})
+
     def as_dict(self) -> dict:
         """
         Return all networks as dictionary
@@ -148,6 +284,7 @@ class NetworkSet:
             raise NetworkError(f'Error parsing network {value}: {error}') from error
         if network not in self.__networks__:
             self.__networks__.append(network)
+            self.__reset_indexes__()
 
     def substract(self, networks: List[Network]) -> 'NetworkSet':
         """
@@ -163,13 +300,13 @@ class NetworkSet:
                 raise NetworkError(f'Error processing network {network}: {error}') from error
         return self.__class__(networks=[self.loader_class(network) for network in ipset.iter_cidrs()])
 
-    def __read_cache_file__(self) -> str:
+    def __read_cache_file__(self) -> Iterator[str]:
         """
-        Read network set data cache file
+        Read network set data cache file in chunks
         """
         try:
             with self.cache_file.open('r', encoding='utf-8') as filedescriptor:
-                return filedescriptor.read()
+                yield from iter_file_chunks(filedescriptor)
         except Exception as error:
             raise NetworkError(f'Error reading cache file {self.cache_file}: {error}') from error
 
@@ -177,24 +314,31 @@ class NetworkSet:
         """
         Load local cache file
         """
-        if self.cache_file is None or not self.cache_file.is_file():
+        if self.stats is None:
+            self.__load_cache_file__()
             return
+        start = perf_counter()
+        cached = self.__load_cache_file__()
+        self.stats.record_load(perf_counter() - start, cached, len(self.__networks__))
 
-        data = self.__read_cache_file__()
-        try:
-            data = json.loads(data)
-        except Exception as error:
-            raise NetworkError(f'Error parsing JSON data from cache file {self.cache_file}: {error}') from error
+    def __load_cache_file__(self) -> bool:
+        """
+        Load networks from local cache file, returning False if cache file does not exist
+        """
+        if self.cache_file is None or not self.cache_file.is_file():
+            return False
 
-        self.__networks__.clear()
         try:
-            self.updated = datetime.fromisoformat(data['updated'])
-            for record in data['networks']:
-                prefix = self.loader_class(record['cidr'], record)
-                self.__networks__.append(prefix)
+            updated, networks = load_cache_data(self.__read_cache_file__(), loader_class=self.loader_class)
         except Exception as error:
             raise NetworkError(f'Error loading data from cache file {self.cache_file}: {error}') from error
 
+        self.updated = updated
+        self.__networks__.clear()
+        self.__networks__.extend(networks)
+        self.__reset_indexes__()
+        return True
+
     def save(self) -> None:
         """
         Save data to cache file
@@ -211,4 +355,9 @@ class NetworkSet:
         """
         Find address in networks
         """
-        return find_address_in_networks(self.__networks__, value)
+        if self.stats is None:
+            return find_address_in_networks(self.__networks__, value)
+        start = perf_counter_ns()
+        network = find_address_in_networks(self.__networks__, value)
+        self.stats.record_lookup(perf_counter_ns() - start, network is not None)
+        return network
@@ -8,12 +8,10 @@ Network set of cloudflare IP address ranges
 """
 from datetime import datetime
 from http import HTTPStatus
-from operator import attrgetter
-from typing import List
-
-import requests
+from typing import Iterable, List, Tuple
 
 from ..exceptions import NetworkError
+from ..network import NetworkList
 from .base import NetworkSet, NetworkSetItem
 from .constants import REQUEST_TIMEOUT
 
@@ -39,11 +37,13 @@ class Cloudflare(NetworkSet):
     type: str = 'cloudflare'
     cache_filename: str = 'cloudflare-networks.json'
     loader_class = CloudflarePrefix
+    sort_attributes: Tuple[str] = ('cidr',)
 
     def __get_ip_range_data__(self, url: str) -> List[str]:
         """
         Cloudflare IP range data is available as text files from static URLs
         """
+        import requests  # pylint: disable=import-outside-toplevel
         try:
             res = requests.get(url, timeout=REQUEST_TIMEOUT)
             if res.status_code != HTTPStatus.OK:
@@ -52,21 +52,23 @@ class Cloudflare(NetworkSet):
         except Exception as error:
             raise NetworkError(f'Error fetching Cloudflare IP ranges: {error}') from error
 
+    def __build_networks__(self, values: Iterable[str]) -> NetworkList:
+        """
+        Build cloudflare prefixes from IP range values, skipping duplicates
+        """
+        networks = {}
+        for value in values:
+            prefix = self.loader_class(value)
+            networks[prefix.cidr] = prefix
+        return NetworkList(networks.values())
+
     def fetch(self) -> None:
         """
         Fetch and update cloudflare IP address ranges
         """
         self.updated = datetime.now()
-        networks = {}
-
+        values = []
         for url in CLOUDFLARE_IP_RANGES_IPV4_URLS:
-            prefixes = self.__get_ip_range_data__(url)
-            for value in prefixes:
-                prefix = self.loader_class(value)
-                networks[prefix.cidr] = prefix
-
-        self.__networks__ = []
-        for network in networks.values():
-            self.__networks__.append(network)
-
-        self.__networks__.sort(key=attrgetter('cidr'))
+            values.extend(self.__get_ip_range_data__(url))
+        self.__networks__ = self.__build_networks__(values)
+        self.__sort_networks__()
@@ -6,13 +6,11 @@
 """
 Google services address prefix set
 """
+import asyncio
 import re
 
 from datetime import datetime
-from operator import attrgetter
-from typing import Optional
-
-from dns import resolver
+from typing import List, Optional
 
 from ..exceptions import NetworkError
 from .base import NetworkSet, NetworkSetItem
@@ -29,6 +27,7 @@ def google_rr_dns_query(record: str) -> Optional[str]:
     """
     DNS query to get TXT record list of google networks
     """
+    from dns import resolver  # pylint: disable=import-outside-toplevel
     try:
         res = resolver.resolve(record, 'TXT')
         return str(res.rrset[0].strings[0], 'utf-8')
@@ -36,34 +35,62 @@ def google_rr_dns_query(record: str) -> Optional[str]:
         raise NetworkError(f'Error querying TXT record for {record}: {error}') from error
 
 
-def process_google_rr_ranges(record: str, loader_class):
+def google_rr_prefixes(record: str) -> List[str]:
     """
-    Process RR records from google DNS query response
+    Return network prefix values from google DNS TXT record, following included records
     """
-    networks = []
-    includes = []
-
+    prefixes = []
     for field in google_rr_dns_query(record).split(' '):
-        match = RE_IPV4.match(field)
+        match = RE_IPV4.match(field) or RE_IPV6.match(field)
         if match:
-            networks.append(loader_class(match.groupdict()['prefix']))
+            prefixes.append(match.groupdict()['prefix'])
             continue
 
-        match = RE_IPV6.match(field)
+        match = RE_INCLUDE.match(field)
         if match:
-            networks.append(loader_class(match.groupdict()['prefix']))
-            continue
+            prefixes.extend(google_rr_prefixes(match.groupdict()['rr']))
+    return prefixes
+
+
+async def async_google_rr_dns_query(record: str) -> Optional[str]:
+    """
+    Asynchronous DNS query to get TXT record list of google networks
+    """
+    from dns import asyncresolver, resolver  # pylint: disable=import-outside-toplevel
+    try:
+        res = await asyncresolver.resolve(record, 'TXT')
+        return str(res.rrset[0].strings[0], 'utf-8')
+    except (resolver.NoAnswer, resolver.NXDOMAIN) as error:
+        raise NetworkError(f'Error querying TXT record for {record}: {error}') from error
+
 
+async def async_google_rr_prefixes(record: str) -> List[str]:
+    """
+    Return network prefix values from google DNS TXT record, querying included records concurrently
+    """
+    fields = (await async_google_rr_dns_query(record)).split(' ')
+    includes = []
+    for field in fields:
         match = RE_INCLUDE.match(field)
         if match:
-            include = match.groupdict()['rr']
-            networks.extend(
-                process_google_rr_ranges(include, loader_class)
-            )
-            includes.append(include)
-            continue
+            includes.append(async_google_rr_prefixes(match.groupdict()['rr']))
+    included = iter(await asyncio.gather(*includes))
 
-    return networks
+    prefixes = []
+    for field in fields:
+        match = RE_IPV4.match(field) or RE_IPV6.match(field)
+        if match:
+            prefixes.append(match.groupdict()['prefix'])
+        elif RE_INCLUDE.match(field):
+            prefixes.extend(next(included))
+    return prefixes
+
+
+def process_google_rr_ranges(record: str, loader_class):
+    """
+    Process RR records from google DNS query response
+    """
+    return [loader_class(prefix) for prefix in google_rr_prefixes(record)]
 
 
 class GoogleNetworkSet(NetworkSet):
@@ -78,12 +105,17 @@ class GoogleNetworkSet(NetworkSet):
         """
         Fetch Google Cloud network records from DNS
         """
-        self.__networks__.clear()
-        networks = process_google_rr_ranges(self.__address_list_record__, self.loader_class)
-        for network in networks:
-            self.__networks__.append(network)
+        self.__networks__ = self.__build_networks__(google_rr_prefixes(self.__address_list_record__))
+        self.updated = datetime.now()
+        self.__sort_networks__()
+
+    async def fetch_async(self) -> None:
+        """
+        Fetch Google Cloud network records from DNS with asyncio resolver
+        """
+        self.__networks__ = self.__build_networks__(await async_google_rr_prefixes(self.__address_list_record__))
         self.updated = datetime.now()
-        self.__networks__.sort(key=attrgetter('version', 'cidr'))
+        self.__sort_networks__()
 
 
 class GoogleCloudPrefix(NetworkSetItem):
@@ -0,0 +1,173 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Overlap and conflict detection for network prefixes
+
+Prefixes are sorted by address family, first address and prefix length and scanned once.
+CIDR prefixes either nest or are disjoint, so the prefixes containing the current prefix
+are kept in a stack of nested prefixes. Detection runs in O(n log n + k) time for n
+prefixes and k reported overlapping pairs.
+"""
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List
+
+from .network import Network
+
+
+def network_details(network: Network) -> Dict[str, Any]:
+    """
+    Return details of network as dictionary, including vendor attributes of prefixes
+    """
+    if hasattr(network, 'as_dict'):
+        return network.as_dict()
+    return {'type': None, 'cidr': str(network.cidr)}
+
+
+class Overlap:
+    """
+    Overlapping pair of prefixes where network contains or is equal to other
+    """
+    network: Network
+    other: Network
+
+    def __init__(self, network: Network, other: Network) -> None:
+        self.network = network
+        self.other = other
+
+    def __repr__(self) -> str:
+        relation = 'equals' if self.identical else 'contains'
+        return f'{self.network} {relation} {self.other}'
+
+    @property
+    def identical(self) -> bool:
+        """
+        Check if both prefixes have same CIDR
+        """
+        return self.network.prefixlen == self.other.prefixlen
+
+    @property
+    def cross_vendor(self) -> bool:
+        """
+        Check if prefixes belong to different vendors
+        """
+        return getattr(self.network, 'type', None) != getattr(self.other, 'type', None)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return overlap details as dictionary
+        """
+        return {
+            'network': network_details(self.network),
+            'other': network_details(self.other),
+            'identical': self.identical,
+            'cross_vendor': self.cross_vendor,
+        }
+
+
+class OverlapCluster:
+    """
+    Group of overlapping prefixes covered by the first prefix of the group
+    """
+    networks: List[Network]
+
+    def __init__(self, networks: List[Network]) -> None:
+        self.networks = networks
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+    def __repr__(self) -> str:
+        return f'{self.cidr} {len(self)} prefixes {", ".join(str(value) for value in self.types)}'
+
+    @property
+    def cidr(self) -> Any:
+        """
+        CIDR of the prefix covering all prefixes of the cluster
+        """
+        return self.networks[0].cidr
+
+    @property
+    def types(self) -> List[str]:
+        """
+        Vendor types of prefixes in the cluster
+        """
+        return sorted(set(str(getattr(network, 'type', None)) for network in self.networks))
+
+    @property
+    def cross_vendor(self) -> bool:
+        """
+        Check if the cluster contains prefixes of different vendors
+        """
+        return len(self.types) > 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return cluster details as dictionary
+        """
+        return {
+            'cidr': str(self.cidr),
+            'types': self.types,
+            'cross_vendor': self.cross_vendor,
+            'networks': [network_details(network) for network in self.networks],
+        }
+
+
+class OverlapReport:
+    """
+    Overlapping prefix pairs and clusters detected from a set of prefixes
+    """
+    overlaps: List[Overlap]
+    clusters: List[OverlapCluster]
+
+    def __init__(self, overlaps: List[Overlap], clusters: List[OverlapCluster]) -> None:
+        self.overlaps = overlaps
+        self.clusters = clusters
+
+    def __len__(self) -> int:
+        return len(self.overlaps)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return overlaps and clusters as dictionary
+        """
+        return {
+            'overlaps': [overlap.as_dict() for overlap in self.overlaps],
+            'clusters': [cluster.as_dict() for cluster in self.clusters],
+        }
+
+
+def find_overlaps(networks: Iterable[Network], cross_vendor: bool = False) -> OverlapReport:
+    """
+    Find all overlapping prefix pairs and clusters of overlapping prefixes
+
+    With cross_vendor only overlaps between prefixes of different vendors and clusters
+    containing prefixes of more than one vendor are reported.
+    """
+    overlaps = []
+    clusters = []
+    stack: List[Network] = []
+    cluster: List[Network] = []
+
+    def close_cluster() -> None:
+        if len(cluster) > 1:
+            overlap_cluster = OverlapCluster(list(cluster))
+            if not cross_vendor or overlap_cluster.cross_vendor:
+                clusters.append(overlap_cluster)
+        cluster.clear()
+
+    for network in sorted(networks, key=attrgetter('version', 'first', 'prefixlen')):
+        while stack and (stack[-1].version != network.version or stack[-1].last < network.first):
+            stack.pop()
+        if not stack:
+            close_cluster()
+        for parent in stack:
+            overlap = Overlap(parent, network)
+            if not cross_vendor or overlap.cross_vendor:
+                overlaps.append(overlap)
+        cluster.append(network)
+        stack.append(network)
+    close_cluster()
+    return OverlapReport(overlaps, clusters)
@@ -6,16 +6,39 @@
 """
 Network prefix cache objects
 """
+from datetime import datetime
 from operator import attrgetter
 from pathlib import Path
-from typing import Any, List, Optional, Union
+from time import perf_counter, perf_counter_ns
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 
+from netaddr import cidr_merge
+
+from .heavy_hitters import HeavyHitters
+from .lookup_cache import MISSING, LookupCache, lookup_cache_key
 from .network import Network, NetworkList, NetworkError, find_address_in_networks
 from .network_sets.base import NetworkSet
 from .network_sets.constants import DEFAULT_CACHE_DIRECTORY
 from .network_sets.aws import AWS
 from .network_sets.cloudflare import Cloudflare
 from .network_sets.google import GoogleCloud, GoogleServices
+from .overlaps import OverlapReport, find_overlaps
+from .query import Query, QueryValue, match_keys
+from .stats import PrefixesStatistics
+
+# History module imports diff module, which imports vendor network set classes from here
+if TYPE_CHECKING:
+    from .history import HistoryStore
+
+NETWORK_SET_CLASSES = (
+    AWS,
+    Cloudflare,
+    GoogleCloud,
+    GoogleServices,
+)
+
+# Prefix classes by vendor type, for loading prefixes of any vendor from cache file records
+LOADER_CLASSES = {network_set.type: network_set.loader_class for network_set in NETWORK_SET_CLASSES}
 
 
 class Prefixes(NetworkList):
@@ -24,9 +47,26 @@ class Prefixes(NetworkList):
     """
     cache_directory: Path
     vendors: List[NetworkSet]
+    stats: Optional[PrefixesStatistics]
+    lookup_cache: Optional[LookupCache]
+    heavy_hitters: Optional[HeavyHitters]
+    history: Optional['HistoryStore']
+    __type_indexes__: Dict[str, NetworkList]
 
-    def __init__(self, cache_directory: Optional[Union[str, Path]] = None) -> None:
+    def __init__(self,
+                 cache_directory: Optional[Union[str, Path]] = None,
+                 stats: Union[bool, PrefixesStatistics] = False,
+                 lookup_cache_size: int = 0,
+                 heavy_hitters: Optional[HeavyHitters] = None,
+                 history: Union[bool, 'HistoryStore'] = False) -> None:
         super().__init__()
+        self.__type_indexes__ = {}
+        if isinstance(stats, PrefixesStatistics):
+            self.stats = stats
+        else:
+            self.stats = PrefixesStatistics() if stats else None
+        self.lookup_cache = LookupCache(lookup_cache_size) if lookup_cache_size else None
+        self.heavy_hitters = heavy_hitters
         cache_directory = cache_directory if cache_directory is not None else DEFAULT_CACHE_DIRECTORY
         self.cache_directory = Path(cache_directory).expanduser()
 
@@ -36,13 +76,40 @@ class Prefixes(NetworkList):
             except Exception as error:
                 raise NetworkError(f'Error creating directory {self.cache_directory}: {error}') from error
 
+        if history is True:
+            from .history import HISTORY_DIRECTORY_NAME, HistoryStore  # pylint: disable=import-outside-toplevel
+            self.history = HistoryStore(self.cache_directory.joinpath(HISTORY_DIRECTORY_NAME))
+        else:
+            self.history = history or None
+
+        # Vendor network sets load their cache files when created
+        start = perf_counter() if self.stats is not None else None
         self.vendors = [
-            AWS(cache_directory=self.cache_directory),
-            Cloudflare(cache_directory=self.cache_directory),
-            GoogleCloud(cache_directory=self.cache_directory),
-            GoogleServices(cache_directory=self.cache_directory),
+            network_set(
+                cache_directory=self.cache_directory,
+                stats=self.stats.vendor(network_set.type) if self.stats is not None else None,
+            )
+            for network_set in NETWORK_SET_CLASSES
         ]
-        self.load()
+        self.__load_prefixes__(start)
+
+    def enable_stats(self) -> PrefixesStatistics:
+        """
+        Enable load, fetch and lookup statistics for prefixes and vendor network sets
+        """
+        if self.stats is None:
+            self.stats = PrefixesStatistics()
+            for vendor in self.vendors:
+                vendor.stats = self.stats.vendor(vendor.type)
+        return self.stats
+
+    def disable_stats(self) -> None:
+        """
+        Disable statistics for prefixes and vendor network sets
+        """
+        self.stats = None
+        for vendor in self.vendors:
+            vendor.disable_stats()
 
     def update(self) -> None:
         """
@@ -50,12 +117,22 @@ class Prefixes(NetworkList):
         """
         for vendor in self.vendors:
             try:
-                vendor.fetch()
-                vendor.save()
+                vendor.update()
             except Exception as error:
                 raise NetworkError(f'Error updating {vendor} data: {error}') from error
+            if self.history is not None:
+                self.history.record(vendor)
         self.load()
 
+    def record_history(self) -> int:
+        """
+        Record loaded vendor prefixes to history store, for example to store cached prefixes
+        as base snapshot. Returns number of recorded vendor versions.
+        """
+        if self.history is None:
+            raise NetworkError('History is not enabled')
+        return sum(1 for vendor in self.vendors if self.history.record(vendor))
+
     def save(self) -> None:
         """
         Save cached data for vendors
@@ -67,19 +144,110 @@ class Prefixes(NetworkList):
         """
         Load cached networks
         """
-        self.clear()
+        start = perf_counter() if self.stats is not None else None
         for vendor in self.vendors:
             vendor.load()
+        self.__load_prefixes__(start)
+
+    def __load_prefixes__(self, start: Optional[float]) -> None:
+        """
+        Collect sorted prefixes from loaded vendor network sets, recording load time since start
+        """
+        self.clear()
+        if self.lookup_cache is not None:
+            self.lookup_cache.clear()
+        for vendor in self.vendors:
             # Go directly to attribute, iterating vendor may trigger fetch
             for prefix in vendor.__networks__:
                 self.append(prefix)
         self.sort(key=attrgetter('value'))
+        # Lookup indexes per vendor type keep the address order of combined prefixes
+        self.__type_indexes__ = {vendor.type: NetworkList() for vendor in self.vendors}
+        for prefix in self:
+            self.__type_indexes__.setdefault(prefix.type, NetworkList()).append(prefix)
+        if start is not None:
+            self.stats.record_load(perf_counter() - start, len(self))
+
+    @property
+    def types(self) -> List[str]:
+        """
+        Return types of loaded vendor prefixes
+        """
+        return list(self.__type_indexes__)
 
-    def filter_type(self, value: Any):
+    def filter_type(self, value: Any) -> NetworkList:
         """
         Filter networks by type
+
+        Returns the cached lookup index of the type sorted by address. The list is shared
+        and must not be modified.
+        """
+        try:
+            return self.__type_indexes__[value]
+        except KeyError:
+            return NetworkList()
+
+    def __type_lookup_indexes__(self, types: Union[str, Sequence[str]]) -> Tuple[NetworkList, ...]:
         """
-        return [prefix for prefix in self if prefix.type == value]
+        Return lookup indexes for types, raising NetworkError for unknown types
+        """
+        if isinstance(types, str):
+            types = (types,)
+        try:
+            return tuple(self.__type_indexes__[value] for value in types)
+        except KeyError as error:
+            raise NetworkError(f'No such vendor: {error.args[0]}') from error
+
+    def select(self,
+               query: Optional[Query] = None,
+               type: Optional[QueryValue] = None,  # pylint: disable=redefined-builtin
+               merged: bool = False,
+               **criteria) -> List[Network]:
+        """
+        Select prefixes by vendor type and extra attributes, for example
+        select(type='aws', region='eu-*', services='S3')
+
+        Criteria are given as query dictionary or keyword arguments. Values can be shell style
+        patterns or lists of values. Only vendors with all queried attributes are searched,
+        using inverted attribute indexes of the vendor network sets.
+
+        Matching prefixes are returned sorted by address, or as minimal merged CIDR cover
+        of matching prefixes if merged is True.
+        """
+        query = {**(query or {}), **criteria}
+        if type is None:
+            type = query.pop('type', None)
+        vendors = self.vendors
+        if type is not None:
+            types = match_keys([vendor.type for vendor in self.vendors], type)
+            vendors = [vendor for vendor in self.vendors if vendor.type in types]
+        vendors = [
+            vendor for vendor in vendors
+            if all(attribute in vendor.loader_class.extra_attributes for attribute in query)
+        ]
+        if not vendors and query:
+            unknown = sorted(
+                attribute for attribute in query
+                if not any(attribute in vendor.loader_class.extra_attributes for vendor in self.vendors)
+            )
+            if unknown:
+                raise NetworkError(f'Unknown attribute: {", ".join(unknown)}')
+
+        networks = NetworkList()
+        for vendor in vendors:
+            networks.extend(vendor.select(query))
+        if merged:
+            return [Network(network) for network in cidr_merge(network.cidr for network in networks)]
+        networks.sort(key=attrgetter('value'))
+        return networks
+
+    def overlaps(self, cross_vendor: bool = False) -> OverlapReport:
+        """
+        Find overlapping prefixes and clusters of overlapping prefixes
+
+        With cross_vendor only overlaps between different vendors are reported.
+        """
+        return find_overlaps(self, cross_vendor=cross_vendor)
 
     def get_vendor(self, name: str) -> NetworkSet:
         """
@@ -90,8 +258,95 @@ class Prefixes(NetworkList):
                 return vendor
         raise NetworkError(f'No such vendor: {name}')
 
-    def find(self, value: Any) -> Optional[Network]:
+    def __find_address__(self, value: Any, indexes: Optional[Tuple[NetworkList, ...]]) -> Optional[Network]:
+        """
+        Find address in all networks or in lookup indexes of selected types
+
+        With multiple types the most specific matching prefix is returned.
+        """
+        if indexes is None:
+            return find_address_in_networks(self, value)
+        match = None
+        for networks in indexes:
+            network = find_address_in_networks(networks, value)
+            if network is not None and (match is None or network.prefixlen > match.prefixlen):
+                match = network
+        return match
+
+    def __lookup__(self,
+                   value: Any,
+                   indexes: Optional[Tuple[NetworkList, ...]] = None,
+                   types: Optional[Union[str, Sequence[str]]] = None) -> Optional[Network]:
+        """
+        Find address in networks, using lookup cache if enabled
+        """
+        if self.lookup_cache is None:
+            return self.__find_address__(value, indexes)
+        key = lookup_cache_key(value, types)
+        network = self.lookup_cache.get(key)
+        if network is MISSING:
+            network = self.__find_address__(value, indexes)
+            self.lookup_cache.put(key, network)
+        return network
+
+    def find_at(self,
+                value: Any,
+                at: datetime,
+                types: Optional[Union[str, Sequence[str]]] = None) -> Optional[Network]:
+        """
+        Find address in networks valid at a point in time from history store
+        """
+        if self.history is None:
+            raise NetworkError('History is not enabled')
+        if types is None:
+            types = self.types
+        elif isinstance(types, str):
+            types = (types,)
+        self.__type_lookup_indexes__(types)
+        return self.history.find(value, at, types)
+
+    def find(self,
+             value: Any,
+             types: Optional[Union[str, Sequence[str]]] = None,
+             at: Optional[datetime] = None) -> Optional[Network]:
         """
         Find address in networks
+
+        Lookups can be restricted to prefixes of specific vendor types, for example
+        types=['cloudflare'], which only searches the lookup index of these types.
+
+        With at timestamp the address is looked up from prefixes valid at the time in the
+        history store.
         """
-        return find_address_in_networks(self, value)
+        if at is not None:
+            return self.find_at(value, at, types)
+        indexes = self.__type_lookup_indexes__(types) if types is not None else None
+        if self.stats is None and self.heavy_hitters is None and self.lookup_cache is None:
+            if indexes is None:
+                return find_address_in_networks(self, value)
+            return self.__find_address__(value, indexes)
+        start = perf_counter_ns()
+        network = self.__lookup__(value, indexes, types)
+        if self.stats is not None:
+            self.stats.record_lookup(perf_counter_ns() - start, network is not None)
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.record(value, network)
+        return network
+
+    def prewarm(self, addresses: Iterable[Any]) -> int:
+        """
+        Pre-warm lookup cache with lookup results for addresses, for example from a heavy
+        hitters snapshot. Invalid addresses are skipped. Returns number of cached addresses.
+        """
+        if self.lookup_cache is None:
+            raise NetworkError('Lookup cache is not enabled')
+        count = 0
+        for address in addresses:
+            try:
+                key = lookup_cache_key(address)
+                network = find_address_in_networks(self, address)
+            except NetworkError:
+                continue
+            self.lookup_cache.put(key, network)
+            count += 1
+        return count
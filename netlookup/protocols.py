@@ -7,9 +7,9 @@
 Parser for /etc/protocols file
 """
 import re
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from .base import FileItem, NetworkDataTextFile
+from .base import FileItem, NetworkDataTextFile, split_fields
 
 PROTOCOLS_FILE_PATH = '/etc/protocols'
 
@@ -42,13 +42,87 @@ class Protocol(FileItem):
     def __repr__(self) -> str:
         return f'{self.name} {self.number}'
 
+    @property
+    def names(self) -> List[str]:
+        """
+        Return protocol name and aliases as list
+        """
+        return [self.name] + self.aliases.split()
+
+    @classmethod
+    def from_line(cls, line: str):
+        """
+        Parse a protocol from a line
+
+        Fields are split in single pass instead of matching PROTOCOL_LINE_PATTERNS
+        """
+        fields, comment = split_fields(line, 2)
+        if len(fields) < 2:
+            raise ValueError(f'Error parsing line {line}')
+        aliases = fields[2].strip() if len(fields) > 2 else ''
+        return cls(fields[0], fields[1], aliases, comment)
+
 
 class Protocols(NetworkDataTextFile):
     """
     Parser for /etc/protocols file
     """
     __item_loader__class__ = Protocol
+    __number_index__: Dict[int, Protocol]
+    __name_index__: Dict[str, Protocol]
 
-    def __init__(self, path: Optional[str] = None):
+    def __init__(self, path: Optional[str] = None, cache_directory: Optional[str] = None):
         path = path if path is not None else PROTOCOLS_FILE_PATH
-        super().__init__(path)
+        super().__init__(path, cache_directory)
+
+    def __build_indexes__(self, items: List[Protocol]) -> Dict[str, Any]:
+        """
+        Build lookup indexes for protocols by number, name and aliases
+
+        The first protocol in file wins for duplicate numbers and names, as with
+        getprotobynumber() and getprotobyname()
+        """
+        number_index = {}
+        name_index = {}
+        for protocol in items:
+            number_index.setdefault(protocol.number, protocol)
+            for name in protocol.names:
+                name_index.setdefault(name, protocol)
+        return {
+            '__number_index__': number_index,
+            '__name_index__': name_index,
+        }
+
+    def get_by_number(self, number: int) -> Optional[Protocol]:
+        """
+        Return protocol by protocol number or None if not found
+        """
+        return self.__number_index__.get(int(number), None)
+
+    def get_by_name(self, name: str) -> Optional[Protocol]:
+        """
+        Return protocol by protocol name or alias or None if not found
+        """
+        return self.__name_index__.get(name, None)
+
+    def getprotobyname(self, name: str) -> int:
+        """
+        Return protocol number for protocol name or alias
+
+        Raises OSError if protocol is not found, like socket.getprotobyname()
+        """
+        try:
+            return self.__name_index__[name].number
+        except KeyError as error:
+            raise OSError(f'protocol not found: {name}') from error
+
+    def getprotobynumber(self, number: int) -> str:
+        """
+        Return protocol name for protocol number
+
+        Raises OSError if protocol is not found
+        """
+        try:
+            return self.__number_index__[int(number)].name
+        except KeyError as error:
+            raise OSError(f'protocol not found: {number}') from error
@@ -0,0 +1,143 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Attribute queries over network set items
+
+Query criteria map attribute names to a value, a shell style pattern like 'eu-*' or a list
+of values and patterns. Items match when every attribute matches any of its values. List
+valued attributes like AWS services match when any of the list items match.
+"""
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Sequence, Set, Union
+
+from .exceptions import NetworkError
+
+PATTERN_CHARACTERS = '*?['
+
+QueryValue = Union[str, Iterable[str]]
+Query = Dict[str, QueryValue]
+
+
+def is_pattern(value: str) -> bool:
+    """
+    Check if query value is a shell style pattern
+    """
+    return any(character in value for character in PATTERN_CHARACTERS)
+
+
+def query_values(value: QueryValue) -> List[str]:
+    """
+    Return query value as list of values and patterns
+    """
+    return [value] if isinstance(value, str) else [str(item) for item in value]
+
+
+def match_keys(keys: Iterable[str], value: QueryValue) -> List[str]:
+    """
+    Return keys matching query value
+    """
+    values = query_values(value)
+    return [
+        key for key in keys
+        if any(fnmatchcase(key, item) if is_pattern(item) else key == item for item in values)
+    ]
+
+
+def parse_query(terms: Iterable[str]) -> Query:
+    """
+    Parse query from attribute=value terms. Comma separated values match any of the values.
+    """
+    query = {}
+    for term in terms:
+        attribute, separator, value = term.partition('=')
+        attribute = attribute.strip()
+        if not separator or not attribute or not value:
+            raise NetworkError(f'Invalid query term "{term}", expected attribute=value')
+        values = [item.strip() for item in value.split(',') if item.strip()]
+        query[attribute] = values[0] if len(values) == 1 else values
+    return query
+
+
+class AttributeIndex:
+    """
+    Inverted index from extra attribute values of network set items to item ids
+
+    Item ids are positions of items in the indexed list. Items of list valued attributes
+    are indexed separately.
+    """
+    networks: Sequence[Any]
+    attributes: Sequence[str]
+    values: Dict[str, Dict[str, List[int]]]
+
+    def __init__(self, networks: Sequence[Any], attributes: Sequence[str]) -> None:
+        self.networks = networks
+        self.attributes = tuple(attributes)
+        self.values = {attribute: defaultdict(list) for attribute in self.attributes}
+        for item_id, item in enumerate(networks):
+            for attribute in self.attributes:
+                value = getattr(item, attribute, None)
+                if value is None:
+                    continue
+                index = self.values[attribute]
+                if isinstance(value, (list, tuple, set)):
+                    for key in set(str(key) for key in value):
+                        index[key].append(item_id)
+                else:
+                    index[str(value)].append(item_id)
+
+    def keys(self, attribute: str) -> List[str]:
+        """
+        Return sorted indexed values of attribute
+        """
+        return sorted(self.__attribute_values__(attribute))
+
+    def __attribute_values__(self, attribute: str) -> Dict[str, List[int]]:
+        """
+        Return index of attribute, raising NetworkError for unknown attributes
+        """
+        try:
+            return self.values[attribute]
+        except KeyError as error:
+            raise NetworkError(f'Unknown attribute: {attribute}') from error
+
+    def match(self, attribute: str, value: QueryValue) -> Set[int]:
+        """
+        Return ids of items with attribute matching query value
+
+        Exact values are looked up directly, patterns are matched against indexed values.
+        """
+        index = self.__attribute_values__(attribute)
+        item_ids = set()
+        for item in query_values(value):
+            if is_pattern(item):
+                for key in match_keys(index, item):
+                    item_ids.update(index[key])
+            else:
+                item_ids.update(index.get(item, ()))
+        return item_ids
+
+    def select_ids(self, query: Query) -> List[int]:
+        """
+        Return sorted ids of items matching all query criteria
+        """
+        for attribute in query:
+            self.__attribute_values__(attribute)
+        if not query:
+            return list(range(len(self.networks)))
+        item_ids = None
+        for attribute, value in query.items():
+            matches = self.match(attribute, value)
+            item_ids = matches if item_ids is None else item_ids & matches
+            if not item_ids:
+                return []
+        return sorted(item_ids)
+
+    def select(self, query: Query) -> List[Any]:
+        """
+        Return items matching all query criteria
+        """
+        return [self.networks[item_id] for item_id in self.select_ids(query)]
@@ -8,9 +8,10 @@ Parser for /etc/services file
 """
 import re
 
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
 
-from .base import FileItem, NetworkDataTextFile
+from .base import FileItem, NetworkDataTextFile, split_fields
 
 SERVICES_FILE_PATH = '/etc/services'
 
@@ -72,6 +73,36 @@ class Service(FileItem):
     def __repr__(self) -> str:
         return f'{self.name} {self.port_number}/{self.protocol}'
 
+    @classmethod
+    def from_line(cls, line: str):
+        """
+        Parse a service from a line
+
+        Fields are split in single pass instead of matching SERVICE_LINE_PATTERNS
+        """
+        fields, comment = split_fields(line, 2)
+        if len(fields) > 1 and '/' in fields[1]:
+            name = fields[0]
+            port, aliases = fields[1], fields[2] if len(fields) > 2 else ''
+        elif fields:
+            name = ''
+            port, aliases = fields[0], ' '.join(fields[1:])
+        else:
+            raise ValueError(f'Error parsing line {line}')
+        port_number, separator, protocol = port.partition('/')
+        if not separator or not protocol:
+            raise ValueError(f'Error parsing line {line}')
+        return cls(port_number, protocol, name, aliases, comment)
+
+    @property
+    def names(self) -> List[str]:
+        """
+        Return service name and aliases as list
+        """
+        names = [self.name] if self.name else []
+        names.extend(self.aliases.split())
+        return names
+
 
 class Services(NetworkDataTextFile):
     """
@@ -79,6 +110,66 @@ class Services(NetworkDataTextFile):
     """
     __item_loader__class__ = Service
 
-    def __init__(self, path: Optional[str] = None):
+    __port_index__: Dict[Tuple[int, str], Service]
+    __name_index__: Dict[str, List[Service]]
+    __port_services__: Dict[int, List[Service]]
+    __ports__: List[int]
+
+    def __init__(self, path: Optional[str] = None, cache_directory: Optional[str] = None):
         path = path if path is not None else SERVICES_FILE_PATH
-        super().__init__(path)
+        super().__init__(path, cache_directory)
+
+    def __build_indexes__(self, items: List[Service]) -> Dict[str, Any]:
+        """
+        Build lookup indexes for services by port, protocol, name and aliases
+
+        The first service in file wins for duplicate port and protocol pairs, as
+        with getservbyport()
+        """
+        port_index = {}
+        name_index = {}
+        port_services = {}
+        for service in items:
+            port_index.setdefault((service.port_number, service.protocol), service)
+            port_services.setdefault(service.port_number, []).append(service)
+            for name in service.names:
+                services = name_index.setdefault(name, [])
+                if service not in services:
+                    services.append(service)
+        return {
+            '__port_index__': port_index,
+            '__name_index__': name_index,
+            '__port_services__': port_services,
+            '__ports__': sorted(port_services),
+        }
+
+    def get_by_port(self, port_number: int, protocol: str = 'tcp') -> Optional[Service]:
+        """
+        Return service for port number and protocol or None if not found
+        """
+        return self.__port_index__.get((int(port_number), protocol), None)
+
+    def get_by_name(self, name: str, protocol: Optional[str] = None) -> List[Service]:
+        """
+        Return services matching name or alias, optionally filtered by protocol
+        """
+        services = self.__name_index__.get(name, [])
+        if protocol is not None:
+            return [service for service in services if service.protocol == protocol]
+        return list(services)
+
+    def get_port_range(self,
+                       first_port: int,
+                       last_port: int,
+                       protocol: Optional[str] = None) -> List[Service]:
+        """
+        Return services with port numbers in range from first to last port, inclusive
+        """
+        services = []
+        start = bisect_left(self.__ports__, int(first_port))
+        end = bisect_right(self.__ports__, int(last_port))
+        for port_number in self.__ports__[start:end]:
+            for service in self.__port_services__[port_number]:
+                if protocol is None or service.protocol == protocol:
+                    services.append(service)
+        return services
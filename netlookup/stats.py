@@ -0,0 +1,279 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Opt-in counters and timers for prefix loading, fetching and lookups
+
+Statistics are disabled by default. Instrumented objects keep a stats attribute that is
+None when disabled, so the only overhead on lookups is a single attribute check.
+"""
+from typing import Any, Dict, Iterator, Tuple
+
+# Number of bits for linear sub buckets in each power of two latency histogram bucket.
+# With 3 bits the relative error of reported percentiles is at most 12.5%.
+HISTOGRAM_SUB_BUCKET_BITS = 3
+HISTOGRAM_SUB_BUCKETS = 1 << HISTOGRAM_SUB_BUCKET_BITS
+
+# Percentiles reported for latency histograms
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+def histogram_bucket_index(value: int) -> int:
+    """
+    Return log-linear histogram bucket index for a non-negative integer value
+    """
+    if value < HISTOGRAM_SUB_BUCKETS:
+        return max(value, 0)
+    exponent = value.bit_length() - HISTOGRAM_SUB_BUCKET_BITS - 1
+    return (exponent << HISTOGRAM_SUB_BUCKET_BITS) + (value >> exponent)
+
+
+def histogram_bucket_bounds(index: int) -> Tuple[int, int]:
+    """
+    Return lowest and highest value in a log-linear histogram bucket
+    """
+    if index < HISTOGRAM_SUB_BUCKETS:
+        return index, index
+    exponent = (index >> HISTOGRAM_SUB_BUCKET_BITS) - 1
+    mantissa = (index & (HISTOGRAM_SUB_BUCKETS - 1)) + HISTOGRAM_SUB_BUCKETS
+    return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in nanoseconds with log-linear buckets
+
+    Recording a value is a constant time dictionary update. Percentiles are reported as the
+    upper bound of the bucket containing the percentile.
+    """
+    count: int
+    total: int
+    buckets: Dict[int, int]
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.buckets = {}
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """
+        Iterate bucket upper bounds and counts in increasing order
+
+        Buckets are copied first, so the histogram can be read while other threads record values.
+        """
+        for index, count in sorted(self.buckets.copy().items()):
+            yield histogram_bucket_bounds(index)[1], count
+
+    def record(self, value: int) -> None:
+        """
+        Record a latency value
+        """
+        index = histogram_bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean of recorded values
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """
+        Return percentile of recorded values with nearest rank method
+        """
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for upper, count in self:
+            seen += count
+            if seen >= rank:
+                return upper
+        return upper
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return histogram summary as dictionary
+        """
+        data = {
+            'count': self.count,
+            'mean': self.mean,
+        }
+        for percent in LATENCY_PERCENTILES:
+            data[f'p{percent}'] = self.percentile(percent)
+        return data
+
+
+class LookupStatistics:
+    """
+    Counters and latency histogram for address lookups
+    """
+    lookups: int
+    hits: int
+    latency: LatencyHistogram
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.hits = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def misses(self) -> int:
+        """
+        Number of lookups with no matching prefix
+        """
+        return self.lookups - self.hits
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Ratio of lookups with matching prefix
+        """
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def record_lookup(self, elapsed: int, found: bool) -> None:
+        """
+        Record an address lookup with elapsed time in nanoseconds
+        """
+        self.lookups += 1
+        if found:
+            self.hits += 1
+        self.latency.record(elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return lookup statistics as dictionary
+        """
+        return {
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio,
+            'latency_ns': self.latency.as_dict(),
+        }
+
+
+class NetworkSetStatistics(LookupStatistics):
+    """
+    Load, fetch and lookup statistics for a network set
+    """
+    type: str
+    prefixes: int
+    loads: int
+    load_seconds: float
+    cache_hits: int
+    cache_misses: int
+    fetches: int
+    fetch_errors: int
+    fetch_seconds: float
+
+    def __init__(self, type: str) -> None:  # pylint: disable=redefined-builtin
+        super().__init__()
+        self.type = type
+        self.prefixes = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.fetch_seconds = 0.0
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """
+        Ratio of loads where network set data was found from cache file
+        """
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.0
+
+    def record_load(self, elapsed: float, cached: bool, prefixes: int) -> None:
+        """
+        Record loading network set from cache with elapsed time in seconds
+        """
+        self.loads += 1
+        self.load_seconds += elapsed
+        if cached:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.prefixes = prefixes
+
+    def record_fetch(self, elapsed: float, prefixes: int, error: bool = False) -> None:
+        """
+        Record fetching network set data with elapsed time in seconds
+        """
+        self.fetches += 1
+        self.fetch_seconds += elapsed
+        if error:
+            self.fetch_errors += 1
+        else:
+            self.prefixes = prefixes
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return network set statistics as dictionary
+        """
+        return {
+            'type': self.type,
+            'prefixes': self.prefixes,
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_ratio': self.cache_hit_ratio,
+            'fetches': self.fetches,
+            'fetch_errors': self.fetch_errors,
+            'fetch_seconds': self.fetch_seconds,
+            **super().as_dict(),
+        }
+
+
+class PrefixesStatistics(LookupStatistics):
+    """
+    Load and lookup statistics for prefixes with statistics for each vendor network set
+    """
+    prefixes: int
+    loads: int
+    load_seconds: float
+    vendors: Dict[str, NetworkSetStatistics]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.prefixes = 0
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.vendors = {}
+
+    def vendor(self, type: str) -> NetworkSetStatistics:  # pylint: disable=redefined-builtin
+        """
+        Return statistics for vendor network set type
+        """
+        if type not in self.vendors:
+            self.vendors[type] = NetworkSetStatistics(type)
+        return self.vendors[type]
+
+    def record_load(self, elapsed: float, prefixes: int) -> None:
+        """
+        Record loading prefixes with elapsed time in seconds
+        """
+        self.loads += 1
+        self.load_seconds += elapsed
+        self.prefixes = prefixes
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Return prefixes statistics as dictionary
+        """
+        return {
+            'prefixes': self.prefixes,
+            'loads': self.loads,
+            'load_seconds': self.load_seconds,
+            **super().as_dict(),
+            'vendors': {vendor.type: vendor.as_dict() for vendor in list(self.vendors.values())},
+        }
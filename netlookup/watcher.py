@@ -0,0 +1,148 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Prefixes kept in memory by long running lookup services, reloaded when cache files change
+"""
+import threading
+
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .exceptions import NetworkError
+from .prefixes import Prefixes
+
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+CacheSignature = Tuple[Optional[Tuple[int, int]], ...]
+
+
+def cache_signature(prefixes: Prefixes) -> CacheSignature:
+    """
+    Return modification time and size of vendor cache files, used to detect cache updates
+    """
+    signature = []
+    for vendor in prefixes.vendors:
+        try:
+            details = vendor.cache_file.stat()
+            signature.append((details.st_mtime_ns, details.st_size))
+        except (AttributeError, OSError):
+            signature.append(None)
+    return tuple(signature)
+
+
+class PrefixesWatcher:
+    """
+    Keep prefixes loaded in memory, reloading them when vendor cache files change
+
+    Reloads build a new Prefixes object and replace the served one, so lookups in progress
+    are not affected. If reloading fails, previous prefixes are served and reload is retried.
+
+    Child classes start serving lookups in __start_server__() and stop in __stop_server__().
+    """
+    cache_directory: Optional[Union[str, Path]]
+    reload_interval: float
+    lookup_cache_size: int
+    prefixes: Optional[Prefixes]
+    reloads: int
+    reload_error: Optional[str]
+
+    def __init__(self,
+                 cache_directory: Optional[Union[str, Path]] = None,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+                 lookup_cache_size: int = 0) -> None:
+        self.cache_directory = cache_directory
+        self.reload_interval = reload_interval
+        self.lookup_cache_size = lookup_cache_size
+        self.prefixes = None
+        self.reloads = 0
+        self.reload_error = None
+        self.__signature__ = None
+        self.__running__ = False
+        self.__stopped__ = threading.Event()
+        self.__threads__: List[threading.Thread] = []
+
+    def __enter__(self) -> 'PrefixesWatcher':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def reload(self) -> None:
+        """
+        Load prefixes from cache files and start serving them
+        """
+        prefixes = Prefixes(cache_directory=self.cache_directory, lookup_cache_size=self.lookup_cache_size)
+        self.__signature__ = cache_signature(prefixes)
+        self.prefixes = prefixes
+        self.reloads += 1
+
+    def check_reload(self) -> bool:
+        """
+        Reload prefixes if vendor cache files have changed. Returns True if prefixes were reloaded.
+        """
+        if cache_signature(self.prefixes) == self.__signature__:
+            return False
+        try:
+            self.reload()
+        except NetworkError as error:
+            self.reload_error = str(error)
+            return False
+        self.reload_error = None
+        return True
+
+    def __watch_cache_files__(self) -> None:
+        """
+        Check for cache file changes until stopped
+        """
+        while not self.__stopped__.wait(self.reload_interval):
+            self.check_reload()
+
+    def __start_server__(self) -> List[threading.Thread]:
+        """
+        Start serving lookups, returning threads to start
+        """
+        return []
+
+    def __stop_server__(self) -> None:
+        """
+        Stop serving lookups
+        """
+
+    def start(self) -> None:
+        """
+        Load prefixes and start serving lookups and watching cache files in background threads
+        """
+        self.reload()
+        threads = self.__start_server__()
+        if self.reload_interval > 0:
+            threads.append(
+                threading.Thread(target=self.__watch_cache_files__, name='netlookup-reload', daemon=True)
+            )
+        self.__stopped__.clear()
+        self.__threads__ = threads
+        for thread in self.__threads__:
+            thread.start()
+        self.__running__ = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until stopped. Returns True if stopped.
+        """
+        return self.__stopped__.wait(timeout)
+
+    def stop(self) -> None:
+        """
+        Stop serving lookups and watching cache files
+        """
+        if not self.__running__:
+            return
+        self.__running__ = False
+        self.__stopped__.set()
+        self.__stop_server__()
+        for thread in self.__threads__:
+            thread.join()
+        self.__threads__ = []
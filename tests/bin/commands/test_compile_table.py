@@ -0,0 +1,48 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.compile_table module
+"""
+from pathlib import Path
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+from netlookup.ipv4_table import IPV4_TABLE_FILENAME, IPv4LookupTable
+
+from ...constants import PREFIXES_GOOGLE_CLOUD_MATCH
+
+
+def test_netlookup_compile_table(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup compile-table' command
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'compile-table', f'--cache-directory={mock_prefixes_cache.cache_directory}']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    assert len(captured.out.splitlines()) == 1
+
+    path = Path(mock_prefixes_cache.cache_directory, IPV4_TABLE_FILENAME)
+    with IPv4LookupTable.load(path) as table:
+        assert table.find(PREFIXES_GOOGLE_CLOUD_MATCH) == mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+
+
+def test_netlookup_compile_table_output_error(capsys, monkeypatch, mock_prefixes_cache, tmpdir):
+    """
+    Test running 'netlookup compile-table' command with invalid output path
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'compile-table',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        f'--output={Path(tmpdir.strpath, "missing", "table.bin")}',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert len(capsys.readouterr().err.splitlines()) == 1
@@ -0,0 +1,67 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.diff module
+"""
+import json
+
+from pathlib import Path
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+
+from ...conftest import MOCK_PREFIXES_CACHE_DIRECTORY
+from ...test_diff import write_changed_aws_cache
+
+
+def test_netlookup_diff(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup diff' command with cache directories
+    """
+    directory = Path(tmpdir.strpath)
+    write_changed_aws_cache(directory)
+    script = NetLookupScript()
+    testargs = ['netlookup', 'diff', '--type=aws', str(MOCK_PREFIXES_CACHE_DIRECTORY), str(directory)]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    lines = capsys.readouterr().out.splitlines()
+    assert [line[0] for line in lines[:4]] == ['+', '-', '~', '~']
+    assert lines[4].startswith('IPv4 addresses added 256 removed ')
+    assert lines[5] == 'IPv6 addresses added 0 removed 0 delta +0'
+
+
+def test_netlookup_diff_json_check(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup diff --check --format json' command with cache files
+    """
+    path = write_changed_aws_cache(Path(tmpdir.strpath))
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'diff', '--check', '--format=json',
+        str(MOCK_PREFIXES_CACHE_DIRECTORY.joinpath('aws-networks.json')),
+        str(path),
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=2)
+    data = json.loads(capsys.readouterr().out)
+    assert data['added'][0]['cidr'] == '198.51.100.0/24'
+    assert data['addresses']['ipv4']['added'] == 256
+
+    testargs = ['netlookup', 'diff', '--check', str(path), str(path)]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+
+def test_netlookup_diff_missing(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup diff' command with missing snapshot
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'diff', str(MOCK_PREFIXES_CACHE_DIRECTORY), str(Path(tmpdir.strpath, 'missing'))]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert len(capsys.readouterr().err.splitlines()) == 1
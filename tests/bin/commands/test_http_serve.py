@@ -0,0 +1,55 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.http_serve module
+"""
+from http import HTTPStatus
+
+import requests
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+from netlookup.http_service import LookupHTTPService
+
+from ...constants import PREFIXES_GOOGLE_CLOUD_MATCH
+
+
+def test_netlookup_http_serve(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup http-serve' command until interrupted
+    """
+    def mock_wait(service, timeout=None):
+        res = requests.get(f'{service.url}/{PREFIXES_GOOGLE_CLOUD_MATCH}', timeout=5)
+        assert res.status_code == HTTPStatus.OK
+        raise KeyboardInterrupt
+
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'http-serve',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--port=0',
+        '--reload-interval=0',
+    ]
+    with monkeypatch.context() as context:
+        context.setattr(LookupHTTPService, 'wait', mock_wait)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    assert capsys.readouterr().out.startswith('Serving ')
+
+
+def test_netlookup_http_serve_port_in_use(monkeypatch, mock_lookup_http_service):
+    """
+    Test running 'netlookup http-serve' command with port in use
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'http-serve',
+        f'--cache-directory={mock_lookup_http_service.cache_directory}',
+        f'--port={mock_lookup_http_service.port}',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
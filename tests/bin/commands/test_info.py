@@ -6,9 +6,21 @@
 """
 Unit tests for netlookup.bin.commands.info module
 """
+import csv
+import json
+import sys
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
 from netlookup.bin.netlookup import NetLookupScript
+from netlookup.network import NETWORK_DETAILS_FIELDS
+
+from ...constants import INVALID_NETWORKS, VALID_NETWORKS
 
 
 def test_netlookup_info_add_no_arguments(monkeypatch):
@@ -49,3 +61,76 @@ def test_netlookup_prefixes_info_invalid_network(capsys, monkeypatch, mock_prefi
     captured = capsys.readouterr()
     assert len(captured.err.splitlines()) == 1
     assert captured.out == ''
+
+
+@pytest.mark.parametrize('output_format', ('json', 'ndjson', 'csv'))
+def test_netlookup_info_output_formats(capsys, monkeypatch, output_format):
+    """
+    Test running 'netlookup info' command with machine readable output formats
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'info', f'--format={output_format}'] + list(VALID_NETWORKS)
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    if output_format == 'json':
+        records = json.loads(captured.out)
+    elif output_format == 'ndjson':
+        records = [json.loads(line) for line in captured.out.splitlines()]
+    else:
+        records = list(csv.DictReader(StringIO(captured.out)))
+    assert len(records) == len(VALID_NETWORKS)
+    for record in records:
+        assert tuple(record.keys()) == NETWORK_DETAILS_FIELDS
+
+
+def test_netlookup_info_file_and_stdin(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup info' command reading subnets from file and stdin
+    """
+    path = Path(tmpdir.strpath, 'subnets.txt')
+    path.write_text('# comment\n\n' + '\n'.join(VALID_NETWORKS) + '\n', encoding='utf-8')
+    monkeypatch.setattr(sys, 'stdin', StringIO('192.168.0.0/16\n'))
+
+    script = NetLookupScript()
+    testargs = ['netlookup', 'info', '--format=ndjson', f'--file={path}', '--stdin']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    lines = captured.out.splitlines()
+    assert len(lines) == len(VALID_NETWORKS) + 1
+    assert json.loads(lines[-1])['cidr'] == '192.168.0.0/16'
+
+
+def test_netlookup_info_file_invalid_networks(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup info' command reading invalid subnets from file
+    """
+    path = Path(tmpdir.strpath, 'subnets.txt')
+    path.write_text('\n'.join(INVALID_NETWORKS[1:] + VALID_NETWORKS[:1]) + '\n', encoding='utf-8')
+
+    script = NetLookupScript()
+    testargs = ['netlookup', 'info', '--format=json', f'--file={path}']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert len(captured.err.splitlines()) == len(INVALID_NETWORKS) - 1
+    assert len(json.loads(captured.out)) == 1
+
+
+def test_netlookup_info_file_missing(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup info' command with missing input file
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'info', f'--file={tmpdir.strpath}/missing.txt']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert len(captured.err.splitlines()) == 1
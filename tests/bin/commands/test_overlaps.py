@@ -0,0 +1,71 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.overlaps module
+"""
+import json
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+
+
+def test_netlookup_overlaps(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup overlaps' command
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'overlaps', f'--cache-directory={mock_prefixes_cache.cache_directory}']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    assert captured.out.splitlines() == [str(overlap) for overlap in mock_prefixes_cache.overlaps().overlaps]
+
+
+def test_netlookup_overlaps_clusters_json(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup overlaps --clusters --format json' command
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'overlaps',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--clusters', '--format=json',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    data = json.loads(capsys.readouterr().out)
+    assert data == mock_prefixes_cache.overlaps().as_dict()['clusters']
+
+
+def test_netlookup_overlaps_clusters_text(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup overlaps --clusters' command
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'overlaps', f'--cache-directory={mock_prefixes_cache.cache_directory}', '--clusters']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    clusters = mock_prefixes_cache.overlaps().clusters
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == len(clusters) + sum(len(cluster) for cluster in clusters)
+    assert lines[0] == str(clusters[0])
+
+
+def test_netlookup_overlaps_check(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup overlaps --check' command with and without overlaps
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'overlaps', f'--cache-directory={mock_prefixes_cache.cache_directory}', '--check']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=2)
+
+    testargs.append('--cross-vendor')
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert capsys.readouterr().err == ''
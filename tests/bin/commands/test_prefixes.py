@@ -6,8 +6,11 @@
 """
 Unit tests for netlookup.bin.commands.prefixes module
 """
+from datetime import datetime
+
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
+from netlookup.bin.commands.prefixes import PrefixLookup
 from netlookup.bin.netlookup import NetLookupScript
 
 from ...constants import PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH, INVALID_NETWORKS
@@ -106,3 +109,98 @@ def test_netlookup_prefixes_lookup_invalid_network(capsys, monkeypatch, mock_pre
     captured = capsys.readouterr()
     assert len(captured.err.splitlines()) == 1
     assert captured.out == ''
+
+
+def test_netlookup_prefixes_lookup_daemon(capsys, monkeypatch, mock_lookup_daemon):
+    """
+    Test running 'netlookup prefixes' command with lookups from lookup daemon
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'prefixes',
+        f'--socket={mock_lookup_daemon.socket_path}',
+        PREFIXES_GOOGLE_CLOUD_MATCH,
+        PREFIXES_NO_MATCH,
+        'invalid address',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [str(mock_lookup_daemon.prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH))]
+    assert len(captured.err.splitlines()) == 1
+
+
+def test_netlookup_prefixes_lookup_types(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup prefixes' command with lookups restricted to vendor types
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'prefixes', '--type=aws', '--type=google-cloud', PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', mock_prefixes_cache)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [str(mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH))]
+
+    testargs = ['netlookup', 'prefixes', '--type=cloudflare', PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', mock_prefixes_cache)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert capsys.readouterr().out == ''
+
+    testargs = ['netlookup', 'prefixes', '--type=unknown', PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', mock_prefixes_cache)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert len(capsys.readouterr().err.splitlines()) == 1
+
+
+def test_netlookup_prefixes_lookup_daemon_types(monkeypatch):
+    """
+    Test running 'netlookup prefixes' command with vendor types and lookup daemon socket
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'prefixes', '--socket=/tmp/invalid.sock', '--type=aws', PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+
+# pylint: disable=unused-argument
+def test_netlookup_prefixes_history(capsys, monkeypatch, mock_prefixes_data):
+    """
+    Test running 'netlookup prefixes' command with history recording and lookups
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'prefixes', '--update', '--history']
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', None)
+        context.setattr('netlookup.prefixes.DEFAULT_CACHE_DIRECTORY', mock_prefixes_data.cache_directory)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert capsys.readouterr().err == ''
+
+    testargs = ['netlookup', 'prefixes', '--at', datetime.now().isoformat(), PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', None)
+        context.setattr('netlookup.prefixes.DEFAULT_CACHE_DIRECTORY', mock_prefixes_data.cache_directory)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert capsys.readouterr().out.splitlines() == [str(mock_prefixes_data.find(PREFIXES_GOOGLE_CLOUD_MATCH))]
+
+    testargs = ['netlookup', 'prefixes', '--at', '2000-01-01', PREFIXES_GOOGLE_CLOUD_MATCH]
+    with monkeypatch.context() as context:
+        context.setattr(PrefixLookup, '__prefixes__', None)
+        context.setattr('netlookup.prefixes.DEFAULT_CACHE_DIRECTORY', mock_prefixes_data.cache_directory)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+    assert capsys.readouterr().out == ''
+
+
+def test_netlookup_prefixes_history_errors(monkeypatch):
+    """
+    Test running 'netlookup prefixes' command with invalid history lookup arguments
+    """
+    script = NetLookupScript()
+    for testargs in (
+            ['netlookup', 'prefixes', '--at', 'invalid', PREFIXES_GOOGLE_CLOUD_MATCH],
+            ['netlookup', 'prefixes', '--socket=/tmp/invalid.sock', '--at', '2023-01-01', PREFIXES_GOOGLE_CLOUD_MATCH]):
+        with monkeypatch.context() as context:
+            validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
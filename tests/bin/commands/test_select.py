@@ -0,0 +1,86 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.select module
+"""
+import json
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+
+
+def test_netlookup_select(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup select' command with query terms
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'select',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        'type=aws', 'region=eu-*', 'services=S3,EC2',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    expected = mock_prefixes_cache.select(type='aws', region='eu-*', services=['S3', 'EC2'])
+    assert captured.out.splitlines() == [str(prefix) for prefix in expected]
+
+
+def test_netlookup_select_merged_json(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup select --merged --format json' command
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'select',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--merged', '--format=json',
+        'region=eu-west-1',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    data = json.loads(capsys.readouterr().out)
+    expected = mock_prefixes_cache.select(region='eu-west-1', merged=True)
+    assert data == [str(network.cidr) for network in expected]
+
+
+def test_netlookup_select_json(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup select --format json' command
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'select',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--format=json',
+        'type=cloudflare',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    data = json.loads(capsys.readouterr().out)
+    assert len(data) == len(mock_prefixes_cache.filter_type('cloudflare'))
+    assert all(item['type'] == 'cloudflare' for item in data)
+
+
+def test_netlookup_select_invalid_query(capsys, monkeypatch, mock_prefixes_cache):
+    """
+    Test running 'netlookup select' command with invalid query terms
+    """
+    script = NetLookupScript()
+    for term in ('region', 'unknown=value'):
+        testargs = [
+            'netlookup', 'select',
+            f'--cache-directory={mock_prefixes_cache.cache_directory}',
+            term,
+        ]
+        with monkeypatch.context() as context:
+            validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+        assert len(capsys.readouterr().err.splitlines()) == 1
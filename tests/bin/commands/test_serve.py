@@ -0,0 +1,56 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.serve module
+"""
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+from netlookup.daemon import LookupClient, LookupDaemon
+from netlookup.network_sets.google import GoogleCloudPrefix
+
+from ...constants import PREFIXES_GOOGLE_CLOUD_MATCH
+
+
+def test_netlookup_serve(capsys, monkeypatch, mock_lookup_daemon):
+    """
+    Test running 'netlookup serve' command until interrupted
+    """
+    socket_path = mock_lookup_daemon.socket_path.parent.joinpath('serve.sock')
+
+    def mock_wait(daemon, timeout=None):
+        with LookupClient(daemon.socket_path) as client:
+            assert isinstance(client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+        raise KeyboardInterrupt
+
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'serve',
+        f'--cache-directory={mock_lookup_daemon.cache_directory}',
+        f'--socket={socket_path}',
+        '--reload-interval=0',
+    ]
+    with monkeypatch.context() as context:
+        context.setattr(LookupDaemon, 'wait', mock_wait)
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    assert capsys.readouterr().out.startswith('Serving ')
+    assert not socket_path.exists()
+
+
+def test_netlookup_serve_socket_in_use(monkeypatch, mock_lookup_daemon):
+    """
+    Test running 'netlookup serve' command with socket used by another daemon
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'serve',
+        f'--cache-directory={mock_lookup_daemon.cache_directory}',
+        f'--socket={mock_lookup_daemon.socket_path}',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+    assert mock_lookup_daemon.socket_path.exists()
@@ -6,6 +6,8 @@
 """
 Unit tests for netlookup.bin.commands.split module
 """
+from pathlib import Path
+
 from cli_toolkit.tests.script import validate_script_run_exception_with_args
 
 from netlookup.bin.netlookup import NetLookupScript
@@ -85,3 +87,54 @@ def test_netlookup_split_invalid_network(capsys, monkeypatch, mock_prefixes_data
     captured = capsys.readouterr()
     assert len(captured.err.splitlines()) == 1
     assert captured.out == ''
+
+
+def test_netlookup_split_count_and_offset(capsys, monkeypatch):
+    """
+    Test running 'netlookup split' command with count and offset arguments
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'split', '--mask=28', '--offset=2', '--count=3', '192.168.64.0/24']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    assert captured.out.splitlines() == [
+        '192.168.64.32/28',
+        '192.168.64.48/28',
+        '192.168.64.64/28',
+    ]
+
+
+def test_netlookup_split_invalid_count(capsys, monkeypatch):
+    """
+    Test running 'netlookup split' command with invalid count argument
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'split', '--count=-1', '192.168.64.0/24']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert len(captured.err.splitlines()) == 1
+    assert captured.out == ''
+
+
+def test_netlookup_split_output_file(capsys, monkeypatch, tmpdir):
+    """
+    Test running 'netlookup split' command writing results to output file
+    """
+    output = Path(tmpdir.strpath, 'split.txt')
+    script = NetLookupScript()
+    testargs = ['netlookup', 'split', '--mask=120', f'--output={output}', '2001:14ba:3e9::/112']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    assert captured.out == ''
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 256
+    assert lines[0] == '2001:14ba:3e9::/120'
+    assert lines[-1] == '2001:14ba:3e9::ff00/120'
@@ -0,0 +1,156 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.bin.commands.stats module
+"""
+import json
+
+from pathlib import Path
+
+from cli_toolkit.tests.script import validate_script_run_exception_with_args
+
+from netlookup.bin.netlookup import NetLookupScript
+
+from ...constants import (
+    INVALID_NETWORKS,
+    MOCK_PREFIXES_CACHE_LEN,
+    PREFIXES_GOOGLE_CLOUD_MATCH,
+    PREFIXES_NO_MATCH,
+)
+
+
+def test_netlookup_stats_text(capsys, monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with text output
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        PREFIXES_GOOGLE_CLOUD_MATCH,
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    captured = capsys.readouterr()
+    assert captured.err == ''
+    lines = captured.out.splitlines()
+    assert lines[0].split() == ['Prefixes', str(MOCK_PREFIXES_CACHE_LEN)]
+    assert 'Lookups 1 hits 1 misses 0 hit ratio 100.0%' in captured.out
+    for vendor in ('aws', 'cloudflare', 'google-cloud', 'google'):
+        assert vendor in lines
+
+
+def test_netlookup_stats_json_file(capsys, monkeypatch, mock_prefixes_cache, tmpdir) -> None:
+    """
+    Test running 'netlookup stats' command with JSON output and addresses from file
+    """
+    path = Path(tmpdir.strpath, 'addresses.txt')
+    path.write_text(f'# addresses\n{PREFIXES_GOOGLE_CLOUD_MATCH}\n\n{PREFIXES_NO_MATCH}\n', encoding='utf-8')
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--format=json',
+        f'--file={path}',
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    data = json.loads(capsys.readouterr().out)
+    assert data['prefixes'] == MOCK_PREFIXES_CACHE_LEN
+    assert data['lookups'] == 2
+    assert data['hits'] == 1
+    assert data['latency_ns']['count'] == 2
+    assert data['vendors']['aws']['cache_hits'] == 1
+
+
+def test_netlookup_stats_invalid_address(capsys, monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with invalid address
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        INVALID_NETWORKS[-1],
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
+
+    captured = capsys.readouterr()
+    assert len(captured.err.splitlines()) == 1
+    assert 'Lookups 0 hits 0' in captured.out
+
+
+def test_netlookup_stats_prometheus(capsys, monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with Prometheus text output
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--format=prometheus',
+        PREFIXES_NO_MATCH,
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert '# TYPE netlookup_lookups_total counter' in lines
+    assert 'netlookup_lookups_total{result="miss"} 1' in lines
+
+
+def test_netlookup_stats_top(capsys, monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with heavy hitters top lists
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--top=1',
+        '--format=json',
+        PREFIXES_GOOGLE_CLOUD_MATCH,
+        PREFIXES_GOOGLE_CLOUD_MATCH,
+        PREFIXES_NO_MATCH,
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    top = json.loads(capsys.readouterr().out)['top']
+    assert top['addresses'] == [{'key': PREFIXES_GOOGLE_CLOUD_MATCH, 'count': 2, 'error': 0}]
+    assert top['vendors'] == [{'key': 'google-cloud', 'count': 2, 'error': 0}]
+
+
+def test_netlookup_stats_top_text(capsys, monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with heavy hitters in text output
+    """
+    script = NetLookupScript()
+    testargs = [
+        'netlookup', 'stats',
+        f'--cache-directory={mock_prefixes_cache.cache_directory}',
+        '--top=5',
+        PREFIXES_GOOGLE_CLOUD_MATCH,
+    ]
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=0)
+
+    lines = capsys.readouterr().out.splitlines()
+    index = lines.index('Top vendors')
+    assert lines[index + 1].split() == ['1', 'google-cloud']
+
+
+def test_netlookup_stats_top_invalid(monkeypatch, mock_prefixes_cache) -> None:
+    """
+    Test running 'netlookup stats' command with invalid top count
+    """
+    script = NetLookupScript()
+    testargs = ['netlookup', 'stats', f'--cache-directory={mock_prefixes_cache.cache_directory}', '--top=0']
+    with monkeypatch.context() as context:
+        validate_script_run_exception_with_args(script, context, testargs, exit_code=1)
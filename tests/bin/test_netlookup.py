@@ -6,12 +6,38 @@
 """
 Unit tests for netlookup.bin.netlookup module
 """
+import json
+import subprocess
 import sys
 
+from pathlib import Path
+
 import pytest
 
 from netlookup.bin. netlookup import main
 
+# Modules only needed for fetching, looking up or processing vendor prefixes
+CLI_LAZY_MODULES = (
+    'dns',
+    'dns.resolver',
+    'numpy',
+    'requests',
+    'urllib3',
+    'netlookup.metrics',
+    'netlookup.network_array',
+    'netlookup.network_sets.aws',
+    'netlookup.network_sets.cloudflare',
+    'netlookup.network_sets.google',
+    'netlookup.prefixes',
+)
+
+CLI_IMPORT_SCRIPT = """
+import json
+import sys
+import netlookup.bin.netlookup
+print(json.dumps({'modules': sorted(sys.modules)}))
+"""
+
 
 def test_cli_netlookup_help(monkeypatch):
     """
@@ -31,3 +57,20 @@ def test_cli_netlookup_no_args(monkeypatch):
     with pytest.raises(SystemExit) as exit_status:
         main()
     assert exit_status.value.code == 1
+
+
+def test_cli_netlookup_lazy_imports() -> None:
+    """
+    Test importing the CLI does not load HTTP, DNS, NumPy or vendor modules
+
+    Import time is measured in the cli benchmark suite instead.
+    """
+    res = subprocess.run(
+        [sys.executable, '-c', CLI_IMPORT_SCRIPT],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        check=True,
+    )
+    data = json.loads(res.stdout)
+    for name in CLI_LAZY_MODULES:
+        assert name not in data['modules']
@@ -6,9 +6,12 @@
 """
 Unit test configuration for netlookup module
 """
+import json
+
 from http import HTTPStatus
 from pathlib import Path
 from shutil import copyfile, copytree, rmtree
+from tempfile import TemporaryDirectory
 from typing import Optional
 
 import pytest
@@ -16,6 +19,8 @@ import pytest
 from dns.resolver import NXDOMAIN
 from sys_toolkit.tests.mock import MockCalledMethod, MockException
 
+from netlookup.daemon import LookupDaemon
+from netlookup.http_service import LookupHTTPService
 from netlookup.network import Network
 from netlookup.exceptions import NetworkError
 from netlookup.network_sets.aws import AWS_IP_RANGES_URL
@@ -23,7 +28,6 @@ from netlookup.network_sets.cloudflare import CLOUDFLARE_IP_RANGES_IPV4_URL, CLO
 from netlookup.prefixes import Prefixes
 
 from .constants import (
-    GOOGLE_NETWORK_SET_SPF_RECORDS,
     INVALID_NETWORKS,
     NETWORK_ENCODER_OUTPUT_TESTCASES,
     NETWORK_HOST_COUNT_VALUES,
@@ -45,6 +49,12 @@ MOCK_PREFIXES_CACHE_INVALID_DIRECTORY = MOCK_DATA.joinpath('prefixes/cache_inval
 MOCK_AWS_IP_RANGES_FILE = MOCK_DATA.joinpath('network_sets/aws_ip_ranges.json')
 MOCK_CLOUDFLARE_V4_RANGES_FILE = MOCK_DATA.joinpath('network_sets/cloudflare_ipv4.txt')
 MOCK_CLOUDFLARE_V6_RANGES_FILE = MOCK_DATA.joinpath('network_sets/cloudflare_ipv6.txt')
+# SPF records for google services and google cloud as of November 2022
+MOCK_GOOGLE_SPF_RECORDS_FILE = MOCK_DATA.joinpath('network_sets/google_spf_records.json')
+GOOGLE_NETWORK_SET_SPF_RECORDS = {
+    name: tuple(fields)
+    for name, fields in json.loads(MOCK_GOOGLE_SPF_RECORDS_FILE.read_text(encoding='utf-8')).items()
+}
 
 MOCK_AWS_IP_RANGES_COUNT = 7042
 MOCK_CLOUDFLARE_IP_RANGES_COUNT = 22
@@ -181,7 +191,12 @@ def mock_google_dns_requests(monkeypatch):
     Mock responses to Google DNS queries
     """
     mock_answer = MockGoogleDnsAnswer()
-    monkeypatch.setattr('netlookup.network_sets.google.resolver.resolve', mock_answer)
+
+    async def mock_async_answer(*args, **kwargs):
+        return mock_answer(*args, **kwargs)
+
+    monkeypatch.setattr('dns.resolver.resolve', mock_answer)
+    monkeypatch.setattr('dns.asyncresolver.resolve', mock_async_answer)
     return mock_answer
 
 
@@ -191,7 +206,12 @@ def mock_google_dns_requests_error(monkeypatch):
     Mock error raised for responses to Google DNS queries
     """
     mock_error = MockException(NXDOMAIN)
-    monkeypatch.setattr('netlookup.network_sets.google.resolver.resolve', mock_error)
+
+    async def mock_async_error(*args, **kwargs):
+        return mock_error(*args, **kwargs)
+
+    monkeypatch.setattr('dns.resolver.resolve', mock_error)
+    monkeypatch.setattr('dns.asyncresolver.resolve', mock_async_error)
     return mock_error
 
 
@@ -238,6 +258,33 @@ def mock_prefixes_data(
     yield mock_prefixes_cache
 
 
+@pytest.fixture
+def mock_lookup_daemon(mock_prefixes_cache) -> LookupDaemon:
+    """
+    Return running lookup daemon for mocked prefixes cache data
+
+    Socket is created in a short temporary path to fit the Unix socket path length limit
+    """
+    with TemporaryDirectory(prefix='netlookup-') as directory:
+        daemon = LookupDaemon(
+            cache_directory=mock_prefixes_cache.cache_directory,
+            socket_path=Path(directory, 'netlookup.sock'),
+            reload_interval=0,
+        )
+        with daemon:
+            yield daemon
+
+
+@pytest.fixture
+def mock_lookup_http_service(mock_prefixes_cache) -> LookupHTTPService:
+    """
+    Return running HTTP lookup service for mocked prefixes cache data on a free local port
+    """
+    service = LookupHTTPService(cache_directory=mock_prefixes_cache.cache_directory, port=0, reload_interval=0)
+    with service:
+        yield service
+
+
 @pytest.fixture
 def mock_prefixes_cache_directory_missing(tmpdir) -> Prefixes:
     """
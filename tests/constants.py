@@ -116,165 +116,3 @@ NETWORK_ENCODER_OUTPUT_TESTCASES = (
 PREFIXES_NO_MATCH = '255.254.252.251'
 PREFIXES_GOOGLE_SERVICES_MATCH = '2800:3f0:4004::123'
 PREFIXES_GOOGLE_CLOUD_MATCH = '8.34.210.5'
-
-# SPF records for google services and google cloud as of November 2022
-GOOGLE_NETWORK_SET_SPF_RECORDS = {
-    '_cloud-netblocks.googleusercontent.com.': (
-        'v=spf1',
-        'include:_cloud-netblocks1.googleusercontent.com',
-        'include:_cloud-netblocks2.googleusercontent.com',
-        'include:_cloud-netblocks3.googleusercontent.com',
-        'include:_cloud-netblocks4.googleusercontent.com',
-        'include:_cloud-netblocks5.googleusercontent.com',
-        '?all'
-    ),
-    '_cloud-netblocks1.googleusercontent.com.': (
-        'v=spf1',
-        'include:_cloud-netblocks6.googleusercontent.com',
-        'include:_cloud-netblocks7.googleusercontent.com',
-        'ip6:2600:1900::/35',
-        'ip4:8.34.208.0/20',
-        'ip4:8.35.192.0/21',
-        'ip4:8.35.200.0/23',
-        'ip4:23.236.48.0/20',
-        'ip4:23.251.128.0/19',
-        'ip4:34.64.0.0/11',
-        'ip4:34.96.0.0/14',
-        '?all',
-    ),
-    '_cloud-netblocks2.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:34.100.0.0/16',
-        'ip4:34.102.0.0/15',
-        'ip4:34.104.0.0/14',
-        'ip4:34.124.0.0/18',
-        'ip4:34.124.64.0/20',
-        'ip4:34.124.80.0/23',
-        'ip4:34.124.84.0/22',
-        'ip4:34.124.88.0/23',
-        'ip4:34.124.92.0/22',
-        'ip4:34.125.0.0/16',
-        'ip4:35.184.0.0/14',
-        'ip4:35.188.0.0/15',
-        'ip4:35.190.0.0/17',
-        '?all'
-    ),
-    '_cloud-netblocks3.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:35.190.128.0/18',
-        'ip4:35.190.192.0/19',
-        'ip4:35.190.224.0/20',
-        'ip4:35.190.240.0/22',
-        'ip4:35.192.0.0/14',
-        'ip4:35.196.0.0/15',
-        'ip4:35.198.0.0/16',
-        'ip4:35.199.0.0/17',
-        'ip4:35.199.128.0/18',
-        'ip4:35.200.0.0/13',
-        'ip4:35.208.0.0/13',
-        'ip4:35.216.0.0/15',
-        '?all'
-    ),
-    '_cloud-netblocks4.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:35.219.192.0/24',
-        'ip4:35.220.0.0/14',
-        'ip4:35.224.0.0/13',
-        'ip4:35.232.0.0/15',
-        'ip4:35.234.0.0/16',
-        'ip4:35.235.0.0/17',
-        'ip4:35.235.192.0/20',
-        'ip4:35.235.216.0/21',
-        'ip4:35.235.224.0/20',
-        'ip4:35.236.0.0/14',
-        'ip4:35.240.0.0/13',
-        'ip4:104.154.0.0/15',
-        'ip4:104.196.0.0/14',
-        '?all'
-    ),
-    '_cloud-netblocks5.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:107.167.160.0/19',
-        'ip4:107.178.192.0/18',
-        'ip4:108.59.80.0/20',
-        'ip4:108.170.192.0/20',
-        'ip4:108.170.208.0/21',
-        'ip4:108.170.216.0/22',
-        'ip4:108.170.220.0/23',
-        'ip4:108.170.222.0/24',
-        'ip4:130.211.4.0/22',
-        'ip4:130.211.8.0/21',
-        'ip4:130.211.16.0/20',
-        'ip4:130.211.32.0/19',
-        '?all'
-    ),
-    '_cloud-netblocks6.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:130.211.64.0/18',
-        'ip4:130.211.128.0/17',
-        'ip4:146.148.2.0/23',
-        'ip4:146.148.4.0/22',
-        'ip4:146.148.8.0/21',
-        'ip4:146.148.16.0/20',
-        'ip4:146.148.32.0/19',
-        'ip4:146.148.64.0/18',
-        'ip4:162.216.148.0/22',
-        'ip4:162.222.176.0/21',
-        'ip4:173.255.112.0/20',
-        'ip4:192.158.28.0/22',
-        '?all',
-    ),
-    '_cloud-netblocks7.googleusercontent.com.': (
-        'v=spf1',
-        'ip4:199.192.112.0/22',
-        'ip4:199.223.232.0/22',
-        'ip4:199.223.236.0/23',
-        'ip4:208.68.108.0/23',
-        '?all',
-    ),
-    '_spf.google.com.': (
-        'v=spf1',
-        'include:_netblocks.google.com',
-        'include:_netblocks2.google.com',
-        'include:_netblocks3.google.com ~all'
-    ),
-    '_netblocks.google.com.': (
-        'v=spf1',
-        'ip4:35.190.247.0/24',
-        'ip4:64.233.160.0/19',
-        'ip4:66.102.0.0/20',
-        'ip4:66.249.80.0/20',
-        'ip4:72.14.192.0/18',
-        'ip4:74.125.0.0/16',
-        'ip4:108.177.8.0/21',
-        'ip4:173.194.0.0/16',
-        'ip4:209.85.128.0/17',
-        'ip4:216.58.192.0/19',
-        'ip4:216.239.32.0/19',
-        '~all'
-    ),
-    '_netblocks2.google.com.': (
-        'v=spf1',
-        'ip6:2001:4860:4000::/36',
-        'ip6:2404:6800:4000::/36',
-        'ip6:2607:f8b0:4000::/36',
-        'ip6:2800:3f0:4000::/36',
-        'ip6:2a00:1450:4000::/36',
-        'ip6:2c0f:fb50:4000::/36',
-        '~all'
-    ),
-    '_netblocks3.google.com.': (
-        'v=spf1',
-        'ip4:172.217.0.0/19',
-        'ip4:172.217.32.0/20',
-        'ip4:172.217.128.0/19',
-        'ip4:172.217.160.0/20',
-        'ip4:172.217.192.0/19',
-        'ip4:172.253.56.0/21',
-        'ip4:172.253.112.0/20',
-        'ip4:108.177.96.0/19',
-        'ip4:35.191.0.0/16',
-        'ip4:130.211.0.0/22',
-        '~all'
-    ),
-}
@@ -8,10 +8,13 @@ Unit tests for netlookup.network_sets.aws module
 """
 import pytest
 
+from netaddr import cidr_merge
+
 from netlookup.exceptions import NetworkError
-from netlookup.network_sets.aws import AWS
+from netlookup.network import NetworkList
+from netlookup.network_sets.aws import AWS, AWS_IP_RANGES_URL
 
-from ..conftest import MOCK_AWS_IP_RANGES_COUNT
+from ..conftest import MOCK_AWS_IP_RANGES_COUNT, MOCK_AWS_IP_RANGES_FILE
 from .common import validate_network_set_properties
 
 VENDOR = 'aws'
@@ -47,6 +50,7 @@ def test_network_sets_aws_update(mock_prefixes_cache_empty, mock_aws_ip_ranges)
     assert len(aws) == 0
     aws.fetch()
     assert len(aws) == MOCK_AWS_IP_RANGES_COUNT
+    assert isinstance(aws.__networks__, NetworkList)
     for network in aws:
         assert isinstance(network.__repr__(), str)
 
@@ -54,3 +58,162 @@ def test_network_sets_aws_update(mock_prefixes_cache_empty, mock_aws_ip_ranges)
     assert len(aws.regions) > 0
     for region in aws.regions:
         assert isinstance(region, str)
+
+
+def test_network_sets_aws_merged_and_substract(mock_prefixes_cache) -> None:
+    """
+    Test merging and subtracting networks from AWS network set without cache directory
+    """
+    aws = mock_prefixes_cache.get_vendor(VENDOR)
+    merged = aws.merged
+    assert isinstance(merged, AWS)
+    assert merged.cache_file is None
+    assert 0 < len(merged) <= len(aws)
+    assert isinstance(aws.substract(str(aws.__networks__[0].cidr)), AWS)
+
+
+def test_network_sets_aws_update_invalid_json(mock_prefixes_cache, requests_mock) -> None:
+    """
+    Test updating the AWS network with truncated JSON data does not modify loaded networks
+    """
+    requests_mock.register_uri(
+        'GET',
+        AWS_IP_RANGES_URL,
+        text=MOCK_AWS_IP_RANGES_FILE.read_text(encoding='UTF-8')[:100000]
+    )
+    aws = mock_prefixes_cache.get_vendor(VENDOR)
+    count = len(aws)
+    updated = aws.updated
+    with pytest.raises(NetworkError):
+        aws.fetch()
+    assert len(aws) == count
+    assert aws.updated == updated
+
+
+def test_network_sets_aws_update_missing_sync_token(mock_prefixes_cache_empty, requests_mock) -> None:
+    """
+    Test updating the AWS network with data missing the sync token
+    """
+    requests_mock.register_uri('GET', AWS_IP_RANGES_URL, text='{"prefixes": [], "ipv6_prefixes": []}')
+    aws = mock_prefixes_cache_empty.get_vendor(VENDOR)
+    with pytest.raises(NetworkError):
+        aws.fetch()
+
+
+def test_network_sets_aws_load_cache_file_missing_networks(mock_prefixes_cache) -> None:
+    """
+    Test loading AWS cache file without networks does not load empty network set
+    """
+    aws = mock_prefixes_cache.get_vendor(VENDOR)
+    count = len(aws.__networks__)
+    aws.cache_file.write_text('{"updated": "2023-01-01T12:00:00"}', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        aws.load()
+    assert len(aws.__networks__) == count
+
+    aws.cache_file.write_text('{"updated": "2023-01-01T12:00:00", "networks": []}', encoding='utf-8')
+    aws.load()
+    assert len(aws.__networks__) == 0
+
+
+# pylint: disable=unused-argument
+def test_network_sets_aws_network_border_group(mock_prefixes_cache_empty, mock_aws_ip_ranges) -> None:
+    """
+    Test network border groups are loaded from AWS IP ranges and saved to cache
+    """
+    aws = mock_prefixes_cache_empty.get_vendor(VENDOR)
+    aws.fetch()
+    assert len(aws.network_border_groups) > 0
+    for prefix in aws.__networks__:
+        assert prefix.network_border_group is not None
+        assert prefix.as_dict()['network_border_group'] == prefix.network_border_group
+
+    aws.save()
+    cached = AWS(cache_directory=aws.cache_directory)
+    assert cached.network_border_groups == aws.network_border_groups
+
+
+# pylint: disable=unused-argument
+def test_network_sets_aws_regions_empty(mock_prefixes_cache_empty, requests_mock) -> None:
+    """
+    Test detecting regions of empty AWS network set does not fetch data
+    """
+    aws = mock_prefixes_cache_empty.get_vendor(VENDOR)
+    assert aws.regions == []
+    assert aws.services == []
+    assert not requests_mock.called
+
+
+# pylint: disable=unused-argument
+def test_network_sets_aws_prefix_index(mock_prefixes_cache_empty, mock_aws_ip_ranges) -> None:
+    """
+    Test filtering AWS prefixes and merged covers by region, service and network border group
+    """
+    aws = mock_prefixes_cache_empty.get_vendor(VENDOR)
+    aws.fetch()
+    assert aws.regions == sorted(set(prefix.region for prefix in aws.__networks__))
+    assert 'EC2' in aws.services
+    assert 'AMAZON' not in aws.services
+    aws.regions.clear()
+    aws.services.clear()
+    aws.network_border_groups.clear()
+    assert aws.regions == aws.prefix_index.region_names != []
+    assert aws.services == aws.prefix_index.service_names != []
+    assert aws.network_border_groups == aws.prefix_index.network_border_group_names != []
+
+    expected = [
+        prefix for prefix in aws.__networks__
+        if prefix.region == 'eu-west-1' and 'EC2' in prefix.services
+    ]
+    assert len(expected) > 0
+    assert aws.filter(region='eu-west-1', service='EC2') == expected
+    assert aws.filter(region='eu-west-1', service='EC2', network_border_group='eu-west-1') == expected
+    assert aws.filter(region='eu-west-1', service='EC2', network_border_group='us-east-1') == []
+    assert aws.filter(region='unknown') == []
+    assert aws.filter() == list(aws.__networks__)
+
+    cover = aws.merged_cover(region='eu-west-1', service='EC2')
+    assert [network.cidr for network in cover] == cidr_merge(prefix.cidr for prefix in expected)
+    for prefix in expected:
+        assert any(prefix.cidr in network.cidr for network in cover)
+    assert aws.prefix_index.merged('eu-west-1', 'EC2') is aws.prefix_index.merged('eu-west-1', 'EC2')
+    assert aws.select(region='eu-west-1', services='EC2') == expected
+    prefix_ids = aws.prefix_index.prefix_ids('eu-west-1', 'EC2')
+    assert aws.prefix_index.select_ids({'region': 'eu-west-1', 'services': 'EC2'}) == prefix_ids
+
+
+# pylint: disable=unused-argument
+def test_network_sets_aws_prefix_index_reset(mock_prefixes_cache_empty, mock_aws_ip_ranges) -> None:
+    """
+    Test AWS prefix index is rebuilt after networks are changed
+    """
+    aws = mock_prefixes_cache_empty.get_vendor(VENDOR)
+    index = aws.prefix_index
+    assert aws.prefix_index is index
+    assert aws.attribute_index is index
+    aws.fetch()
+    assert aws.prefix_index is not index
+    assert len(aws.filter()) == MOCK_AWS_IP_RANGES_COUNT
+
+    index = aws.prefix_index
+    aws.add_network('192.0.2.0/24')
+    assert aws.prefix_index is not index
+    assert len(aws.filter()) == MOCK_AWS_IP_RANGES_COUNT + 1
+
+    index = aws.prefix_index
+    aws.save()
+    aws.load()
+    assert aws.prefix_index is not index
+
+
+def test_network_sets_aws_select(mock_prefixes_cache) -> None:
+    """
+    Test selecting AWS prefixes with attribute index
+    """
+    aws = mock_prefixes_cache.get_vendor(VENDOR)
+    index = aws.attribute_index
+    assert aws.attribute_index is index
+    assert aws.select(region='eu-west-1', services='S3') == aws.filter(region='eu-west-1', service='S3')
+    assert aws.select({'region': 'eu-west-1'}, services='S3') == aws.filter(region='eu-west-1', service='S3')
+    aws.load()
+    assert aws.attribute_index is not index
@@ -10,7 +10,9 @@ import pytest
 
 from netaddr.ip import IPNetwork
 from netlookup.exceptions import NetworkError
-from netlookup.network_sets.base import NetworkSet
+from netlookup.network import NetworkList
+from netlookup.network_sets.aws import AWSPrefix
+from netlookup.network_sets.base import NetworkSet, NetworkSetItem, load_cache_data
 
 TEST_NETWORKS = (
     IPNetwork('10.0.0.0/8'),
@@ -138,3 +140,26 @@ def test_network_sets_base_find_missing_address():
     Test looking up a known address from base network set
     """
     assert NetworkSet(TEST_NETWORKS).find(MISSING_ADDRESS) is None
+
+
+def test_network_sets_base_load_cache_data():
+    """
+    Test loading networks from cache file data with prefix classes selected by type
+    """
+    data = (
+        '{"updated": "2023-01-01T12:00:00", "networks": ['
+        '{"type": "aws", "cidr": "10.0.0.0/16", "region": "eu-west-1"}, {"type": "other", "cidr": "10.1.0.0/16"}]}'
+    )
+    updated, networks = load_cache_data([data], {'aws': AWSPrefix})
+    assert updated.year == 2023
+    assert isinstance(networks, NetworkList)
+    assert isinstance(networks[0], AWSPrefix)
+    assert networks[0].region == 'eu-west-1'
+    assert type(networks[1]) is NetworkSetItem  # pylint: disable=unidiomatic-typecheck
+
+    _updated, networks = load_cache_data([data], loader_class=AWSPrefix)
+    assert all(isinstance(network, AWSPrefix) for network in networks)
+
+    for data in ('{"updated": "2023-01-01T12:00:00"}', '{"networks": []}'):
+        with pytest.raises(NetworkError):
+            load_cache_data([data])
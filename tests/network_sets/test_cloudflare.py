@@ -9,6 +9,7 @@ Unit tests for netlookup.network_sets.cloudflare module
 import pytest
 
 from netlookup.exceptions import NetworkError
+from netlookup.network import NetworkList
 from netlookup.network_sets.cloudflare import Cloudflare
 
 from ..conftest import MOCK_CLOUDFLARE_IP_RANGES_COUNT
@@ -62,5 +63,6 @@ def test_network_sets_cloudflare_update(
     assert len(cloudflare) == 0
     cloudflare.fetch()
     assert len(cloudflare) == MOCK_CLOUDFLARE_IP_RANGES_COUNT
+    assert isinstance(cloudflare.__networks__, NetworkList)
     for network in cloudflare:
         assert isinstance(network.__repr__(), str)
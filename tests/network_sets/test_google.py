@@ -6,9 +6,12 @@
 """
 Unit tests for netlookup.network_sets.google module
 """
+import asyncio
+
 import pytest
 
 from netlookup.exceptions import NetworkError
+from netlookup.network import NetworkList
 from netlookup.network_sets.google import GoogleCloud, GoogleServices
 
 from .common import validate_network_set_properties
@@ -40,6 +43,7 @@ def test_network_sets_google_cloud_update(
     assert len(google_cloud_prefixes) == 0
     google_cloud_prefixes.fetch()
     assert len(google_cloud_prefixes) == MOCK_GOOGLE_CLOUD_IP_RANGES_COUNT
+    assert isinstance(google_cloud_prefixes.__networks__, NetworkList)
 
 
 # pylint: disable=unused-argument
@@ -77,3 +81,30 @@ def test_network_sets_google_services_update_error(
     google_services_prefixes = mock_prefixes_cache_empty.get_vendor('google')
     with pytest.raises(NetworkError):
         google_services_prefixes.fetch()
+
+
+# pylint: disable=unused-argument
+def test_network_sets_google_fetch_async(
+        mock_prefixes_cache_empty,
+        mock_google_dns_requests) -> None:
+    """
+    Test updating google network sets with mocked asyncio DNS response data
+    """
+    for vendor in ('google', 'google-cloud'):
+        google_prefixes = mock_prefixes_cache_empty.get_vendor(vendor)
+        google_prefixes.fetch()
+        expected = [network.cidr for network in google_prefixes.__networks__]
+        google_prefixes.__networks__.clear()
+        asyncio.run(google_prefixes.fetch_async())
+        assert [network.cidr for network in google_prefixes.__networks__] == expected
+
+
+# pylint: disable=unused-argument
+def test_network_sets_google_fetch_async_error(
+        mock_prefixes_cache_empty,
+        mock_google_dns_requests_error) -> None:
+    """
+    Test updating google network sets with asyncio DNS resolver and NXDOMAIN error
+    """
+    with pytest.raises(NetworkError):
+        asyncio.run(mock_prefixes_cache_empty.get_vendor('google').fetch_async())
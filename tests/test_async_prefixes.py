@@ -0,0 +1,161 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.async_prefixes module
+"""
+import asyncio
+
+import pytest
+
+from netlookup.async_prefixes import AsyncPrefixes
+from netlookup.exceptions import NetworkError
+from netlookup.heavy_hitters import HeavyHitters
+from netlookup.history import HistoryStore
+from netlookup.network_sets.google import GoogleCloudPrefix
+
+from .constants import (
+    MOCK_PREFIXES_CACHE_LEN,
+    MOCK_PREFIXES_DATA_LEN,
+    PREFIXES_GOOGLE_CLOUD_MATCH,
+    PREFIXES_NO_MATCH,
+)
+from .network_sets.test_aws import MOCK_AWS_IP_RANGES_COUNT
+
+
+def test_async_prefixes_not_loaded(tmpdir) -> None:
+    """
+    Test lookups before async prefixes are loaded
+    """
+    prefixes = AsyncPrefixes(cache_directory=tmpdir.strpath)
+    assert len(prefixes) == 0
+    with pytest.raises(NetworkError):
+        prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    with pytest.raises(NetworkError):
+        prefixes.get_vendor('aws')
+    with pytest.raises(NetworkError):
+        AsyncPrefixes(cache_directory=tmpdir.strpath, chunk_size=0)
+
+
+def test_async_prefixes_load_and_find(mock_prefixes_cache) -> None:
+    """
+    Test loading async prefixes and looking up addresses
+    """
+    async def run() -> AsyncPrefixes:
+        prefixes = await AsyncPrefixes.create(
+            cache_directory=mock_prefixes_cache.cache_directory,
+            stats=True,
+            heavy_hitters=HeavyHitters(),
+        )
+        assert len(prefixes) == MOCK_PREFIXES_CACHE_LEN
+        assert isinstance(prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+        loaded = prefixes.prefixes
+        await prefixes.load()
+        assert prefixes.prefixes is not loaded
+        assert prefixes.find(PREFIXES_NO_MATCH) is None
+        return prefixes
+
+    prefixes = asyncio.run(run())
+    assert prefixes.get_vendor('google-cloud').type == 'google-cloud'
+    # Statistics and heavy hitters are kept over reloads
+    assert prefixes.stats.loads == 2
+    assert prefixes.stats.lookups == 2
+    assert prefixes.heavy_hitters.addresses.total == 2
+
+
+def test_async_prefixes_find_many(mock_prefixes_cache) -> None:
+    """
+    Test batch lookups yield control to the event loop between chunks
+    """
+    addresses = [PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH] * 5
+
+    async def run():
+        prefixes = await AsyncPrefixes.create(cache_directory=mock_prefixes_cache.cache_directory, chunk_size=3)
+        ticks = []
+
+        async def ticker():
+            for _index in range(5):
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        results = await prefixes.find_many(addresses)
+        # Ticker ran once before the batch and once for each yield between chunks of 3 addresses
+        assert len(ticks) == 4
+        await task
+        with pytest.raises(NetworkError):
+            await prefixes.find_many(['invalid address'])
+        assert await prefixes.find_many(addresses[:2], types=['cloudflare']) == [None, None]
+        assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH, types='google-cloud') == results[0]
+        return results
+
+    results = asyncio.run(run())
+    assert [isinstance(result, GoogleCloudPrefix) for result in results] == [True, False] * 5
+    assert results[1::2] == [None] * 5
+
+
+# pylint: disable=unused-argument
+def test_async_prefixes_update(
+        mock_prefixes_cache_empty,
+        mock_aws_ip_ranges,
+        mock_cloudflare_ip4_ranges,
+        mock_cloudflare_ip6_ranges,
+        mock_google_dns_requests) -> None:
+    """
+    Test updating async prefixes with mocked vendor data
+    """
+    async def run() -> AsyncPrefixes:
+        prefixes = AsyncPrefixes(cache_directory=mock_prefixes_cache_empty.cache_directory, stats=True)
+        await prefixes.update()
+        return prefixes
+
+    prefixes = asyncio.run(run())
+    assert len(prefixes) == MOCK_PREFIXES_DATA_LEN
+    assert len(prefixes.get_vendor('aws')) == MOCK_AWS_IP_RANGES_COUNT
+    for vendor in prefixes.vendors:
+        assert vendor.cache_file.is_file()
+        assert prefixes.stats.vendor(vendor.type).fetches == 1
+
+
+def test_async_prefixes_update_history(mock_prefixes_data) -> None:
+    """
+    Test recording history versions when updating async prefixes
+    """
+    async def run() -> AsyncPrefixes:
+        prefixes = await AsyncPrefixes.create(cache_directory=mock_prefixes_data.cache_directory, history=True)
+        history = prefixes.history
+        assert prefixes.prefixes.record_history() == len(prefixes.vendors)
+        await prefixes.update()
+        # History store and its loaded indexes are kept over reloads
+        assert prefixes.history is history
+        assert prefixes.prefixes.history is history
+        return prefixes
+
+    prefixes = asyncio.run(run())
+    # Unchanged prefixes of mocked vendor data are not recorded as new versions
+    assert len(prefixes.history.versions('aws')) == 2
+    assert len(prefixes.history.versions('cloudflare')) == 1
+    assert len(HistoryStore(prefixes.history.directory).versions('aws')) == 2
+    assert AsyncPrefixes(cache_directory=mock_prefixes_data.cache_directory).history is None
+
+
+# pylint: disable=unused-argument
+def test_async_prefixes_update_error(
+        mock_prefixes_cache_empty,
+        mock_aws_ip_ranges,
+        mock_cloudflare_ip4_ranges,
+        mock_cloudflare_ip6_ranges,
+        mock_google_dns_requests_error) -> None:
+    """
+    Test updating async prefixes when one vendor fails
+    """
+    prefixes = AsyncPrefixes(cache_directory=mock_prefixes_cache_empty.cache_directory, stats=True)
+    with pytest.raises(NetworkError):
+        asyncio.run(prefixes.update())
+    # Other vendors are updated and reloaded
+    assert len(prefixes.get_vendor('aws')) == MOCK_AWS_IP_RANGES_COUNT
+    assert len(prefixes.get_vendor('google-cloud')) == 0
+    assert prefixes.stats.vendor('google-cloud').fetch_errors == 1
@@ -6,11 +6,15 @@
 """
 Unit tests for netlookup.base module
 """
+import os
 import re
 
+from pathlib import Path
+
 import pytest
 
-from netlookup.base import match_patterns
+from netlookup.base import PARSED_FILE_CACHE, FileItem, clear_parsed_file_cache, match_patterns, split_fields
+from netlookup.services import Services
 
 RE_TEST_PATTERNS = (
     re.compile(r'^(?P<number>\d+) is a number string$'),
@@ -32,3 +36,78 @@ def test_base_match_patterns_no_match_found() -> None:
     """
     with pytest.raises(ValueError):
         match_patterns(RE_TEST_PATTERNS, '1234 is not a match')
+
+
+def test_base_file_item_from_line_patterns() -> None:
+    """
+    Test parsing lines with patterns of file item class
+    """
+    class NumberItem(FileItem):
+        """
+        File item parsed with test patterns
+        """
+        __patterns__ = RE_TEST_PATTERNS
+
+        def __init__(self, number: str) -> None:
+            self.number = int(number)
+
+    assert NumberItem.from_line('1234 is a number string').number == 1234
+    with pytest.raises(ValueError):
+        NumberItem.from_line('1234 is not a match')
+
+
+def test_base_split_fields() -> None:
+    """
+    Test splitting data line to fields and comment
+    """
+    assert split_fields('ssh 22/tcp # SSH Remote Login') == (['ssh', '22/tcp'], ' SSH Remote Login')
+    assert split_fields('discard 9/udp  sink  null', 2) == (['discard', '9/udp', 'sink  null'], '')
+    assert split_fields('# only comment') == ([], ' only comment')
+
+
+def test_base_parsed_file_cache_reload_modified(tmpdir) -> None:
+    """
+    Test parsed file cache is reused for unchanged files and reloaded when file is modified
+    """
+    clear_parsed_file_cache()
+    path = Path(tmpdir.strpath, 'services')
+    path.write_text('ssh 22/tcp\n', encoding='utf-8')
+
+    services = Services(path)
+    assert len(services) == 1
+    assert len(PARSED_FILE_CACHE) == 1
+    assert Services(path).__items__ is services.__items__
+
+    path.write_text('ssh 22/tcp\nssh 22/udp\n', encoding='utf-8')
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    services = Services(path)
+    assert len(services) == 2
+    assert services.get_by_port(22, 'udp') is not None
+    clear_parsed_file_cache()
+    assert len(PARSED_FILE_CACHE) == 0
+
+
+def test_base_parsed_file_pickle_cache(tmpdir) -> None:
+    """
+    Test loading parsed file data from pickle cache directory
+    """
+    clear_parsed_file_cache()
+    path = Path(tmpdir.strpath, 'services')
+    path.write_text('ssh 22/tcp\nhttps 443/tcp www\n', encoding='utf-8')
+    cache_directory = Path(tmpdir.strpath, 'cache')
+
+    Services(path, cache_directory=cache_directory)
+    cache_files = list(cache_directory.iterdir())
+    assert len(cache_files) == 1
+
+    clear_parsed_file_cache()
+    services = Services(path, cache_directory=cache_directory)
+    assert len(services) == 2
+    assert services.get_by_name('www')[0].port_number == 443
+
+    # Invalid cache files are ignored
+    clear_parsed_file_cache()
+    cache_files[0].write_bytes(b'invalid pickle data')
+    assert len(Services(path, cache_directory=cache_directory)) == 2
+    clear_parsed_file_cache()
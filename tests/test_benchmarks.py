@@ -0,0 +1,162 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for benchmarks module
+"""
+import json
+
+from pathlib import Path
+
+from netaddr import IPAddress, IPSet
+
+from benchmarks.__main__ import main, parse_sizes
+from benchmarks.common import percentile
+from benchmarks.fetch import spf_records
+from benchmarks.servers import MAX_TXT_STRING_LENGTH
+from benchmarks.synthetic import SyntheticPrefixSet, main as main_synthetic
+from netlookup.network import format_address
+from netlookup.prefixes import Prefixes
+
+
+def test_benchmarks_parse_sizes() -> None:
+    """
+    Test parsing benchmark data set sizes
+    """
+    assert parse_sizes('mock,100, 1000,') == [None, 100, 1000]
+
+
+def test_benchmarks_percentile() -> None:
+    """
+    Test nearest rank percentile calculation
+    """
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
+
+
+def test_benchmarks_run_lookup_suite(capsys, tmpdir) -> None:
+    """
+    Test running the lookup benchmark suite with minimal data set sizes
+    """
+    output = Path(tmpdir.strpath, 'results.json')
+    main(['--suite=lookup', '--sizes=mock,100', '--queries=10', '--repeat=1', f'--output={output}'])
+
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert 'metadata' in data
+    names = set(result['name'] for result in data['results'])
+    for name in ('Prefixes.__init__', 'Prefixes.find hit', 'Prefixes.find miss', 'Network.subnet'):
+        assert name in names
+    assert len(capsys.readouterr().out.splitlines()) == len(data['results'])
+
+
+def test_benchmarks_run_cli_suite(capsys) -> None:
+    """
+    Test running the CLI startup benchmark suite
+    """
+    results = main(['--suite=cli', '--repeat=1'])
+    assert len(capsys.readouterr().out.splitlines()) == 1
+    result = results.results[0]
+    assert result['name'] == 'import netlookup.bin.netlookup'
+    assert result['median'] > 0
+    assert result['modules'] > 0
+
+
+def test_benchmarks_run_fetch_suite(capsys) -> None:
+    """
+    Test running the fetch benchmark suite against local servers with minimal data set sizes
+    """
+    results = main(['--suite=fetch', '--sizes=mock,100', '--repeat=1'])
+    assert len(capsys.readouterr().out.splitlines()) == len(results.results)
+
+    updates = [result for result in results.results if result['name'] == 'Prefixes.update']
+    assert [result['size'] for result in updates] == [7165, 100]
+    names = set(result['name'] for result in results.results)
+    for vendor in ('aws', 'cloudflare', 'google-cloud', 'google'):
+        for stage in ('download', 'build', 'sort', 'save'):
+            assert f'Prefixes.update {vendor} {stage}' in names
+    for result in results.results:
+        if result['name'] == 'Prefixes.update memory':
+            assert result['peak'] > 0
+
+
+def test_benchmarks_fetch_spf_records() -> None:
+    """
+    Test splitting SPF fields to included TXT records fitting DNS string length limit
+    """
+    fields = [f'ip4:10.{index // 256}.{index % 256}.0/24' for index in range(1000)]
+    records = spf_records('_spf.example.com', fields)
+    assert len(records) > 1
+    for record in records.values():
+        assert len(record) <= MAX_TXT_STRING_LENGTH
+
+    def resolve(name):
+        values = []
+        for field in records[name].split(' '):
+            if field.startswith('include:'):
+                values.extend(resolve(field[8:]))
+            elif field.startswith('ip4:'):
+                values.append(field)
+        return values
+    assert resolve('_spf.example.com') == fields
+    assert spf_records('_spf.example.com', fields[:2]) == {
+        '_spf.example.com': f'v=spf1 {fields[0]} {fields[1]} ?all'
+    }
+
+
+def test_benchmarks_synthetic_prefix_set_deterministic() -> None:
+    """
+    Test synthetic prefix sets and queries are deterministic for a seed
+    """
+    first = SyntheticPrefixSet(500, seed=1)
+    second = SyntheticPrefixSet(500, seed=1)
+    assert len(first) == 500
+    assert first.records == second.records
+    assert first.queries(100) == second.queries(100)
+    assert SyntheticPrefixSet(500, seed=2).records != first.records
+
+
+def test_benchmarks_synthetic_prefix_set_cache_files(tmpdir) -> None:
+    """
+    Test synthetic prefix set cache files can be loaded as prefixes
+    """
+    prefix_set = SyntheticPrefixSet(1000, ipv6_ratio=0.5)
+    paths = prefix_set.write(Path(tmpdir.strpath))
+    assert len(paths) == 4
+
+    prefixes = Prefixes(cache_directory=tmpdir.strpath)
+    assert len(prefixes) == 1000
+    assert len(prefixes.filter_type('aws')) == len(prefix_set.records['aws'])
+    versions = set(prefix.version for prefix in prefixes)
+    assert versions == {4, 6}
+    for prefix in prefixes.filter_type('aws'):
+        assert prefix.region is not None
+
+
+def test_benchmarks_synthetic_prefix_set_queries_hit_ratio() -> None:
+    """
+    Test hit ratio of synthetic prefix set lookup queries
+    """
+    prefix_set = SyntheticPrefixSet(200)
+    ipset = IPSet(
+        f'{format_address(value, version)}/{prefixlen}'
+        for value, prefixlen, version in prefix_set.networks
+    )
+    for hit_ratio in (0.0, 0.5, 1.0):
+        queries = prefix_set.queries(1000, hit_ratio=hit_ratio)
+        hits = sum(1 for address in queries if IPAddress(address) in ipset)
+        assert abs(hits / len(queries) - hit_ratio) < 0.1
+
+
+def test_benchmarks_synthetic_main(tmpdir) -> None:
+    """
+    Test writing synthetic cache files and queries with the script main function
+    """
+    directory = Path(tmpdir.strpath)
+    main_synthetic(['--count=100', f'--directory={directory}', '--queries=50'])
+    assert len(directory.joinpath('queries.txt').read_text(encoding='utf-8').splitlines()) == 50
+    assert directory.joinpath('aws-networks.json').is_file()
@@ -0,0 +1,173 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.daemon module
+"""
+import socket
+
+import pytest
+
+from netlookup.daemon import (
+    MAX_REQUEST_LINE_LENGTH,
+    PIPELINE_BATCH_SIZE,
+    LookupClient,
+    LookupDaemon,
+)
+from netlookup.exceptions import NetworkError
+from netlookup.network_sets.google import GoogleCloudPrefix, GoogleServicePrefix
+from netlookup.watcher import cache_signature
+
+from .constants import PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_GOOGLE_SERVICES_MATCH, PREFIXES_NO_MATCH
+
+
+def test_daemon_client_lookup(mock_lookup_daemon) -> None:
+    """
+    Test looking up addresses from lookup daemon
+    """
+    with LookupClient(mock_lookup_daemon.socket_path) as client:
+        assert not client.connected
+        network = client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH)
+        assert client.connected
+        assert isinstance(network, GoogleCloudPrefix)
+        assert network == mock_lookup_daemon.prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+        assert network.as_dict() == mock_lookup_daemon.prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH).as_dict()
+        assert client.lookup(PREFIXES_NO_MATCH) is None
+        with pytest.raises(NetworkError):
+            client.lookup('invalid address')
+    assert not client.connected
+
+
+def test_daemon_client_lookup_many(mock_lookup_daemon) -> None:
+    """
+    Test pipelined lookups of more addresses than fit in one batch
+    """
+    addresses = [PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH, PREFIXES_GOOGLE_SERVICES_MATCH]
+    addresses = addresses * PIPELINE_BATCH_SIZE
+    with LookupClient(mock_lookup_daemon.socket_path) as client:
+        results = client.lookup_many(addresses)
+        assert len(results) == len(addresses)
+        assert isinstance(results[-3], GoogleCloudPrefix)
+        assert results[-2] is None
+        assert isinstance(results[-1], GoogleServicePrefix)
+
+        # Invalid address is reported after all responses are read and connection stays usable
+        with pytest.raises(NetworkError):
+            client.lookup_many([PREFIXES_NO_MATCH, 'invalid address', PREFIXES_GOOGLE_CLOUD_MATCH])
+        assert isinstance(client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+
+        with pytest.raises(NetworkError):
+            client.lookup_many(['192.0.2.1\n192.0.2.2'])
+        with pytest.raises(NetworkError):
+            client.lookup('1' * (MAX_REQUEST_LINE_LENGTH + 1))
+
+
+def test_daemon_request_line_too_long(mock_lookup_daemon) -> None:
+    """
+    Test daemon closes connections sending too long request lines
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(5)
+        client.connect(str(mock_lookup_daemon.socket_path))
+        client.sendall(b'1' * (MAX_REQUEST_LINE_LENGTH + 1))
+        response = b''
+        while True:
+            data = client.recv(1024)
+            if not data:
+                break
+            response += data
+    assert response == b'!Request line too long\n'
+
+
+def test_daemon_client_reconnect(mock_lookup_daemon) -> None:
+    """
+    Test client reconnects when lookup daemon is restarted
+    """
+    client = LookupClient(mock_lookup_daemon.socket_path)
+    assert isinstance(client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+    mock_lookup_daemon.stop()
+    assert not mock_lookup_daemon.socket_path.exists()
+    with pytest.raises(NetworkError):
+        client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert not client.connected
+
+    mock_lookup_daemon.start()
+    assert isinstance(client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+    client.close()
+
+
+def test_daemon_client_connect_error(tmpdir) -> None:
+    """
+    Test connecting to lookup daemon which is not running
+    """
+    client = LookupClient(tmpdir.join('missing.sock').strpath)
+    with pytest.raises(NetworkError):
+        client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH)
+
+
+def test_daemon_reload(mock_lookup_daemon) -> None:
+    """
+    Test reloading prefixes when cache files change
+    """
+    prefixes = mock_lookup_daemon.prefixes
+    assert mock_lookup_daemon.reloads == 1
+    signature = cache_signature(prefixes)
+    assert mock_lookup_daemon.check_reload() is False
+    assert mock_lookup_daemon.prefixes is prefixes
+
+    vendor = prefixes.get_vendor('google-cloud')
+    vendor.__networks__.clear()
+    vendor.save()
+    assert cache_signature(prefixes) != signature
+    assert mock_lookup_daemon.check_reload() is True
+    assert mock_lookup_daemon.reloads == 2
+    assert mock_lookup_daemon.prefixes is not prefixes
+    with LookupClient(mock_lookup_daemon.socket_path) as client:
+        assert client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH) is None
+
+    # Invalid cache file keeps serving previous prefixes
+    prefixes = mock_lookup_daemon.prefixes
+    vendor.cache_file.write_text('this is not a json file', encoding='utf-8')
+    assert mock_lookup_daemon.check_reload() is False
+    assert mock_lookup_daemon.reload_error is not None
+    assert mock_lookup_daemon.prefixes is prefixes
+
+
+def test_daemon_socket_errors(mock_lookup_daemon, tmpdir) -> None:
+    """
+    Test starting lookup daemon with socket path in use
+    """
+    daemon = LookupDaemon(
+        cache_directory=mock_lookup_daemon.cache_directory,
+        socket_path=mock_lookup_daemon.socket_path,
+        reload_interval=0,
+    )
+    with pytest.raises(NetworkError):
+        daemon.start()
+
+    path = tmpdir.join('file')
+    path.write('')
+    daemon = LookupDaemon(cache_directory=mock_lookup_daemon.cache_directory, socket_path=path.strpath)
+    with pytest.raises(NetworkError):
+        daemon.start()
+
+
+def test_daemon_stale_socket(mock_lookup_daemon) -> None:
+    """
+    Test starting lookup daemon removes socket file left by a stopped daemon
+    """
+    socket_path = mock_lookup_daemon.socket_path
+    mock_lookup_daemon.stop()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(socket_path))
+    assert socket_path.exists()
+
+    daemon = LookupDaemon(cache_directory=mock_lookup_daemon.cache_directory, socket_path=socket_path)
+    with daemon:
+        assert daemon.wait(0) is False
+        with LookupClient(socket_path) as client:
+            assert isinstance(client.lookup(PREFIXES_GOOGLE_CLOUD_MATCH), GoogleCloudPrefix)
+    assert daemon.wait(0) is True
+    assert not socket_path.exists()
@@ -0,0 +1,139 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.diff module
+"""
+import json
+import random
+
+from pathlib import Path
+
+import pytest
+
+from netaddr import IPSet
+
+from netlookup.diff import diff_network_sets, diff_networks, diff_snapshots, load_snapshot
+from netlookup.exceptions import NetworkError
+from netlookup.network import Network
+from netlookup.network_sets.aws import AWSPrefix
+from netlookup.network_sets.cloudflare import CloudflarePrefix
+
+from .conftest import MOCK_PREFIXES_CACHE_DIRECTORY
+from .constants import MOCK_PREFIXES_CACHE_LEN
+
+
+def write_changed_aws_cache(directory: Path) -> Path:
+    """
+    Write changed copy of mock AWS cache file to directory
+    """
+    data = json.loads(MOCK_PREFIXES_CACHE_DIRECTORY.joinpath('aws-networks.json').read_text(encoding='utf-8'))
+    data['networks'][0]['region'] = 'eu-north-1'
+    data['networks'][1]['services'] = list(reversed(data['networks'][1]['services'] + ['EC2']))
+    data['networks'][2]['services'] = list(reversed(data['networks'][2]['services']))
+    del data['networks'][3]
+    data['networks'].append({'type': 'aws', 'cidr': '198.51.100.0/24', 'region': 'us-east-1', 'services': []})
+    path = directory.joinpath('aws-networks.json')
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return path
+
+
+def test_diff_networks() -> None:
+    """
+    Test comparing lists of prefixes
+    """
+    old = [
+        AWSPrefix('10.0.0.0/16', {'region': 'eu-west-1', 'services': ['S3', 'EC2']}),
+        AWSPrefix('10.1.0.0/16', {'region': 'eu-west-1', 'services': ['S3']}),
+        CloudflarePrefix('10.2.0.0/24'),
+        AWSPrefix('2001:db8::/32', {'region': 'us-east-1', 'services': []}),
+    ]
+    new = [
+        AWSPrefix('2001:db8::/32', {'region': 'us-east-1', 'services': []}),
+        AWSPrefix('10.0.0.0/16', {'region': 'eu-west-1', 'services': ['EC2', 'S3']}),
+        AWSPrefix('10.1.0.0/16', {'region': 'eu-north-1', 'services': ['S3']}),
+        AWSPrefix('10.2.0.0/24', {'region': 'eu-north-1', 'services': ['S3']}),
+        CloudflarePrefix('10.3.0.0/23'),
+    ]
+    diff = diff_networks(old, new)
+    assert len(diff) == 4
+    assert [str(network) for network in diff.added] == ['aws eu-north-1 10.2.0.0/24', 'cloudflare 10.3.0.0/23']
+    assert [str(network) for network in diff.removed] == ['cloudflare 10.2.0.0/24']
+    assert len(diff.changed) == 1
+    assert diff.changed[0].changes == {'region': ('eu-west-1', 'eu-north-1')}
+    assert 'region eu-west-1 -> eu-north-1' in repr(diff.changed[0])
+    assert diff.addresses_added == {4: 512, 6: 0}
+    assert diff.addresses_removed == {4: 0, 6: 0}
+    assert diff.address_delta == {4: 512, 6: 0}
+
+    data = diff.as_dict()
+    assert data['changed'][0]['changes'] == {'region': {'old': 'eu-west-1', 'new': 'eu-north-1'}}
+    assert data['addresses']['ipv4'] == {'added': 512, 'removed': 0, 'delta': 512}
+    assert len(diff_networks(new, new)) == 0
+    assert len(diff_networks([], new).added) == len(new)
+
+
+def test_diff_address_space() -> None:
+    """
+    Test address space changes match set operations for random networks
+    """
+    rng = random.Random(1)
+    for _iteration in range(20):
+        old = [Network(f'10.{rng.randrange(4)}.{rng.randrange(256)}.0/{rng.randrange(16, 25)}') for _ in range(30)]
+        new = [Network(f'10.{rng.randrange(4)}.{rng.randrange(256)}.0/{rng.randrange(16, 25)}') for _ in range(30)]
+        old_set = IPSet(network.cidr for network in old)
+        new_set = IPSet(network.cidr for network in new)
+        diff = diff_networks(old, new)
+        assert diff.addresses_added[4] == (new_set - old_set).size
+        assert diff.addresses_removed[4] == (old_set - new_set).size
+        assert diff.address_delta[4] == new_set.size - old_set.size
+
+
+def test_diff_network_sets(mock_prefixes_cache) -> None:
+    """
+    Test comparing network sets
+    """
+    aws = mock_prefixes_cache.get_vendor('aws')
+    assert len(diff_network_sets(aws, aws)) == 0
+    diff = diff_network_sets(aws, mock_prefixes_cache.get_vendor('cloudflare'))
+    assert len(diff.removed) == len(aws)
+
+
+def test_diff_snapshots(tmpdir) -> None:
+    """
+    Test comparing cache files and cache directories
+    """
+    directory = Path(tmpdir.strpath)
+    path = write_changed_aws_cache(directory)
+    assert len(load_snapshot(MOCK_PREFIXES_CACHE_DIRECTORY)) == MOCK_PREFIXES_CACHE_LEN
+
+    diff = diff_snapshots(MOCK_PREFIXES_CACHE_DIRECTORY, directory)
+    assert len(diff.added) == 1
+    assert len(diff.changed) == 2
+    assert len(diff.removed) == MOCK_PREFIXES_CACHE_LEN - len(load_snapshot(path)) + 1
+
+    diff = diff_snapshots(MOCK_PREFIXES_CACHE_DIRECTORY.joinpath('aws-networks.json'), path)
+    assert [str(network.cidr) for network in diff.added] == ['198.51.100.0/24']
+    assert len(diff.removed) == 1
+    assert sorted(attribute for change in diff.changed for attribute in change.changes) == ['region', 'services']
+
+    diff = diff_snapshots(MOCK_PREFIXES_CACHE_DIRECTORY, directory, types=['aws'])
+    assert len(diff) == 4
+
+
+def test_diff_snapshots_errors(tmpdir) -> None:
+    """
+    Test comparing missing and invalid snapshots
+    """
+    directory = Path(tmpdir.strpath)
+    with pytest.raises(NetworkError):
+        load_snapshot(directory.joinpath('missing.json'))
+    invalid = directory.joinpath('invalid.json')
+    invalid.write_text('{"networks": [{"cidr": "invalid"}]}', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        diff_snapshots(invalid, MOCK_PREFIXES_CACHE_DIRECTORY)
+    invalid.write_text('{"updated": "2023-01-01T12:00:00"}', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        load_snapshot(invalid)
@@ -0,0 +1,167 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.heavy_hitters module
+"""
+import random
+import sys
+import threading
+
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from netlookup.exceptions import NetworkError
+from netlookup.heavy_hitters import (
+    HEAP_REBUILD_FACTOR,
+    HeavyHitters,
+    SpaceSaving,
+    load_snapshot,
+    load_snapshot_addresses,
+    miss_network,
+)
+from netlookup.network_sets.aws import AWSPrefix
+
+
+def test_heavy_hitters_space_saving_invalid_capacity() -> None:
+    """
+    Test space-saving counter with invalid capacity
+    """
+    with pytest.raises(NetworkError):
+        SpaceSaving(0)
+
+
+def test_heavy_hitters_space_saving_exact_below_capacity() -> None:
+    """
+    Test space-saving counts are exact when number of keys fits in capacity
+    """
+    counter = SpaceSaving(10)
+    for key in 'abcabca':
+        counter.add(key)
+    assert counter.top() == [('a', 3, 0), ('b', 2, 0), ('c', 2, 0)]
+    assert counter.top(1) == [('a', 3, 0)]
+    assert counter.total == 7
+    assert len(counter) == 3
+    assert 'a' in counter
+    counter.clear()
+    assert len(counter) == 0
+
+
+def test_heavy_hitters_space_saving_skewed_stream() -> None:
+    """
+    Test space-saving finds heavy hitters of a skewed stream in bounded memory
+    """
+    rng = random.Random(1)
+    capacity = 50
+    counter = SpaceSaving(capacity)
+    stream = [int(rng.paretovariate(1.0)) for _index in range(20000)]
+    for key in stream:
+        counter.add(key)
+    assert len(counter) == capacity
+    assert counter.total == len(stream)
+
+    expected = Counter(stream)
+    threshold = len(stream) / capacity
+    top = {key: (count, error) for key, count, error in counter.top()}
+    for key, count in expected.items():
+        if count > threshold:
+            assert key in top
+    for key, (count, error) in top.items():
+        # Counts are overestimated by at most the recorded error
+        assert count - error <= expected[key] <= count
+    assert len(counter.__heap__) <= HEAP_REBUILD_FACTOR * capacity
+
+
+def test_heavy_hitters_miss_network() -> None:
+    """
+    Test grouping missed addresses to networks
+    """
+    assert miss_network('240.1.2.3') == '240.1.2.0/24'
+    assert miss_network('2001:db8:1:2::3') == '2001:db8:1::/48'
+
+
+def test_heavy_hitters_record_and_snapshot(tmpdir) -> None:
+    """
+    Test recording lookups and saving and loading snapshots
+    """
+    heavy_hitters = HeavyHitters(capacity=10)
+    prefix = AWSPrefix('3.80.0.0/12', {'region': 'us-east-1'})
+    heavy_hitters.record('3.81.2.1', prefix)
+    heavy_hitters.record('3.81.2.1', prefix)
+    heavy_hitters.record('3.81.2.2', prefix)
+    heavy_hitters.record('240.1.2.3', None)
+
+    top = heavy_hitters.top(1)
+    assert top['addresses'] == [{'key': '3.81.2.1', 'count': 2, 'error': 0}]
+    assert top['prefixes'] == [{'key': '3.80.0.0/12', 'count': 3, 'error': 0}]
+    assert top['vendors'] == [{'key': 'aws', 'count': 3, 'error': 0}]
+    assert top['regions'] == [{'key': 'us-east-1', 'count': 3, 'error': 0}]
+    assert top['misses'] == [{'key': '240.1.2.0/24', 'count': 1, 'error': 0}]
+
+    path = Path(tmpdir.strpath, 'top.json')
+    heavy_hitters.save(path)
+    assert load_snapshot(path) == heavy_hitters.top()
+    assert load_snapshot_addresses(path) == ['3.81.2.1', '3.81.2.2', '240.1.2.3']
+
+    heavy_hitters.clear()
+    assert heavy_hitters.top()['addresses'] == []
+
+
+def test_heavy_hitters_record_threads() -> None:
+    """
+    Test recording lookups from multiple threads while reading top keys
+    """
+    # Switch threads often to expose unlocked counter updates
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    heavy_hitters = HeavyHitters(capacity=16)
+    prefix = AWSPrefix('3.80.0.0/12', {'region': 'us-east-1'})
+    thread_count = 8
+    lookups = 2000
+
+    def run(seed: int) -> None:
+        generator = random.Random(seed)
+        for index in range(lookups):
+            address = f'3.81.{generator.randint(0, 3)}.{generator.randint(0, 63)}'
+            heavy_hitters.record(address, prefix if index % 2 else None)
+            if index % 100 == 0:
+                heavy_hitters.top(5)
+
+    try:
+        threads = [threading.Thread(target=run, args=(seed,)) for seed in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    total = thread_count * lookups
+    assert heavy_hitters.addresses.total == total
+    assert sum(heavy_hitters.addresses.counts.values()) == total
+    assert len(heavy_hitters.addresses) == 16
+    assert set(heavy_hitters.addresses.counts) == set(heavy_hitters.addresses.errors)
+    top = heavy_hitters.top()
+    assert top['vendors'] == [{'key': 'aws', 'count': total // 2, 'error': 0}]
+    assert sum(item['count'] for item in top['misses']) == total // 2
+
+
+def test_heavy_hitters_snapshot_errors(tmpdir) -> None:
+    """
+    Test errors loading and saving heavy hitters snapshots
+    """
+    path = Path(tmpdir.strpath, 'top.json')
+    with pytest.raises(NetworkError):
+        load_snapshot(path)
+    path.write_text('[]', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        load_snapshot(path)
+    path.write_text('{"addresses": [{"count": 1}]}', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        load_snapshot_addresses(path)
+    with pytest.raises(NetworkError):
+        HeavyHitters().save(Path(tmpdir.strpath, 'missing', 'top.json'))
@@ -0,0 +1,219 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.history module
+"""
+import json
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from netlookup.exceptions import NetworkError
+from netlookup.history import HISTORY_DIRECTORY_NAME, HistoryStore
+from netlookup.network import NetworkList
+from netlookup.network_sets.aws import AWS, AWSPrefix
+from netlookup.prefixes import Prefixes
+
+FIRST_UPDATE = datetime(2023, 1, 1, 12, 0)
+SECOND_UPDATE = datetime(2023, 2, 1, 12, 0)
+THIRD_UPDATE = datetime(2023, 3, 1, 12, 0)
+
+
+def create_aws_network_set(directory: Path, updated: datetime, networks) -> AWS:
+    """
+    Create AWS network set with specified updated timestamp and prefixes
+    """
+    network_set = AWS(cache_directory=str(directory))
+    network_set.updated = updated
+    network_set.__networks__ = NetworkList(
+        AWSPrefix(cidr, {'region': region, 'services': ['EC2']}) for cidr, region in networks
+    )
+    return network_set
+
+
+@pytest.fixture
+def history_store(tmpdir) -> HistoryStore:
+    """
+    Return history store with three recorded AWS versions
+    """
+    directory = Path(tmpdir.strpath)
+    store = HistoryStore(directory.joinpath(HISTORY_DIRECTORY_NAME))
+    versions = (
+        (FIRST_UPDATE, [('10.0.0.0/16', 'eu-west-1'), ('10.1.0.0/16', 'eu-west-1')]),
+        (SECOND_UPDATE, [('10.0.0.0/16', 'eu-north-1'), ('10.1.0.0/16', 'eu-west-1'), ('10.1.2.0/24', 'us-east-1')]),
+        (THIRD_UPDATE, [('10.0.0.0/16', 'eu-north-1'), ('10.1.2.0/24', 'us-east-1')]),
+    )
+    for updated, networks in versions:
+        assert store.record(create_aws_network_set(directory, updated, networks))
+    yield store
+
+
+def test_history_store_empty(tmpdir) -> None:
+    """
+    Test history store without recorded versions
+    """
+    store = HistoryStore(tmpdir.strpath)
+    assert store.versions('aws') == []
+    assert store.state('aws') == []
+    assert store.find('10.0.0.1', FIRST_UPDATE, ['aws']) is None
+
+
+def test_history_store_record(history_store) -> None:
+    """
+    Test recording versions stores base snapshot and changes only
+    """
+    assert history_store.versions('aws') == [FIRST_UPDATE, SECOND_UPDATE, THIRD_UPDATE]
+    lines = history_store.history_file('aws').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 3
+    base, second, third = [json.loads(line) for line in lines]
+    assert len(base['added']) == 2
+    assert [record['cidr'] for record in second['added']] == ['10.1.2.0/24']
+    assert [record['cidr'] for record in second['changed']] == ['10.0.0.0/16']
+    assert second['removed'] == []
+    assert third['added'] == []
+    assert third['changed'] == []
+    assert third['removed'] == ['10.1.0.0/16']
+
+
+def test_history_store_record_not_newer(tmpdir, history_store) -> None:
+    """
+    Test versions not newer than latest recorded version are not recorded
+    """
+    directory = Path(tmpdir.strpath)
+    assert not history_store.record(create_aws_network_set(directory, THIRD_UPDATE, []))
+    assert not history_store.record(create_aws_network_set(directory, FIRST_UPDATE, []))
+    network_set = create_aws_network_set(directory, THIRD_UPDATE, [])
+    network_set.updated = None
+    assert not history_store.record(network_set)
+    assert len(history_store.versions('aws')) == 3
+
+
+def test_history_store_record_unchanged(tmpdir, history_store) -> None:
+    """
+    Test versions without changes are not recorded, except for the base snapshot
+    """
+    directory = Path(tmpdir.strpath)
+    networks = [('10.0.0.0/16', 'eu-north-1'), ('10.1.2.0/24', 'us-east-1')]
+    assert not history_store.record(create_aws_network_set(directory, THIRD_UPDATE + timedelta(days=1), networks))
+    assert len(history_store.history_file('aws').read_text(encoding='utf-8').splitlines()) == 3
+
+    store = HistoryStore(directory.joinpath('empty'))
+    assert store.record(create_aws_network_set(directory, FIRST_UPDATE, []))
+    assert store.versions('aws') == [FIRST_UPDATE]
+    assert not store.record(create_aws_network_set(directory, SECOND_UPDATE, []))
+
+
+def test_history_store_record_updates_index(tmpdir, history_store, monkeypatch) -> None:
+    """
+    Test recorded versions are applied to the loaded index without reading history file
+    """
+    directory = Path(tmpdir.strpath)
+    index = history_store.get_index('aws')
+    monkeypatch.setattr(history_store, 'iter_versions', lambda vendor_type: pytest.fail('history file replayed'))
+    updated = THIRD_UPDATE + timedelta(days=1)
+    networks = [('10.0.0.0/16', 'eu-north-1'), ('10.2.0.0/16', 'us-west-1')]
+    assert history_store.record(create_aws_network_set(directory, updated, networks))
+    assert history_store.get_index('aws') is index
+    assert history_store.versions('aws')[-1] == updated
+    assert sorted(str(network.cidr) for network in history_store.state('aws')) == ['10.0.0.0/16', '10.2.0.0/16']
+    assert history_store.find('10.2.0.1', updated, ['aws']).region == 'us-west-1'
+    assert str(history_store.find('10.1.2.1', THIRD_UPDATE, ['aws']).cidr) == '10.1.2.0/24'
+    assert history_store.find('10.1.2.1', updated, ['aws']) is None
+
+    store = HistoryStore(history_store.directory)
+    assert store.versions('aws') == [FIRST_UPDATE, SECOND_UPDATE, THIRD_UPDATE, updated]
+
+
+def test_history_store_state(history_store) -> None:
+    """
+    Test reconstructing prefixes at a point in time
+    """
+    assert history_store.state('aws', FIRST_UPDATE - timedelta(days=1)) == []
+    state = history_store.state('aws', FIRST_UPDATE + timedelta(days=1))
+    assert sorted(str(network.cidr) for network in state) == ['10.0.0.0/16', '10.1.0.0/16']
+    state = history_store.state('aws', SECOND_UPDATE)
+    assert sorted(str(network.cidr) for network in state) == ['10.0.0.0/16', '10.1.0.0/16', '10.1.2.0/24']
+    state = history_store.state('aws')
+    assert sorted(str(network.cidr) for network in state) == ['10.0.0.0/16', '10.1.2.0/24']
+    assert all(isinstance(network, AWSPrefix) for network in state)
+
+
+def test_history_store_find(history_store) -> None:
+    """
+    Test looking up addresses at points in time
+    """
+    assert history_store.find('10.0.0.1', FIRST_UPDATE - timedelta(seconds=1), ['aws']) is None
+
+    network = history_store.find('10.0.0.1', FIRST_UPDATE, ['aws'])
+    assert str(network.cidr) == '10.0.0.0/16'
+    assert network.region == 'eu-west-1'
+    network = history_store.find('10.0.0.1', SECOND_UPDATE + timedelta(days=1), ['aws'])
+    assert network.region == 'eu-north-1'
+
+    assert str(history_store.find('10.1.2.3', FIRST_UPDATE, ['aws']).cidr) == '10.1.0.0/16'
+    assert str(history_store.find('10.1.2.3', SECOND_UPDATE, ['aws']).cidr) == '10.1.2.0/24'
+    assert str(history_store.find('10.1.2.0/25', SECOND_UPDATE, ['aws']).cidr) == '10.1.2.0/24'
+    assert str(history_store.find('10.1.0.0/16', SECOND_UPDATE, ['aws']).cidr) == '10.1.0.0/16'
+    assert history_store.find('10.1.3.1', THIRD_UPDATE, ['aws']) is None
+    assert history_store.find('10.1.3.1', SECOND_UPDATE, ['cloudflare']) is None
+    assert history_store.find('2001:db8::1', SECOND_UPDATE, ['aws']) is None
+
+
+def test_history_store_find_timezone_aware(history_store) -> None:
+    """
+    Test looking up addresses with timezone aware timestamp
+    """
+    timestamp = (SECOND_UPDATE + timedelta(hours=1)).astimezone(timezone.utc)
+    network = history_store.find('10.0.0.1', timestamp, ['aws'])
+    assert network.region == 'eu-north-1'
+
+
+def test_history_store_read_error(tmpdir) -> None:
+    """
+    Test reading invalid history file
+    """
+    store = HistoryStore(tmpdir.strpath)
+    store.history_file('aws').write_text('{"invalid"\n', encoding='utf-8')
+    with pytest.raises(NetworkError):
+        store.versions('aws')
+
+
+# pylint: disable=unused-argument
+def test_prefixes_history_update_and_find(mock_prefixes_data) -> None:
+    """
+    Test recording history when updating prefixes and looking up addresses at points in time
+    """
+    prefixes = Prefixes(cache_directory=mock_prefixes_data.cache_directory, history=True)
+    assert prefixes.history.directory == prefixes.cache_directory.joinpath(HISTORY_DIRECTORY_NAME)
+    assert prefixes.record_history() == len(prefixes.vendors)
+    assert prefixes.record_history() == 0
+
+    network = prefixes.find('8.34.210.5')
+    assert prefixes.find('8.34.210.5', at=datetime.now()) == network
+    assert prefixes.find('8.34.210.5', at=datetime(2000, 1, 1)) is None
+    assert prefixes.find('8.34.210.5', types=['aws'], at=datetime.now()) is None
+    with pytest.raises(NetworkError):
+        prefixes.find('8.34.210.5', types=['unknown'], at=datetime.now())
+
+    before_update = datetime.now()
+    prefixes.update()
+    # Unchanged prefixes of mocked vendor data are not recorded as new versions
+    assert len(prefixes.history.versions('aws')) == 2
+    assert len(prefixes.history.versions('cloudflare')) == 1
+    assert prefixes.find('8.34.210.5', at=before_update) == network
+
+
+def test_prefixes_history_not_enabled(mock_prefixes_cache) -> None:
+    """
+    Test history lookups without history enabled
+    """
+    assert mock_prefixes_cache.history is None
+    with pytest.raises(NetworkError):
+        mock_prefixes_cache.find('8.34.210.5', at=datetime.now())
+    with pytest.raises(NetworkError):
+        mock_prefixes_cache.record_history()
@@ -0,0 +1,161 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.http_service module
+"""
+import json
+import threading
+import time
+
+from http import HTTPStatus
+from http.client import HTTPConnection
+
+import pytest
+import requests
+
+from netlookup.exceptions import NetworkError
+from netlookup.http_service import MAX_BATCH_ADDRESSES, LookupBatcher, LookupHTTPService
+from netlookup.watcher import PrefixesWatcher
+
+from .constants import PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_GOOGLE_SERVICES_MATCH, PREFIXES_NO_MATCH
+
+
+def test_http_service_get_lookup(mock_lookup_http_service) -> None:
+    """
+    Test looking up single addresses with GET requests
+    """
+    expected = mock_lookup_http_service.prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH).as_dict()
+    with requests.Session() as session:
+        res = session.get(f'{mock_lookup_http_service.url}/{PREFIXES_GOOGLE_CLOUD_MATCH}', timeout=5)
+        assert res.status_code == HTTPStatus.OK
+        assert res.headers['Content-Type'] == 'application/json'
+        assert res.json() == expected
+
+        res = session.get(f'{mock_lookup_http_service.url}/{PREFIXES_GOOGLE_SERVICES_MATCH}', timeout=5)
+        assert res.json()['type'] == 'google'
+        res = session.get(f'{mock_lookup_http_service.url}/{PREFIXES_NO_MATCH}', timeout=5)
+        assert res.status_code == HTTPStatus.NOT_FOUND
+        res = session.get(f'{mock_lookup_http_service.url}/invalid', timeout=5)
+        assert res.status_code == HTTPStatus.BAD_REQUEST
+        assert 'error' in res.json()
+        res = session.get(mock_lookup_http_service.url.replace('/lookup', '/other'), timeout=5)
+        assert res.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_http_service_post_lookup(mock_lookup_http_service) -> None:
+    """
+    Test looking up batches of addresses with POST requests
+    """
+    expected = mock_lookup_http_service.prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH).as_dict()
+    addresses = [PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH, 'invalid', PREFIXES_GOOGLE_CLOUD_MATCH]
+    res = requests.post(mock_lookup_http_service.url, json=addresses, timeout=5)
+    assert res.status_code == HTTPStatus.OK
+    results = res.json()
+    assert results[0] == expected
+    assert results[1] is None
+    assert 'error' in results[2]
+    assert results[3] == expected
+
+
+@pytest.mark.parametrize('body', ('not json', '{"address": "8.34.210.5"}', '[1, 2]'))
+def test_http_service_post_invalid(mock_lookup_http_service, body) -> None:
+    """
+    Test POST requests with invalid request bodies
+    """
+    res = requests.post(mock_lookup_http_service.url, data=body, timeout=5)
+    assert res.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_http_service_post_errors(mock_lookup_http_service) -> None:
+    """
+    Test POST requests with too many addresses and invalid path
+    """
+    addresses = [PREFIXES_NO_MATCH] * (MAX_BATCH_ADDRESSES + 1)
+    res = requests.post(mock_lookup_http_service.url, json=addresses, timeout=5)
+    assert res.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    res = requests.post(f'{mock_lookup_http_service.url}/other', json=[], timeout=5)
+    assert res.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize('content_length', ('-1', 'invalid'))
+def test_http_service_post_invalid_content_length(mock_lookup_http_service, content_length) -> None:
+    """
+    Test POST requests with invalid Content-Length header are rejected without reading body
+    """
+    connection = HTTPConnection(mock_lookup_http_service.address, mock_lookup_http_service.port, timeout=5)
+    try:
+        connection.putrequest('POST', '/lookup')
+        connection.putheader('Content-Length', content_length)
+        connection.endheaders()
+        res = connection.getresponse()
+        assert res.status == HTTPStatus.LENGTH_REQUIRED
+        assert res.will_close
+        assert 'error' in json.loads(res.read())
+    finally:
+        connection.close()
+
+
+def test_http_service_keep_alive(mock_lookup_http_service) -> None:
+    """
+    Test connections are kept alive between requests
+    """
+    connection = HTTPConnection(mock_lookup_http_service.address, mock_lookup_http_service.port, timeout=5)
+    try:
+        for _index in range(3):
+            connection.request(
+                'POST',
+                '/lookup',
+                body=json.dumps([PREFIXES_GOOGLE_CLOUD_MATCH]),
+                headers={'Content-Type': 'application/json'},
+            )
+            res = connection.getresponse()
+            assert res.status == HTTPStatus.OK
+            assert len(json.loads(res.read())) == 1
+            assert not res.will_close
+    finally:
+        connection.close()
+
+
+def test_http_service_port_in_use(mock_lookup_http_service) -> None:
+    """
+    Test starting HTTP lookup service on a port in use
+    """
+    service = LookupHTTPService(
+        cache_directory=mock_lookup_http_service.cache_directory,
+        port=mock_lookup_http_service.port,
+        reload_interval=0,
+    )
+    with pytest.raises(NetworkError):
+        service.start()
+
+
+def test_http_service_batcher_coalesce(mock_prefixes_cache) -> None:
+    """
+    Test lookups queued by concurrent requests are done in a single pass
+    """
+    watcher = PrefixesWatcher(cache_directory=mock_prefixes_cache.cache_directory, reload_interval=0)
+    watcher.reload()
+    batcher = LookupBatcher(watcher)
+    results = {}
+
+    def lookup(index: int) -> None:
+        results[index] = batcher.lookup([PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH])
+
+    threads = [threading.Thread(target=lookup, args=(index,)) for index in range(5)]
+    for thread in threads:
+        thread.start()
+    while batcher.__queue__.qsize() < len(threads):
+        time.sleep(0.01)
+    batcher.start()
+    for thread in threads:
+        thread.join()
+    batcher.stop()
+
+    assert batcher.passes == 1
+    assert batcher.requests == len(threads)
+    for index in range(len(threads)):
+        assert results[index][0]['type'] == 'google-cloud'
+        assert results[index][1] is None
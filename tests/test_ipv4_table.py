@@ -0,0 +1,207 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.ipv4_table module
+"""
+import json
+import random
+import sys
+
+from array import array
+from pathlib import Path
+
+import pytest
+
+from netlookup.exceptions import NetworkError
+from netlookup.ipv4_table import (
+    FIRST_LEVEL_SIZE,
+    SECOND_LEVEL_SIZE,
+    TABLE_FILE_MAGIC,
+    IPv4LookupTable,
+)
+from netlookup.network import Network
+from netlookup.network_sets.aws import AWSPrefix
+
+from .constants import PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH
+
+TEST_NETWORKS = (
+    '10.0.0.0/8',
+    '10.1.0.0/16',
+    '10.1.2.0/24',
+    '10.1.2.128/25',
+    '10.1.2.192/32',
+    '10.2.3.4/30',
+    '2001:db8::/32',
+)
+
+
+def longest_match(networks, address: int):
+    """
+    Find longest matching prefix by checking all networks
+    """
+    match = None
+    for network in networks:
+        if network.first <= address <= network.last and (match is None or network.prefixlen >= match.prefixlen):
+            match = network
+    return match
+
+
+def test_ipv4_table_empty() -> None:
+    """
+    Test empty lookup table
+    """
+    table = IPv4LookupTable()
+    assert len(table) == 0
+    assert table.typecode == 'H'
+    assert len(table.first_level) == FIRST_LEVEL_SIZE
+    assert table.second_level_count == 0
+    assert table.find('10.0.0.1') is None
+
+
+def test_ipv4_table_lookups() -> None:
+    """
+    Test lookups from lookup table
+    """
+    table = IPv4LookupTable(Network(value) for value in TEST_NETWORKS)
+    assert len(table) == len(TEST_NETWORKS) - 1
+    assert table.second_level_count == 2
+    assert table.size == (FIRST_LEVEL_SIZE + 2 * SECOND_LEVEL_SIZE) * 2
+    assert repr(table) == f'<IPv4LookupTable 6 prefixes {table.size} bytes>'
+
+    assert str(table.find('10.255.0.1')) == '10.0.0.0/8'
+    assert str(table.find('10.1.3.1')) == '10.1.0.0/16'
+    assert str(table.find('10.1.2.1')) == '10.1.2.0/24'
+    assert str(table.find('10.1.2.129')) == '10.1.2.128/25'
+    assert str(table.find('10.1.2.192')) == '10.1.2.192/32'
+    assert str(table.find('10.1.2.192/32')) == '10.1.2.192/32'
+    assert str(table.find('10.2.3.7')) == '10.2.3.4/30'
+    assert str(table.find('10.2.3.8')) == '10.0.0.0/8'
+    assert table.find('11.0.0.1') is None
+    assert table.find('2001:db8::1') is None
+    assert table.lookup_id(Network('11.0.0.1').first) == 0
+    assert table.lookup_ids([Network('10.1.2.1').first, Network('11.0.0.1').first]) == [3, 0]
+
+    with pytest.raises(NetworkError):
+        table.find('10.1.2.0/24')
+    with pytest.raises(NetworkError):
+        table.find('invalid')
+
+
+def test_ipv4_table_random_networks() -> None:
+    """
+    Test lookups from lookup table match longest prefix with random networks
+    """
+    generator = random.Random(1)
+    networks = []
+    for _ in range(500):
+        prefixlen = generator.choice((1, 8, 16, 20, 23, 24, 25, 28, 30, 32))
+        value = (0x0a000000 | generator.getrandbits(20)) >> (32 - prefixlen) << (32 - prefixlen)
+        networks.append(Network((value, prefixlen), version=4))
+    table = IPv4LookupTable(networks)
+    addresses = [network.first for network in networks] + [network.last for network in networks]
+    addresses.extend(0x0a000000 | generator.getrandbits(20) for _ in range(1000))
+    for address in addresses:
+        match = longest_match(networks, address)
+        assert table.get_network(table.lookup_id(address)) is match
+
+
+def test_ipv4_table_large_entries() -> None:
+    """
+    Test lookup table with too many prefixes for 16 bit entries
+    """
+    networks = [Network((value << 8, 24), version=4) for value in range(1 << 15)]
+    table = IPv4LookupTable(networks)
+    assert table.typecode == 'I'
+    assert str(table.find('0.127.255.1')) == '0.127.255.0/24'
+
+
+def test_ipv4_table_save_and_load(tmpdir) -> None:
+    """
+    Test saving and loading lookup table
+    """
+    networks = [
+        Network(TEST_NETWORKS[0]),
+        AWSPrefix('10.1.2.0/24', {'region': 'eu-west-1', 'services': ['EC2']}),
+        Network(TEST_NETWORKS[3]),
+    ]
+    table = IPv4LookupTable(networks)
+    path = Path(tmpdir.strpath, 'table.bin')
+    table.save(path)
+
+    with IPv4LookupTable.load(path) as loaded:
+        assert isinstance(loaded.first_level, memoryview)
+        assert loaded.typecode == table.typecode
+        assert loaded.as_dict() == table.as_dict()
+        assert str(loaded.find('10.0.0.1')) == '10.0.0.0/8'
+        assert str(loaded.find('10.1.2.129')) == '10.1.2.128/25'
+        match = loaded.find('10.1.2.1')
+        assert isinstance(match, AWSPrefix)
+        assert match.region == 'eu-west-1'
+
+        copy = Path(tmpdir.strpath, 'copy.bin')
+        loaded.save(copy)
+        assert copy.read_bytes() == path.read_bytes()
+    loaded.close()
+    assert len(loaded.first_level) == 0
+
+
+def test_ipv4_table_load_other_byteorder(monkeypatch, tmpdir) -> None:
+    """
+    Test loading lookup table saved with other byte order
+    """
+    table = IPv4LookupTable(Network(value) for value in TEST_NETWORKS)
+    table.first_level.byteswap()
+    table.second_level.byteswap()
+    path = Path(tmpdir.strpath, 'table.bin')
+    with monkeypatch.context() as context:
+        context.setattr(sys, 'byteorder', 'big' if sys.byteorder == 'little' else 'little')
+        table.save(path)
+
+    loaded = IPv4LookupTable.load(path)
+    assert isinstance(loaded.first_level, array)
+    assert str(loaded.find('10.1.2.129')) == '10.1.2.128/25'
+
+
+def test_ipv4_table_load_errors(tmpdir) -> None:
+    """
+    Test loading invalid lookup table files
+    """
+    path = Path(tmpdir.strpath, 'table.bin')
+    with pytest.raises(NetworkError):
+        IPv4LookupTable.load(path)
+
+    path.write_bytes(b'invalid file contents')
+    with pytest.raises(NetworkError):
+        IPv4LookupTable.load(path)
+
+    IPv4LookupTable([Network('10.0.0.0/8')]).save(path)
+    path.write_bytes(path.read_bytes()[:1024])
+    with pytest.raises(NetworkError):
+        IPv4LookupTable.load(path)
+
+    header = json.dumps({'version': 0}).encode()
+    path.write_bytes(TABLE_FILE_MAGIC + len(header).to_bytes(4, 'little') + header)
+    with pytest.raises(NetworkError):
+        IPv4LookupTable.load(path)
+
+
+def test_ipv4_table_save_error(tmpdir) -> None:
+    """
+    Test saving lookup table to invalid path
+    """
+    with pytest.raises(NetworkError):
+        IPv4LookupTable().save(Path(tmpdir.strpath, 'missing', 'table.bin'))
+
+
+def test_ipv4_table_from_prefixes(mock_prefixes_cache) -> None:
+    """
+    Test building lookup table from cached prefixes
+    """
+    table = IPv4LookupTable.from_prefixes(mock_prefixes_cache)
+    assert len(table) == len([network for network in mock_prefixes_cache if network.version == 4])
+    assert table.typecode == 'H'
+    assert table.find(PREFIXES_GOOGLE_CLOUD_MATCH) == mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert table.find(PREFIXES_NO_MATCH) is None
@@ -0,0 +1,135 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.json_stream module
+"""
+import io
+import json
+
+import pytest
+
+from netlookup.exceptions import NetworkError
+from netlookup.json_stream import JSONObjectStream, iter_file_chunks, iter_json_object_members
+
+from .conftest import MOCK_AWS_IP_RANGES_FILE
+
+TEST_DOCUMENT = {
+    'syncToken': '1234567890',
+    'prefixes': [
+        {'ip_prefix': '10.0.0.0/8', 'service': 'EC2', 'region': 'eu-north-1'},
+        {'ip_prefix': '192.168.0.0/16', 'service': 'S3', 'region': 'ääkkönen'},
+    ],
+    'count': 12345.5e-3,
+    'nested': {'values': [1, [2, 3], {'a': None}], 'flag': True},
+    'empty': [],
+}
+
+
+def split_chunks(data: bytes, size: int) -> list:
+    """
+    Split data to chunks of given size
+    """
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 100000])
+def test_json_stream_chunk_boundaries(chunk_size) -> None:
+    """
+    Test decoding object members split to chunks at any position
+    """
+    data = json.dumps(TEST_DOCUMENT, indent=2).encode('utf-8')
+    members = list(iter_json_object_members(split_chunks(data, chunk_size), ('prefixes', 'empty')))
+    assert members == [
+        ('syncToken', TEST_DOCUMENT['syncToken']),
+        ('prefixes', TEST_DOCUMENT['prefixes'][0]),
+        ('prefixes', TEST_DOCUMENT['prefixes'][1]),
+        ('count', TEST_DOCUMENT['count']),
+        ('nested', TEST_DOCUMENT['nested']),
+    ]
+
+
+def test_json_stream_arrays_not_split() -> None:
+    """
+    Test array members not listed in array keys are returned as whole values
+    """
+    data = json.dumps(TEST_DOCUMENT, separators=(',', ':'))
+    assert dict(iter_json_object_members([data])) == TEST_DOCUMENT
+
+
+def test_json_stream_numbers_at_chunk_boundary() -> None:
+    """
+    Test numbers split between chunks are not decoded partially
+    """
+    members = list(iter_json_object_members([b'{"a": 12', b'34, "b": [5', b'6]}'], ('b',)))
+    assert members == [('a', 1234), ('b', 56)]
+
+
+def test_json_stream_empty_object() -> None:
+    """
+    Test decoding empty object
+    """
+    assert not list(iter_json_object_members([b' { ', b' } ', b'\n']))
+
+
+def test_json_stream_keys() -> None:
+    """
+    Test keys of parsed members are collected, including empty array members
+    """
+    stream = JSONObjectStream([json.dumps(TEST_DOCUMENT)], ('prefixes', 'empty'))
+    assert len(list(stream)) == 5
+    assert stream.keys == set(TEST_DOCUMENT)
+
+
+def test_json_stream_lazy() -> None:
+    """
+    Test array items are returned before the rest of data is read
+    """
+    def chunks():
+        yield b'{"items": [1, 2, '
+        raise AssertionError('Data read before items were consumed')
+
+    members = iter_json_object_members(chunks(), ('items',))
+    assert next(members) == ('items', 1)
+    assert next(members) == ('items', 2)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'[]',
+    b'{"a": 1',
+    b'{"a": [1, 2',
+    b'{"a": 1,}',
+    b'{"a" 1}',
+    b'{1: 2}',
+    b'{"a": tru}',
+    b'{"a": 1} {}',
+    b'{"a": "\xff"}',
+])
+def test_json_stream_invalid_data(data) -> None:
+    """
+    Test decoding invalid or truncated JSON data
+    """
+    with pytest.raises(NetworkError):
+        list(iter_json_object_members(split_chunks(data, 3), ('a',)))
+
+
+def test_json_stream_file_chunks() -> None:
+    """
+    Test decoding AWS IP ranges mock data from file chunks
+    """
+    data = json.loads(MOCK_AWS_IP_RANGES_FILE.read_text(encoding='utf-8'))
+    with MOCK_AWS_IP_RANGES_FILE.open('rb') as filedescriptor:
+        members = list(iter_json_object_members(iter_file_chunks(filedescriptor, 4096), ('prefixes',)))
+    prefixes = [value for key, value in members if key == 'prefixes']
+    assert prefixes == data['prefixes']
+    assert dict(member for member in members if member[0] != 'prefixes')['syncToken'] == data['syncToken']
+
+
+def test_json_stream_file_chunks_text() -> None:
+    """
+    Test iterating chunks of a text file
+    """
+    assert list(iter_file_chunks(io.StringIO('abcde'), 2)) == ['ab', 'cd', 'e']
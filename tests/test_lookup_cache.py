@@ -0,0 +1,85 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.lookup_cache module
+"""
+import threading
+
+import pytest
+
+from netaddr import IPAddress
+
+from netlookup.exceptions import NetworkError
+from netlookup.lookup_cache import MISSING, LookupCache, lookup_cache_key
+from netlookup.network import Network
+
+
+def test_lookup_cache_invalid_size() -> None:
+    """
+    Test lookup cache with invalid size
+    """
+    with pytest.raises(NetworkError):
+        LookupCache(0)
+
+
+def test_lookup_cache_lru_eviction() -> None:
+    """
+    Test least recently used entries are evicted from lookup cache
+    """
+    cache = LookupCache(2)
+    assert cache.hit_ratio == 0.0
+    cache.put('a', 1)
+    cache.put('b', None)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert 'b' not in cache
+    assert cache.get('b') is MISSING
+    assert cache.hits == 3
+    assert cache.misses == 1
+    assert cache.hit_ratio == 0.75
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lookup_cache_key() -> None:
+    """
+    Test lookup cache keys are normalized and hashable
+    """
+    key = lookup_cache_key('10.0.0.1')
+    assert key == lookup_cache_key(IPAddress('10.0.0.1'))
+    assert key == lookup_cache_key(int(IPAddress('10.0.0.1')))
+    assert key != lookup_cache_key('10.0.0.1/32')
+    assert lookup_cache_key(Network('10.0.0.0/24')) == lookup_cache_key('10.0.0.0/24')
+    assert lookup_cache_key('10.0.0.0/24') != lookup_cache_key('10.0.0.0/25')
+    assert lookup_cache_key('10.0.0.1', 'aws') == lookup_cache_key('10.0.0.1', ['aws'])
+    assert lookup_cache_key('10.0.0.1', 'aws') != key
+    assert hash(lookup_cache_key(Network('2001:db8::/32'), ['aws', 'cloudflare']))
+    with pytest.raises(NetworkError):
+        lookup_cache_key('invalid address')
+
+
+def test_lookup_cache_threads() -> None:
+    """
+    Test sharing lookup cache between threads
+    """
+    cache = LookupCache(16)
+
+    def run(offset: int) -> None:
+        for index in range(2000):
+            key = (offset + index) % 32
+            if cache.get(key) is MISSING:
+                cache.put(key, key)
+
+    threads = [threading.Thread(target=run, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 16
+    assert cache.hits + cache.misses == 8 * 2000
@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.metrics module
+"""
+import re
+
+from datetime import timedelta
+from http import HTTPStatus
+
+import requests
+
+from netlookup.metrics import (
+    LOOKUP_LATENCY_BUCKETS,
+    METRICS_CONTENT_TYPE,
+    MetricFamily,
+    MetricsServer,
+    escape_label_value,
+    render_metrics,
+)
+from netlookup.prefixes import Prefixes
+from netlookup.stats import LatencyHistogram
+
+from .constants import PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH
+
+RE_SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?P<labels>{[^}]*})? (?P<value>\S+)$')
+
+
+def parse_samples(text: str) -> dict:
+    """
+    Parse samples from Prometheus text format to dictionary by name and labels
+    """
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        match = RE_SAMPLE.match(line)
+        assert match is not None, line
+        samples[f'{match.group("name")}{match.group("labels") or ""}'] = float(match.group('value'))
+    return samples
+
+
+def test_metrics_escape_label_value() -> None:
+    """
+    Test escaping Prometheus label values
+    """
+    assert escape_label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+def test_metrics_family_histogram() -> None:
+    """
+    Test rendering histogram samples from a latency histogram
+    """
+    histogram = LatencyHistogram()
+    for value in (500, 2000, 20000, 10 ** 9):
+        histogram.record(value)
+    family = MetricFamily('test_duration_seconds', 'histogram', 'Test latency')
+    family.add_histogram(histogram, {'vendor': 'aws'})
+    text = family.render()
+    assert text.startswith('# HELP test_duration_seconds Test latency\n# TYPE test_duration_seconds histogram\n')
+
+    samples = parse_samples(text)
+    assert samples['test_duration_seconds_bucket{vendor="aws",le="1e-06"}'] == 1
+    assert samples['test_duration_seconds_bucket{vendor="aws",le="2.5e-05"}'] == 3
+    assert samples[f'test_duration_seconds_bucket{{vendor="aws",le="{LOOKUP_LATENCY_BUCKETS[-1]}"}}'] == 3
+    assert samples['test_duration_seconds_bucket{vendor="aws",le="+Inf"}'] == 4
+    assert samples['test_duration_seconds_count{vendor="aws"}'] == 4
+
+
+def test_metrics_render_stats_disabled(mock_prefixes_cache) -> None:
+    """
+    Test rendering metrics for prefixes without statistics
+    """
+    samples = parse_samples(render_metrics(mock_prefixes_cache))
+    vendor = mock_prefixes_cache.get_vendor('aws')
+    assert samples['netlookup_vendor_prefixes{vendor="aws"}'] == len(vendor)
+    assert samples['netlookup_vendor_updated_timestamp_seconds{vendor="aws"}'] == vendor.updated.timestamp()
+    assert not any(name.startswith('netlookup_lookups_total') for name in samples)
+
+    now = vendor.updated + timedelta(seconds=60)
+    samples = parse_samples(render_metrics(mock_prefixes_cache, now=now))
+    assert samples['netlookup_vendor_cache_age_seconds{vendor="aws"}'] == 60
+
+
+def test_metrics_render_stats_enabled(mock_prefixes_cache) -> None:
+    """
+    Test rendering metrics for prefixes with statistics
+    """
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, stats=True)
+    prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    prefixes.find(PREFIXES_NO_MATCH)
+    prefixes.get_vendor('google-cloud').find(PREFIXES_GOOGLE_CLOUD_MATCH)
+
+    samples = parse_samples(render_metrics(prefixes))
+    assert samples['netlookup_loads_total'] == 1
+    assert samples['netlookup_lookups_total{result="hit"}'] == 1
+    assert samples['netlookup_lookups_total{result="miss"}'] == 1
+    assert samples['netlookup_lookup_duration_seconds_count'] == 2
+    assert samples['netlookup_vendor_loads_total{vendor="aws"}'] == 1
+    assert samples['netlookup_vendor_refreshes_total{vendor="aws",result="success"}'] == 0
+    assert samples['netlookup_vendor_refreshes_total{vendor="aws",result="failure"}'] == 0
+    assert samples['netlookup_vendor_lookups_total{vendor="google-cloud",result="hit"}'] == 1
+    assert samples['netlookup_vendor_lookup_duration_seconds_count{vendor="google-cloud"}'] == 1
+
+
+def test_metrics_render_lookup_cache(mock_prefixes_cache) -> None:
+    """
+    Test rendering lookup cache metrics
+    """
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, lookup_cache_size=10)
+    prefixes.find(PREFIXES_NO_MATCH)
+    prefixes.find(PREFIXES_NO_MATCH)
+    samples = parse_samples(render_metrics(prefixes))
+    assert samples['netlookup_lookup_cache_entries'] == 1
+    assert samples['netlookup_lookup_cache_requests_total{result="hit"}'] == 1
+    assert samples['netlookup_lookup_cache_requests_total{result="miss"}'] == 1
+
+
+def test_metrics_server(mock_prefixes_cache) -> None:
+    """
+    Test serving metrics from the HTTP endpoint
+    """
+    with MetricsServer(mock_prefixes_cache, port=0) as server:
+        assert server.port != 0
+        res = requests.get(server.url, timeout=5)
+        assert res.status_code == HTTPStatus.OK
+        assert res.headers['Content-Type'] == METRICS_CONTENT_TYPE
+        samples = parse_samples(res.text)
+        assert samples['netlookup_vendor_prefixes{vendor="aws"}'] == len(mock_prefixes_cache.get_vendor('aws'))
+        res = requests.get(server.url.replace('/metrics', '/other'), timeout=5)
+        assert res.status_code == HTTPStatus.NOT_FOUND
+    assert server.server is None
+    server.stop()
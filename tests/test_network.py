@@ -17,9 +17,12 @@ from netlookup.constants import (
     MAX_PREFIX_LEN_IPV6,
 )
 from netlookup.network import (
+    NETWORK_DETAILS_FIELDS,
     Network,
     NetworkError,
+    SubnetSequence,
     find_address_in_networks,
+    format_address,
     parse_address_or_network
 )
 
@@ -111,6 +114,130 @@ def test_network_split_valid_networks(valid_network) -> None:
         prefixlen += 1
 
 
+def test_network_iter_subnet_values_splittable_networks(splittable_network) -> None:
+    """
+    Test integer subnet values match the netaddr subnet split results
+    """
+    network = Network(splittable_network)
+    prefixlen = network.prefixlen + MAX_SPLITS
+    expected = [str(subnet.ip) for subnet in network.subnet(prefixlen)]
+    assert network.subnet_count(prefixlen) == len(expected)
+
+    values = [
+        format_address(value, network.version)
+        for value in network.iter_subnet_values(prefixlen)
+    ]
+    assert values == expected
+
+    values = [
+        format_address(value, network.version)
+        for value in network.iter_subnet_values(prefixlen, offset=10, count=5)
+    ]
+    assert values == expected[10:15]
+    assert list(network.iter_subnet_values(prefixlen, offset=len(expected))) == []
+
+
+def test_network_iter_subnet_values_large_offset() -> None:
+    """
+    Test generating subnets from large offset without iterating previous subnets
+    """
+    network = Network('2001:db8::/32')
+    values = list(network.iter_subnet_values(64, offset=1000000, count=2))
+    assert [format_address(value, network.version) for value in values] == [
+        '2001:db8:f:4240::',
+        '2001:db8:f:4241::',
+    ]
+
+
+def test_network_iter_subnet_values_invalid_values() -> None:
+    """
+    Test errors with invalid offset and count for iter_subnet_values
+    """
+    network = Network('192.168.0.0/24')
+    with pytest.raises(NetworkError):
+        list(network.iter_subnet_values(26, offset=-1))
+    with pytest.raises(NetworkError):
+        list(network.iter_subnet_values(26, count=-1))
+    with pytest.raises(AddrFormatError):
+        list(network.iter_subnet_values(24))
+
+
+def test_network_subnet_lazy_splittable_networks(splittable_network) -> None:
+    """
+    Test lazy subnet sequences match the netaddr subnet split results
+    """
+    network = Network(splittable_network)
+    prefixlen = network.prefixlen + MAX_SPLITS
+    expected = list(network.subnet(prefixlen))
+    subnets = network.subnet(prefixlen, lazy=True)
+    assert isinstance(subnets, SubnetSequence)
+    assert isinstance(subnets.__repr__(), str)
+    assert len(subnets) == subnets.count == len(expected)
+    assert list(subnets) == expected
+    assert list(reversed(subnets)) == expected[::-1]
+    assert subnets[3] == expected[3]
+    assert subnets[-1] == expected[-1]
+    assert list(subnets[2:20:3]) == expected[2:20:3]
+    assert subnets[2:20:3].count == len(expected[2:20:3])
+    assert subnets[::-1].count == len(expected)
+    assert list(network.subnet(prefixlen, count=4, lazy=True)) == expected[:4]
+
+    for index in (0, 7, len(expected) - 1):
+        assert subnets.index(expected[index]) == index
+        assert str(expected[index]) in subnets
+    with pytest.raises(IndexError):
+        subnets[len(expected)]  # pylint: disable=pointless-statement
+
+
+def test_network_subnet_lazy_index_errors() -> None:
+    """
+    Test looking up index of values that are not in the lazy subnet sequence
+    """
+    network = Network('2001:db8::/32')
+    subnets = network.subnet(64, lazy=True)
+    assert subnets.count == 2 ** 32
+    assert subnets.index('2001:db8:f:4240::/64') == 1000000
+    assert subnets[1000000] == Network('2001:db8:f:4240::/64')
+    for value in ('2001:db8:f:4240::/63', '2001:db9::/64', '2001:db8::1', '10.0.0.0/8', 'foobar'):
+        assert value not in subnets
+        with pytest.raises(ValueError):
+            subnets.index(value)
+    with pytest.raises(ValueError):
+        subnets.index('2001:db8::/64', start=1)
+
+
+def test_network_details_valid_networks(valid_network) -> None:
+    """
+    Test network details calculated from integer values match netaddr properties
+    """
+    network = Network(valid_network)
+    details = network.details()
+    assert tuple(details.keys()) == NETWORK_DETAILS_FIELDS
+    assert details['cidr'] == str(network.cidr)
+    assert details['netmask'] == str(network.netmask)
+    assert details['netmask_hex'] == network.netmask_hex_string
+    assert details['network'] == str(network.network)
+    assert details['total_hosts'] == network.total_hosts
+    assert details['next'] == str(network.next())  # noqa
+    assert details['previous'] == str(network.previous())
+    assert details['bits'] == network.network.bits()
+    assert details['reverse_dns'] == network.network.reverse_dns
+    for attr in ('broadcast', 'first_host', 'last_host'):
+        value = getattr(network, attr)
+        assert details[attr] == (str(value) if value is not None else None)
+
+
+def test_network_details_address_space_boundaries() -> None:
+    """
+    Test network details for networks without next or previous network
+    """
+    details = Network('0.0.0.0/0').details()
+    assert details['next'] is None
+    assert details['previous'] is None
+    assert Network('255.255.255.255/32').details()['next'] is None
+    assert Network('::/0').details()['first_host'] == '::1'
+
+
 def test_network_compare_ipv4_networks() -> None:
     """
     Test comparing IPv4 networks
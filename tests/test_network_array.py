@@ -0,0 +1,226 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.network_array module
+"""
+import random
+
+import pytest
+
+from netaddr import IPSet, cidr_merge
+
+from netlookup.exceptions import NetworkError
+from netlookup.network import Network, NetworkList
+from netlookup.network_sets.aws import AWS, AWSPrefix
+from netlookup.overlaps import find_overlaps
+
+np = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from netlookup.network_array import NetworkArray, range_to_cidrs, require_numpy  # noqa: E402
+
+TEST_NETWORKS = (
+    '10.0.0.0/16',
+    '10.0.1.0/24',
+    '10.1.0.0/24',
+    '10.1.1.0/24',
+    '10.0.0.0/16',
+    '192.168.0.0/24',
+    '2001:db8::/32',
+    '2001:db8:1::/48',
+    '2001:db9::/32',
+)
+
+
+def random_networks(generator: random.Random, count: int):
+    """
+    Return random IPv4 and IPv6 networks
+    """
+    networks = []
+    for _ in range(count):
+        version, bits = generator.choice(((4, 32), (6, 128)))
+        prefixlen = generator.randint(0, bits)
+        value = generator.getrandbits(bits) >> (bits - prefixlen) << (bits - prefixlen) if prefixlen else 0
+        networks.append(Network((value, prefixlen), version=version))
+    return networks
+
+
+def test_require_numpy(monkeypatch) -> None:
+    """
+    Test error message when numpy is not installed
+    """
+    require_numpy()
+    monkeypatch.setattr('netlookup.network_array.np', None)
+    with pytest.raises(NetworkError, match=r'netlookup\[array\]'):
+        NetworkArray()
+
+
+def test_range_to_cidrs() -> None:
+    """
+    Test splitting address ranges to CIDR networks
+    """
+    assert list(range_to_cidrs(0, 1 << 32, 32)) == [(0, 0)]
+    assert list(range_to_cidrs(10, 10, 32)) == []
+    assert list(range_to_cidrs(1, 4, 32)) == [(1, 32), (2, 31)]
+
+
+def test_network_array_empty() -> None:
+    """
+    Test empty network array
+    """
+    network_array = NetworkArray()
+    assert len(network_array) == 0
+    assert repr(network_array) == '<NetworkArray 0 networks>'
+    assert len(network_array.sort()) == 0
+    assert len(network_array.unique()) == 0
+    assert len(network_array.merge()) == 0
+    assert network_array.overlaps().tolist() == []
+    assert network_array.contains(['10.0.0.1', '2001:db8::1']).tolist() == [False, False]
+    assert network_array.to_network_list() == []
+
+
+def test_network_array_invalid_network() -> None:
+    """
+    Test creating network array with invalid network
+    """
+    with pytest.raises(NetworkError):
+        NetworkArray(['10.0.0.0/16', 'invalid'])
+    with pytest.raises(NetworkError):
+        NetworkArray(['10.0.0.0/16']).contains(['invalid'])
+
+
+def test_network_array_records() -> None:
+    """
+    Test network array records and indexing
+    """
+    network_array = NetworkArray(TEST_NETWORKS)
+    assert len(network_array) == len(TEST_NETWORKS)
+    assert network_array.records['version'].tolist() == [4, 4, 4, 4, 4, 4, 6, 6, 6]
+    assert int(network_array.records['first_hi'][0]) == 0
+    assert int(network_array.records['first_lo'][0]) == Network('10.0.0.0/16').first
+    assert int(network_array.records['first_hi'][6]) == Network('2001:db8::/32').first >> 64
+    assert int(network_array.records['last_lo'][6]) == Network('2001:db8::/32').last & ((1 << 64) - 1)
+
+    assert network_array[1] == Network('10.0.1.0/24')
+    subset = network_array[2:4]
+    assert isinstance(subset, NetworkArray)
+    assert subset.to_network_list() == [Network('10.1.0.0/24'), Network('10.1.1.0/24')]
+
+    records = NetworkArray.from_records(network_array.records)
+    assert records.items is None
+    assert records[6] == Network('2001:db8::/32')
+    assert list(records) == list(network_array)
+
+
+def test_network_array_sort_and_unique() -> None:
+    """
+    Test sorting networks and removing duplicate networks
+    """
+    network_array = NetworkArray(reversed(TEST_NETWORKS))
+    assert [str(network) for network in network_array.sort()] == [
+        '10.0.0.0/16',
+        '10.0.0.0/16',
+        '10.0.1.0/24',
+        '10.1.0.0/24',
+        '10.1.1.0/24',
+        '192.168.0.0/24',
+        '2001:db8::/32',
+        '2001:db8:1::/48',
+        '2001:db9::/32',
+    ]
+    unique = network_array.unique()
+    assert len(unique) == len(TEST_NETWORKS) - 1
+    assert [str(network) for network in unique][:2] == ['10.0.0.0/16', '10.0.1.0/24']
+
+
+def test_network_array_merge() -> None:
+    """
+    Test merging networks to minimal CIDR cover
+    """
+    merged = NetworkArray(TEST_NETWORKS).merge()
+    assert isinstance(merged, NetworkArray)
+    assert [str(network) for network in merged] == [
+        '10.0.0.0/16',
+        '10.1.0.0/23',
+        '192.168.0.0/24',
+        '2001:db8::/31',
+    ]
+    assert [str(network) for network in NetworkArray(['0.0.0.0/0', '::/0', '10.0.0.0/8']).merge()] == [
+        '0.0.0.0/0',
+        '::/0',
+    ]
+
+
+def test_network_array_overlaps() -> None:
+    """
+    Test detecting overlapping networks
+    """
+    network_array = NetworkArray(TEST_NETWORKS)
+    assert network_array.overlaps().tolist() == [True, True, False, False, True, False, True, True, False]
+
+
+def test_network_array_contains() -> None:
+    """
+    Test vectorized containment tests for addresses and networks
+    """
+    network_array = NetworkArray(TEST_NETWORKS)
+    assert network_array.contains([
+        '10.0.255.255',
+        '10.1.1.1',
+        '10.1.2.0',
+        '9.255.255.255',
+        '10.1.0.0/23',
+        '10.1.0.0/22',
+        '2001:db8:ffff::1',
+        '2001:dba::',
+        '2001:db8::/31',
+    ]).tolist() == [True, True, False, False, True, False, True, False, True]
+
+    addresses = np.array([Network('10.0.0.0/16').first, Network('10.2.0.0/16').first, 0], dtype=np.uint32)
+    assert network_array.contains(addresses).tolist() == [True, False, False]
+
+
+def test_network_array_random_networks() -> None:
+    """
+    Test network array operations match netaddr and overlap detection with random networks
+    """
+    generator = random.Random(1)
+    for _ in range(20):
+        networks = random_networks(generator, 50)
+        network_array = NetworkArray(networks)
+
+        merged = [network.cidr for network in network_array.merge()]
+        assert sorted(merged) == sorted(cidr_merge([network.cidr for network in networks]))
+
+        overlapping = set()
+        for overlap in find_overlaps(networks).overlaps:
+            overlapping.update((id(overlap.network), id(overlap.other)))
+        assert network_array.overlaps().tolist() == [id(network) in overlapping for network in networks]
+
+        ipset = IPSet([network.cidr for network in networks])
+        addresses = [str(network.network) for network in networks] + [
+            str(network.broadcast or network.network) for network in random_networks(generator, 50)
+        ]
+        assert network_array.contains(addresses).tolist() == [address in ipset for address in addresses]
+
+
+def test_network_array_network_sets(mock_prefixes_cache) -> None:
+    """
+    Test converting network sets to network arrays and back
+    """
+    aws = mock_prefixes_cache.get_vendor('aws')
+    network_array = NetworkArray.from_network_set(aws)
+    assert len(network_array) == len(aws)
+    assert network_array.to_network_list() == aws.__networks__
+    assert isinstance(network_array.to_network_list(), NetworkList)
+
+    network_set = network_array.unique().to_network_set(AWS)
+    assert isinstance(network_set, AWS)
+    assert len(network_set) == len(aws)
+    assert network_set.__networks__[0].region == aws.__networks__[0].region
+
+    network_set = NetworkArray(['10.0.0.0/16']).to_network_set(AWS)
+    assert isinstance(network_set.__networks__[0], AWSPrefix)
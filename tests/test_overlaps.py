@@ -0,0 +1,93 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.overlaps module
+"""
+from itertools import combinations
+
+from netlookup.network import Network
+from netlookup.network_sets.aws import AWSPrefix
+from netlookup.network_sets.cloudflare import CloudflarePrefix
+from netlookup.overlaps import find_overlaps
+
+TEST_NETWORKS = (
+    AWSPrefix('10.0.0.0/8', {'region': 'eu-west-1'}),
+    AWSPrefix('10.1.0.0/16', {'region': 'eu-west-1'}),
+    CloudflarePrefix('10.1.2.0/24'),
+    AWSPrefix('10.2.0.0/16', {'region': 'eu-west-1'}),
+    CloudflarePrefix('192.168.0.0/24'),
+    AWSPrefix('192.168.0.0/24', {'region': 'us-east-1'}),
+    CloudflarePrefix('192.168.1.0/24'),
+    AWSPrefix('2001:db8::/32', {'region': 'us-east-1'}),
+    CloudflarePrefix('2001:db8:1::/48'),
+    Network('0.0.0.0/32'),
+)
+
+
+def overlapping_pairs(networks) -> set:
+    """
+    Return overlapping pairs of networks with pairwise comparison
+    """
+    return set(
+        frozenset((str(first), str(second)))
+        for first, second in combinations(networks, 2)
+        if first.version == second.version and (first.cidr in second.cidr or second.cidr in first.cidr)
+    )
+
+
+def test_overlaps_find() -> None:
+    """
+    Test finding overlapping prefix pairs and clusters
+    """
+    report = find_overlaps(reversed(TEST_NETWORKS))
+    assert len(report) == 6
+    assert set(frozenset((str(item.network), str(item.other))) for item in report.overlaps) == \
+        overlapping_pairs(TEST_NETWORKS)
+    for overlap in report.overlaps:
+        assert overlap.other.cidr in overlap.network.cidr
+    assert [str(cluster.cidr) for cluster in report.clusters] == ['10.0.0.0/8', '192.168.0.0/24', '2001:db8::/32']
+    assert [len(cluster) for cluster in report.clusters] == [4, 2, 2]
+    assert report.clusters[0].types == ['aws', 'cloudflare']
+
+    identical = [overlap for overlap in report.overlaps if overlap.identical]
+    assert len(identical) == 1
+    assert 'equals' in repr(identical[0])
+    assert identical[0].cross_vendor
+
+
+def test_overlaps_cross_vendor() -> None:
+    """
+    Test finding overlaps between prefixes of different vendors only
+    """
+    report = find_overlaps(TEST_NETWORKS, cross_vendor=True)
+    assert len(report) == 4
+    assert all(overlap.cross_vendor for overlap in report.overlaps)
+    assert len(report.clusters) == 3
+
+    report = find_overlaps(TEST_NETWORKS[:2], cross_vendor=True)
+    assert len(report) == 0
+    assert len(report.clusters) == 0
+
+
+def test_overlaps_as_dict() -> None:
+    """
+    Test formatting overlaps as dictionary
+    """
+    data = find_overlaps(TEST_NETWORKS + (Network('0.0.0.0/24'),)).as_dict()
+    assert len(data['overlaps']) == 7
+    assert data['overlaps'][0]['network'] == {'type': None, 'cidr': '0.0.0.0/24'}
+    assert data['clusters'][1]['networks'][0]['region'] == 'eu-west-1'
+    assert data['clusters'][1]['cross_vendor'] is True
+
+
+def test_overlaps_empty() -> None:
+    """
+    Test finding overlaps from empty and non-overlapping networks
+    """
+    assert len(find_overlaps([])) == 0
+    report = find_overlaps([Network('10.0.0.0/24'), Network('10.0.1.0/24'), Network('::/64')])
+    assert len(report) == 0
+    assert len(report.clusters) == 0
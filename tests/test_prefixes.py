@@ -10,7 +10,11 @@ from shutil import rmtree
 
 import pytest
 
+from netaddr import IPAddress, cidr_merge
+
 from netlookup.exceptions import NetworkError
+from netlookup.heavy_hitters import HeavyHitters
+from netlookup.network import Network
 from netlookup.prefixes import Prefixes
 from netlookup.network_sets.google import GoogleCloudPrefix, GoogleServicePrefix
 
@@ -19,6 +23,7 @@ from .constants import (
     MOCK_PREFIXES_DATA_LEN,
     PREFIXES_GOOGLE_CLOUD_MATCH,
     PREFIXES_GOOGLE_SERVICES_MATCH,
+    PREFIXES_NO_MATCH,
 )
 from .network_sets.test_aws import MOCK_AWS_IP_RANGES_COUNT
 from .network_sets.test_cloudflare import MOCK_CLOUDFLARE_IP_RANGES_COUNT
@@ -174,3 +179,226 @@ def test_prefixes_cache_find_google_services_address(mock_prefixes_cache) -> Non
     """
     network = mock_prefixes_cache.find(PREFIXES_GOOGLE_SERVICES_MATCH)
     assert isinstance(network, GoogleServicePrefix)
+
+
+def test_prefixes_stats_disabled(mock_prefixes_cache) -> None:
+    """
+    Test statistics are disabled by default
+    """
+    assert mock_prefixes_cache.stats is None
+    for vendor in mock_prefixes_cache.vendors:
+        assert vendor.stats is None
+
+
+def test_prefixes_stats_load_and_find(mock_prefixes_cache) -> None:
+    """
+    Test load and lookup statistics for prefixes
+    """
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, stats=True)
+    assert prefixes.stats.loads == 1
+    assert prefixes.stats.prefixes == MOCK_PREFIXES_CACHE_LEN
+    for vendor in prefixes.vendors:
+        assert vendor.stats is prefixes.stats.vendor(vendor.type)
+        assert vendor.stats.cache_hits == 1
+        assert vendor.stats.prefixes == len(vendor)
+
+    prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    prefixes.find(PREFIXES_NO_MATCH)
+    prefixes.get_vendor('google').find(PREFIXES_GOOGLE_SERVICES_MATCH)
+    assert prefixes.stats.lookups == 2
+    assert prefixes.stats.hits == 1
+    assert prefixes.stats.latency.count == 2
+    assert prefixes.stats.vendor('google').hits == 1
+
+    prefixes.disable_stats()
+    prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert prefixes.stats is None
+    assert prefixes.enable_stats().lookups == 0
+    assert prefixes.get_vendor('aws').stats is prefixes.stats.vendor('aws')
+
+
+# pylint: disable=unused-argument
+def test_prefixes_stats_update(
+        mock_prefixes_cache_empty,
+        mock_aws_ip_ranges,
+        mock_cloudflare_ip4_ranges,
+        mock_cloudflare_ip6_ranges,
+        mock_google_dns_requests) -> None:
+    """
+    Test fetch statistics when updating prefixes
+    """
+    prefixes = mock_prefixes_cache_empty
+    stats = prefixes.enable_stats()
+    prefixes.update()
+    assert stats.prefixes == MOCK_PREFIXES_DATA_LEN
+    assert stats.vendor('aws').fetches == 1
+    assert stats.vendor('aws').fetch_errors == 0
+    assert stats.vendor('aws').prefixes == MOCK_AWS_IP_RANGES_COUNT
+
+
+# pylint: disable=unused-argument
+def test_prefixes_stats_update_error(
+        mock_prefixes_cache_empty,
+        mock_aws_ip_ranges,
+        mock_cloudflare_ip4_ranges,
+        mock_cloudflare_ip6_ranges,
+        mock_google_dns_requests_error) -> None:
+    """
+    Test fetch error statistics when updating prefixes fails
+    """
+    prefixes = mock_prefixes_cache_empty
+    stats = prefixes.enable_stats()
+    with pytest.raises(NetworkError):
+        prefixes.update()
+    assert stats.vendor('cloudflare').fetches == 1
+    assert stats.vendor('google-cloud').fetch_errors == 1
+    assert stats.vendor('google-cloud').cache_misses == 0
+
+
+def test_prefixes_lookup_cache(mock_prefixes_cache) -> None:
+    """
+    Test lookup cache for prefixes lookups
+    """
+    assert mock_prefixes_cache.lookup_cache is None
+    with pytest.raises(NetworkError):
+        mock_prefixes_cache.prewarm([PREFIXES_GOOGLE_CLOUD_MATCH])
+
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, lookup_cache_size=10)
+    network = prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert isinstance(network, GoogleCloudPrefix)
+    assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH) is network
+    assert prefixes.find(PREFIXES_NO_MATCH) is None
+    assert prefixes.find(PREFIXES_NO_MATCH) is None
+    assert prefixes.lookup_cache.hits == 2
+    assert prefixes.lookup_cache.misses == 2
+
+    prefixes.load()
+    assert len(prefixes.lookup_cache) == 0
+    assert prefixes.prewarm([PREFIXES_GOOGLE_SERVICES_MATCH, 'invalid address', PREFIXES_NO_MATCH]) == 2
+    assert isinstance(prefixes.find(PREFIXES_GOOGLE_SERVICES_MATCH), GoogleServicePrefix)
+    assert prefixes.lookup_cache.hits == 3
+
+
+def test_prefixes_lookup_cache_network_values(mock_prefixes_cache) -> None:
+    """
+    Test lookup cache with network values and equivalent address values
+    """
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, lookup_cache_size=10)
+    network = prefixes.find(Network(f'{PREFIXES_GOOGLE_CLOUD_MATCH}/32'))
+    assert network == mock_prefixes_cache.find(Network(f'{PREFIXES_GOOGLE_CLOUD_MATCH}/32'))
+    assert prefixes.find(Network(f'{PREFIXES_GOOGLE_CLOUD_MATCH}/32')) is network
+    assert prefixes.find(network) is prefixes.find(Network(str(network.cidr)))
+
+    address = prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert prefixes.find(IPAddress(PREFIXES_GOOGLE_CLOUD_MATCH)) is address
+    assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['google-cloud']) is address
+    assert prefixes.find(IPAddress(PREFIXES_GOOGLE_CLOUD_MATCH), types='google-cloud') is address
+    assert prefixes.lookup_cache.hits == 4
+    assert prefixes.lookup_cache.misses == 4
+
+    assert prefixes.prewarm([Network(f'{PREFIXES_NO_MATCH}/32')]) == 1
+    assert prefixes.find(Network(f'{PREFIXES_NO_MATCH}/32')) is None
+    assert prefixes.lookup_cache.hits == 5
+
+
+def test_prefixes_heavy_hitters(mock_prefixes_cache) -> None:
+    """
+    Test heavy hitters tracking from prefixes lookups
+    """
+    prefixes = Prefixes(
+        cache_directory=mock_prefixes_cache.cache_directory,
+        lookup_cache_size=10,
+        heavy_hitters=HeavyHitters(capacity=10),
+    )
+    for address in (PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_GOOGLE_CLOUD_MATCH, PREFIXES_NO_MATCH):
+        prefixes.find(address)
+    top = prefixes.heavy_hitters.top()
+    assert top['addresses'][0] == {'key': PREFIXES_GOOGLE_CLOUD_MATCH, 'count': 2, 'error': 0}
+    assert top['vendors'] == [{'key': 'google-cloud', 'count': 2, 'error': 0}]
+    assert len(top['misses']) == 1
+
+
+def test_prefixes_filter_type(mock_prefixes_cache) -> None:
+    """
+    Test filtering prefixes by type from cached lookup indexes
+    """
+    assert mock_prefixes_cache.types == [vendor.type for vendor in mock_prefixes_cache.vendors]
+    total = 0
+    for vendor in mock_prefixes_cache.vendors:
+        networks = mock_prefixes_cache.filter_type(vendor.type)
+        assert mock_prefixes_cache.filter_type(vendor.type) is networks
+        assert networks == [prefix for prefix in mock_prefixes_cache if prefix.type == vendor.type]
+        assert len(networks) == len(vendor)
+        total += len(networks)
+    assert total == len(mock_prefixes_cache)
+    assert len(mock_prefixes_cache.filter_type('unknown')) == 0
+
+    networks = mock_prefixes_cache.filter_type('aws')
+    mock_prefixes_cache.load()
+    assert mock_prefixes_cache.filter_type('aws') is not networks
+
+
+def test_prefixes_find_types(mock_prefixes_cache) -> None:
+    """
+    Test finding addresses from prefixes of specific vendor types
+    """
+    network = mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH)
+    assert mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH, types='google-cloud') is network
+    assert mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['aws', 'google-cloud']) is network
+    assert mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['aws', 'cloudflare']) is None
+    assert mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=[]) is None
+    assert mock_prefixes_cache.find(PREFIXES_NO_MATCH, types=['google-cloud']) is None
+    with pytest.raises(NetworkError):
+        mock_prefixes_cache.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['unknown'])
+
+    prefixes = Prefixes(cache_directory=mock_prefixes_cache.cache_directory, lookup_cache_size=10, stats=True)
+    assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['cloudflare']) is None
+    assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH, types=['google-cloud']) == network
+    assert prefixes.find(PREFIXES_GOOGLE_CLOUD_MATCH) == network
+    assert prefixes.lookup_cache.misses == 3
+    assert prefixes.stats.lookups == 3
+
+
+def test_prefixes_select(mock_prefixes_cache) -> None:
+    """
+    Test selecting prefixes by vendor type and attributes
+    """
+    expected = sorted(
+        (
+            prefix for prefix in mock_prefixes_cache.filter_type('aws')
+            if prefix.region.startswith('eu-') and 'S3' in prefix.services
+        ),
+        key=lambda prefix: prefix.value
+    )
+    assert len(expected) > 0
+    assert mock_prefixes_cache.select(type='aws', region='eu-*', services='S3') == expected
+    assert mock_prefixes_cache.select({'type': 'aws', 'region': 'eu-*', 'services': 'S3'}) == expected
+    assert mock_prefixes_cache.select(region='eu-*', services='S3') == expected
+
+    merged = mock_prefixes_cache.select(type='aws', region='eu-*', services='S3', merged=True)
+    assert [network.cidr for network in merged] == cidr_merge(prefix.cidr for prefix in expected)
+
+    google = mock_prefixes_cache.select(type='google*')
+    assert len(google) == len(mock_prefixes_cache.filter_type('google')) + len(
+        mock_prefixes_cache.filter_type('google-cloud')
+    )
+    assert google == sorted(google, key=lambda prefix: prefix.value)
+    assert len(mock_prefixes_cache.select()) == len(mock_prefixes_cache)
+    assert mock_prefixes_cache.select(type='cloudflare', region='eu-*') == []
+    assert mock_prefixes_cache.select(type='unknown') == []
+
+    with pytest.raises(NetworkError):
+        mock_prefixes_cache.select(type='aws', unknown='value')
+
+
+def test_prefixes_overlaps(mock_prefixes_cache) -> None:
+    """
+    Test finding overlapping prefixes from prefix caches
+    """
+    report = mock_prefixes_cache.overlaps()
+    assert len(report) > 0
+    for overlap in report.overlaps:
+        assert overlap.other.cidr in overlap.network.cidr
+    assert sum(len(cluster) for cluster in report.clusters) <= len(mock_prefixes_cache)
+    cross_vendor = mock_prefixes_cache.overlaps(cross_vendor=True)
+    assert [overlap for overlap in report.overlaps if overlap.cross_vendor] == cross_vendor.overlaps
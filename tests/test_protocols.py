@@ -6,7 +6,12 @@
 """
 Unit tests for netlookup.protocols module
 """
-from netlookup.protocols import Protocol, Protocols
+import pytest
+
+from netlookup.base import match_patterns
+from netlookup.protocols import PROTOCOL_LINE_PATTERNS, Protocol, Protocols
+
+from .conftest import MOCK_DATA
 
 PROTOCOLS_COUNT_DARWIN = 140
 PROTOCOLS_COUNT_FREEBSD = 140
@@ -66,3 +71,56 @@ def test_protocols_load_openbsd(mock_openbsd_files) -> None:
     Mock loading protocols for OpenBSD
     """
     validate_protocols(Protocols(), PROTOCOLS_COUNT_OPENBSD)
+
+
+# pylint: disable=unused-argument
+def test_protocols_lookup_by_number(mock_linux_files) -> None:
+    """
+    Test looking up protocols by protocol number
+    """
+    protocols = Protocols()
+    protocol = protocols.get_by_number(6)
+    assert isinstance(protocol, Protocol)
+    assert protocol.name == 'tcp'
+    assert protocols.get_by_number('17').name == 'udp'
+    # First protocol in file wins for duplicate numbers
+    assert protocols.get_by_number(0).name == 'ip'
+    assert protocols.get_by_number(255) is None
+
+    assert protocols.getprotobynumber(6) == 'tcp'
+    with pytest.raises(OSError):
+        protocols.getprotobynumber(255)
+
+
+# pylint: disable=unused-argument
+def test_protocols_lookup_by_name_and_alias(mock_linux_files) -> None:
+    """
+    Test looking up protocols by protocol name and aliases
+    """
+    protocols = Protocols()
+    assert protocols.get_by_name('tcp').number == 6
+    assert protocols.get_by_name('TCP').number == 6
+    assert protocols.get_by_name('tcp').names == ['tcp', 'TCP']
+    assert protocols.get_by_name('no-such-protocol') is None
+
+    assert protocols.getprotobyname('udp') == 17
+    assert protocols.getprotobyname('UDP') == 17
+    with pytest.raises(OSError):
+        protocols.getprotobyname('no-such-protocol')
+
+
+@pytest.mark.parametrize('environment', ['darwin', 'freebsd', 'linux', 'openbsd'])
+def test_protocols_from_line_matches_patterns(environment) -> None:
+    """
+    Test protocols parsed by splitting fields match protocols parsed with line patterns
+    """
+    path = MOCK_DATA.joinpath(f'platform/{environment}/protocols')
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+        protocol = Protocol.from_line(line)
+        expected = Protocol(**match_patterns(PROTOCOL_LINE_PATTERNS, line))
+        # Line patterns include whitespace before comment in aliases
+        expected.aliases = expected.aliases.strip()
+        assert vars(protocol) == vars(expected), line
@@ -0,0 +1,70 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.query module
+"""
+import pytest
+
+from netlookup.exceptions import NetworkError
+from netlookup.network_sets.aws import AWSPrefix
+from netlookup.query import AttributeIndex, is_pattern, match_keys, parse_query
+
+TEST_PREFIXES = (
+    AWSPrefix('10.0.0.0/24', {'region': 'eu-west-1', 'services': ['S3', 'EC2']}),
+    AWSPrefix('10.0.1.0/24', {'region': 'eu-north-1', 'services': ['EC2']}),
+    AWSPrefix('10.0.2.0/24', {'region': 'us-east-1', 'services': ['S3']}),
+    AWSPrefix('10.0.3.0/24', {'services': []}),
+)
+
+
+def test_query_patterns() -> None:
+    """
+    Test detecting and matching query patterns
+    """
+    assert is_pattern('eu-*')
+    assert is_pattern('eu-west-[12]')
+    assert not is_pattern('eu-west-1')
+    keys = ['eu-north-1', 'eu-west-1', 'us-east-1']
+    assert match_keys(keys, 'eu-*') == ['eu-north-1', 'eu-west-1']
+    assert match_keys(keys, ['us-east-1', '*-north-?']) == ['eu-north-1', 'us-east-1']
+    assert match_keys(keys, 'EU-*') == []
+
+
+def test_query_parse() -> None:
+    """
+    Test parsing query terms
+    """
+    assert parse_query(['type=aws', 'region=eu-*', 'services=S3, EC2']) == {
+        'type': 'aws',
+        'region': 'eu-*',
+        'services': ['S3', 'EC2'],
+    }
+    assert parse_query([]) == {}
+    for term in ('region', '=aws', 'region='):
+        with pytest.raises(NetworkError):
+            parse_query([term])
+
+
+def test_query_attribute_index() -> None:
+    """
+    Test selecting items from attribute index
+    """
+    index = AttributeIndex(TEST_PREFIXES, AWSPrefix.extra_attributes)
+    assert index.keys('region') == ['eu-north-1', 'eu-west-1', 'us-east-1']
+    assert index.keys('services') == ['EC2', 'S3']
+    assert index.keys('network_border_group') == []
+
+    assert index.select({}) == list(TEST_PREFIXES)
+    assert index.select({'region': 'eu-*'}) == list(TEST_PREFIXES[:2])
+    assert index.select({'region': 'eu-*', 'services': 'S3'}) == [TEST_PREFIXES[0]]
+    assert index.select({'services': ['S3', 'EC2']}) == list(TEST_PREFIXES[:3])
+    assert index.select({'services': 'S3', 'region': 'unknown'}) == []
+    assert index.select_ids({'services': 'S3'}) == [0, 2]
+
+    with pytest.raises(NetworkError):
+        index.keys('unknown')
+    with pytest.raises(NetworkError):
+        index.select({'region': 'unknown', 'unknown': 'value'})
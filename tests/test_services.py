@@ -6,7 +6,12 @@
 """
 Unit tests for netlookup.services module
 """
-from netlookup.services import Service, Services
+import pytest
+
+from netlookup.base import match_patterns
+from netlookup.services import SERVICE_LINE_PATTERNS, Service, Services
+
+from .conftest import MOCK_DATA
 
 SERVICES_COUNT_DARWIN = 9886
 SERVICES_COUNT_FREEBSD = 1939
@@ -67,3 +72,65 @@ def test_services_load_openbsd(mock_openbsd_files) -> None:
     Mock loading services for OpenBSD
     """
     validate_services(Services(), SERVICES_COUNT_OPENBSD)
+
+
+# pylint: disable=unused-argument
+def test_services_lookup_by_port(mock_linux_files) -> None:
+    """
+    Test looking up services by port number and protocol
+    """
+    services = Services()
+    service = services.get_by_port(443)
+    assert isinstance(service, Service)
+    assert service.name == 'https'
+    assert service.protocol == 'tcp'
+    assert services.get_by_port('443', 'udp').protocol == 'udp'
+    assert services.get_by_port(443, 'sctp') is None
+    assert services.get_by_port(65000) is None
+
+
+# pylint: disable=unused-argument
+def test_services_lookup_by_name_and_alias(mock_linux_files) -> None:
+    """
+    Test looking up services by service name and aliases
+    """
+    services = Services()
+    assert [service.port_number for service in services.get_by_name('https')] == [443, 443]
+    assert [service.protocol for service in services.get_by_name('https', 'udp')] == ['udp']
+
+    aliased = services.get_by_name('mail')
+    assert len(aliased) == 1
+    assert aliased[0].name == 'smtp'
+    assert aliased[0].names == ['smtp', 'mail']
+    assert services.get_by_name('no-such-service') == []
+
+
+# pylint: disable=unused-argument
+def test_services_lookup_port_range(mock_linux_files) -> None:
+    """
+    Test looking up services in port range
+    """
+    services = Services()
+    assert [service.name for service in services.get_port_range(20, 23, 'tcp')] == [
+        'ftp-data',
+        'ftp',
+        'ssh',
+        'telnet',
+    ]
+    assert len(services.get_port_range(20, 23)) == 5
+    assert services.get_port_range(23, 20) == []
+
+
+@pytest.mark.parametrize('environment', ['darwin', 'freebsd', 'linux', 'openbsd'])
+def test_services_from_line_matches_patterns(environment) -> None:
+    """
+    Test services parsed by splitting fields match services parsed with line patterns
+    """
+    path = MOCK_DATA.joinpath(f'platform/{environment}/services')
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line == '' or line.startswith('#'):
+            continue
+        service = Service.from_line(line)
+        expected = Service(**match_patterns(SERVICE_LINE_PATTERNS, line))
+        assert vars(service) == vars(expected), line
@@ -0,0 +1,101 @@
+#
+# Copyright (C) 2020-2023 by Ilkka Tuohela <hile@iki.fi>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+#
+"""
+Unit tests for netlookup.stats module
+"""
+from netlookup.stats import (
+    LatencyHistogram,
+    NetworkSetStatistics,
+    PrefixesStatistics,
+    histogram_bucket_bounds,
+    histogram_bucket_index,
+)
+
+
+def test_stats_histogram_bucket_bounds() -> None:
+    """
+    Test log-linear histogram buckets are contiguous and contain their values
+    """
+    previous = -1
+    for index in range(200):
+        lowest, highest = histogram_bucket_bounds(index)
+        assert lowest == previous + 1
+        assert histogram_bucket_index(lowest) == index
+        assert histogram_bucket_index(highest) == index
+        previous = highest
+
+
+def test_stats_histogram_bucket_relative_error() -> None:
+    """
+    Test log-linear histogram bucket width relative to values
+    """
+    for value in (100, 1234, 56789, 10 ** 9):
+        lowest, highest = histogram_bucket_bounds(histogram_bucket_index(value))
+        assert lowest <= value <= highest
+        assert (highest - lowest) / lowest <= 0.125
+
+
+def test_stats_latency_histogram_percentiles() -> None:
+    """
+    Test latency histogram counters and percentiles
+    """
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+    assert histogram.mean == 0.0
+
+    for value in range(1, 101):
+        histogram.record(value * 1000)
+    assert histogram.count == 100
+    assert histogram.mean == 50500
+    assert 50000 <= histogram.percentile(50) <= 50000 * 1.125
+    assert 99000 <= histogram.percentile(99) <= 99000 * 1.125
+    assert histogram.percentile(100) >= 100000
+    data = histogram.as_dict()
+    assert data['count'] == 100
+    assert data['p50'] == histogram.percentile(50)
+
+
+def test_stats_network_set_statistics() -> None:
+    """
+    Test network set load, fetch and lookup counters
+    """
+    stats = NetworkSetStatistics('aws')
+    assert stats.cache_hit_ratio == 0.0
+    assert stats.hit_ratio == 0.0
+
+    stats.record_load(0.5, True, 10)
+    stats.record_load(0.25, False, 0)
+    stats.record_fetch(1.0, 20)
+    stats.record_fetch(2.0, 0, error=True)
+    stats.record_lookup(100, True)
+    stats.record_lookup(300, False)
+
+    data = stats.as_dict()
+    assert data['type'] == 'aws'
+    assert data['prefixes'] == 20
+    assert data['loads'] == 2
+    assert data['load_seconds'] == 0.75
+    assert data['cache_hit_ratio'] == 0.5
+    assert data['fetches'] == 2
+    assert data['fetch_errors'] == 1
+    assert data['fetch_seconds'] == 3.0
+    assert data['lookups'] == 2
+    assert data['misses'] == 1
+    assert data['hit_ratio'] == 0.5
+
+
+def test_stats_prefixes_statistics() -> None:
+    """
+    Test prefixes statistics with vendor statistics
+    """
+    stats = PrefixesStatistics()
+    vendor = stats.vendor('aws')
+    assert stats.vendor('aws') is vendor
+    stats.record_load(0.5, 100)
+    data = stats.as_dict()
+    assert data['prefixes'] == 100
+    assert data['loads'] == 1
+    assert list(data['vendors']) == ['aws']